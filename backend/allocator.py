@@ -1,12 +1,20 @@
+import bisect
 import hashlib
+import pickle
+import threading
+import uuid
+from collections import Counter, OrderedDict
+from collections.abc import Mapping
 
 import pandas as pd
-from prereq_parser import parse_prereqs
+from prereq_bitset import PrereqBitsets
+from prereq_parser import PrereqCache, compile_prereqs
+from validators import RequiredPrereqClosure
 
 from requirements import (
     DEFAULT_TRACK_ID,
     bucket_family_key,
-    get_allowed_double_count_pairs,
+    compile_double_count_policy,
     order_buckets_same_family,
 )
 
@@ -85,7 +93,7 @@ def _partition_assignment_buckets(
     return non_elective, elective
 
 
-def _build_course_runtime_indexes(courses_df: pd.DataFrame) -> dict:
+def _build_course_runtime_indexes(courses_df: pd.DataFrame, prereq_cache: PrereqCache | None = None) -> dict:
     rows: list[dict] = []
     by_code: dict[str, dict] = {}
     credits: dict[str, int] = {}
@@ -119,7 +127,7 @@ def _build_course_runtime_indexes(courses_df: pd.DataFrame) -> dict:
             "credits": course_credits if course_credits is not None else 3,
             "level": course_level,
             "prereq_concurrent": prereq_concurrent,
-            "parsed_concurrent": parse_prereqs(prereq_concurrent if prereq_concurrent.strip() else "none"),
+            "parsed_concurrent": compile_prereqs(prereq_concurrent, prereq_cache),
             "prereq_soft": prereq_soft,
             "soft_tags": [t.strip() for t in prereq_soft.split(";") if t.strip()],
             "soft_prereq_major_restriction": _normalize_text(row.get("soft_prereq_major_restriction", "")),
@@ -146,6 +154,37 @@ def _build_course_runtime_indexes(courses_df: pd.DataFrame) -> dict:
     }
 
 
+def refresh_course_offering_indexes(course_indexes: dict, courses_df: pd.DataFrame) -> dict:
+    """Return a copy of course_indexes with offering fields re-read from courses_df."""
+    offerings: dict[str, dict] = {}
+    if courses_df is not None and len(courses_df) > 0:
+        for _, row in courses_df.iterrows():
+            code = str(row.get("course_code", "") or "").strip()
+            if not code or code in offerings:
+                continue
+            offerings[code] = {
+                "offered_fall": _safe_bool(row.get("offered_fall", False)),
+                "offered_spring": _safe_bool(row.get("offered_spring", False)),
+                "offered_summer": _safe_bool(row.get("offered_summer", False)),
+                "offering_confidence": _normalize_text(row.get("offering_confidence", "high"), "high").lower(),
+            }
+
+    rows: list[dict] = []
+    by_code: dict[str, dict] = {}
+    for course_row in course_indexes.get("rows", []):
+        code = course_row["course_code"]
+        refreshed = dict(course_row)
+        refreshed.update(offerings.get(code, {}))
+        rows.append(refreshed)
+        by_code[code] = refreshed
+    return {
+        "rows": rows,
+        "by_code": by_code,
+        "credits": course_indexes.get("credits", {}),
+        "levels": course_indexes.get("levels", {}),
+    }
+
+
 def _build_track_equivalent_course_map(
     equivalencies_df: pd.DataFrame | None,
     track_id: str,
@@ -206,6 +245,94 @@ def _build_track_equivalent_course_map(
     return result
 
 
+def _build_track_course_conflict_map(
+    equivalent_course_map: dict[str, set[str]],
+    cross_listed_map: dict[str, set[str]] | None,
+    no_double_count_groups: list | None,
+) -> dict[str, set[str]]:
+    """Course -> courses that cannot share a semester plan with it.
+
+    Equivalent aliases, cross-listed aliases, and no-double-count group members
+    all conflict with each other; codes are upper-cased.
+    """
+    conflict_map: dict[str, set[str]] = {}
+
+    def _link_members(raw_members) -> None:
+        members = {str(code or "").strip().upper() for code in raw_members}
+        members.discard("")
+        if len(members) < 2:
+            return
+        for member in members:
+            conflict_map.setdefault(member, set()).update(members - {member})
+
+    for alias_map in (equivalent_course_map, cross_listed_map or {}):
+        for raw_code, raw_aliases in alias_map.items():
+            _link_members([raw_code, *(raw_aliases or set())])
+    for raw_group in no_double_count_groups or []:
+        _link_members(raw_group or set())
+    return conflict_map
+
+
+def _ordered_allocation_buckets(
+    course_code: str,
+    bucket_meta: dict[str, dict],
+    course_bucket_index: dict[str, list[str]],
+    course_level_index: dict[str, int],
+) -> list[dict]:
+    """Buckets a course may fill, min_level-filtered, in allocation order."""
+    course_level = course_level_index.get(course_code)
+    result = []
+    for bid in course_bucket_index.get(course_code, []):
+        if bid not in bucket_meta:
+            continue
+        meta = bucket_meta[bid]
+        min_lvl = meta.get("min_level")
+        if min_lvl is not None and course_level is not None and course_level < min_lvl:
+            continue
+        result.append(
+            {
+                "bucket_id": bid,
+                "requirement_mode": str(meta.get("requirement_mode", "") or "").strip().lower(),
+                "priority": meta.get("priority", 99),
+                "parent_bucket_id": str(meta.get("parent_bucket_id", "") or "").strip(),
+                "double_count_family_id": str(meta.get("double_count_family_id", "") or "").strip(),
+            }
+        )
+
+    # Base deterministic order.
+    result.sort(
+        key=lambda b: (
+            int(b.get("priority", 99)),
+            str(b["bucket_id"]),
+        )
+    )
+    return order_buckets_same_family(result)
+
+
+def _primary_assignment_anchor(ordered_buckets: list[dict]) -> str:
+    non_elective, elective = _partition_assignment_buckets(ordered_buckets)
+    primary = non_elective if non_elective else elective
+    if not primary:
+        return ""
+    return str(primary[0].get("bucket_id", "") or "")
+
+
+def _course_allocation_info(track_key: str, course_code: str, ordered_buckets: list[dict]) -> tuple:
+    """(sort key, ordered buckets, primary buckets) for one course on one track."""
+    non_elective, elective = _partition_assignment_buckets(ordered_buckets)
+    primary_buckets = non_elective if non_elective else elective
+    anchor = _primary_assignment_anchor(ordered_buckets)
+    seed = f"{track_key}|{anchor}|{course_code}"
+    # Most constrained first: fewest primary buckets, anchor bucket id,
+    # stable hash tiebreak (keeps same-slot collisions deterministic), code.
+    sort_key = (
+        len(primary_buckets),
+        anchor,
+        hashlib.sha256(seed.encode("utf-8")).hexdigest(),
+    )
+    return sort_key, ordered_buckets, primary_buckets
+
+
 def _build_track_runtime_index(
     buckets_df: pd.DataFrame,
     course_bucket_map_df: pd.DataFrame,
@@ -214,6 +341,10 @@ def _build_track_runtime_index(
     track_id: str,
     double_count_policy_df: pd.DataFrame | None = None,
     course_indexes: dict | None = None,
+    prereq_bitsets: PrereqBitsets | None = None,
+    equiv_map: dict[str, set[str]] | None = None,
+    cross_listed_map: dict[str, set[str]] | None = None,
+    no_double_count_groups: list | None = None,
 ) -> dict | None:
     if buckets_df is None or len(buckets_df) == 0:
         return None
@@ -281,7 +412,7 @@ def _build_track_runtime_index(
         if course_code not in base_bucket_course_index[bucket_id]:
             base_bucket_course_index[bucket_id].append(course_code)
 
-    allowed_pairs = get_allowed_double_count_pairs(
+    double_count_policy = compile_double_count_policy(
         track_buckets,
         track_id=track_key,
         double_count_policy_df=double_count_policy_df,
@@ -361,8 +492,17 @@ def _build_track_runtime_index(
         bucket_role_map[bid] = str(row.get("role", "") or "").strip().lower()
 
     course_indexes = course_indexes or _build_course_runtime_indexes(courses_df)
+    # Every course that can matter to this track: mapped courses plus the
+    # prereq ancestors that bridge into them. None without compiled prereqs.
+    candidate_universe = (
+        frozenset(prereq_bitsets.ancestors(course_bucket_index, equiv_map))
+        if prereq_bitsets is not None
+        else None
+    )
     return {
         "track_key": track_key,
+        # Identifies this build in AllocationMemo keys; never copied to a rebuild.
+        "memo_token": uuid.uuid4().hex,
         "bucket_order": bucket_order,
         "bucket_meta_template": bucket_meta_template,
         "selection_bucket_meta": selection_bucket_meta,
@@ -371,15 +511,111 @@ def _build_track_runtime_index(
         "bucket_course_index": bucket_course_index,
         "base_bucket_course_index": base_bucket_course_index,
         "equivalent_course_map": equivalent_course_map,
-        "allowed_pairs": allowed_pairs,
+        "double_count_policy": double_count_policy,
         "course_credits_index": course_indexes["credits"],
         "course_level_index": course_indexes["levels"],
+        # Student-independent half of the allocator, per mapped course.
+        "course_allocation_order": {
+            course_code: _course_allocation_info(
+                track_key,
+                course_code,
+                _ordered_allocation_buckets(
+                    course_code, bucket_meta_template, course_bucket_index, course_indexes["levels"]
+                ),
+            )
+            for course_code in course_bucket_index
+        },
         "bucket_parent_map": bucket_parent_map,
         "bucket_track_required_map": bucket_track_required_map,
         "bucket_role_map": bucket_role_map,
+        "candidate_universe": candidate_universe,
+        "course_conflict_map": _build_track_course_conflict_map(
+            equivalent_course_map,
+            cross_listed_map,
+            no_double_count_groups,
+        ),
     }
 
 
+class _LazyTrackIndexRegistry(Mapping):
+    """
+    Read-only mapping of track key -> runtime track index.
+
+    Keys are known up front, but each track's index is built by
+    _build_track_runtime_index() on first lookup and memoized. Building is
+    serialized per registry, so concurrent requests for the same track build
+    it once. Iterating keys or testing membership never builds; `.items()`
+    and `.values()` build every track.
+    """
+
+    def __init__(self, track_keys, build_inputs: dict, prebuilt: dict | None = None):
+        self._track_keys = tuple(sorted(track_keys))
+        self._key_set = frozenset(self._track_keys)
+        self._build_inputs = build_inputs
+        self._built: dict[str, dict] = {
+            key: value for key, value in (prebuilt or {}).items() if key in self._key_set
+        }
+        self._lock = threading.Lock()
+
+    def __getitem__(self, track_key: str) -> dict:
+        track_index = self._built.get(track_key)
+        if track_index is not None:
+            return track_index
+        if track_key not in self._key_set:
+            raise KeyError(track_key)
+        with self._lock:
+            track_index = self._built.get(track_key)
+            if track_index is None:
+                inputs = self._build_inputs
+                track_index = _build_track_runtime_index(
+                    inputs["buckets_df"],
+                    inputs["course_bucket_map_df"],
+                    inputs["courses_df"],
+                    inputs["equivalencies_df"],
+                    track_key,
+                    double_count_policy_df=inputs["double_count_policy_df"],
+                    course_indexes=inputs["course_indexes"],
+                    prereq_bitsets=inputs.get("prereq_bitsets"),
+                    equiv_map=inputs.get("equiv_map"),
+                    cross_listed_map=inputs.get("cross_listed_map"),
+                    no_double_count_groups=inputs["no_double_count_groups"],
+                )
+                track_index["no_double_count_groups"] = inputs["no_double_count_groups"]
+                self._built[track_key] = track_index
+        return track_index
+
+    def __contains__(self, track_key) -> bool:
+        return track_key in self._key_set
+
+    def __iter__(self):
+        return iter(self._track_keys)
+
+    def __len__(self) -> int:
+        return len(self._track_keys)
+
+    def built(self) -> dict[str, dict]:
+        """Return the track indexes built so far, without building more."""
+        return dict(self._built)
+
+    def warm(self, track_keys=None) -> int:
+        """Build the given tracks (all when None) now; return how many exist."""
+        keys = self._track_keys if track_keys is None else [
+            key for key in (_normalize_track_key(k) for k in track_keys) if key in self._key_set
+        ]
+        for key in keys:
+            self[key]
+        return len(keys)
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state.pop("_lock", None)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
 def get_runtime_track_index(runtime_indexes: dict | None, track_id: str) -> dict | None:
     if not runtime_indexes:
         return None
@@ -392,7 +628,111 @@ def get_runtime_course_index(runtime_indexes: dict | None) -> dict | None:
     return runtime_indexes.get("courses")
 
 
-def ensure_runtime_indexes(data: dict, *, force: bool = False) -> dict:
+def get_runtime_prereq_cache(runtime_indexes: dict | None) -> PrereqCache | None:
+    """The dataset's PrereqCache, for request-time parses of rows the index lacks."""
+    if not runtime_indexes:
+        return None
+    return runtime_indexes.get("prereq_cache")
+
+
+def get_runtime_prereq_bitsets(runtime_indexes: dict | None, prereq_map: dict) -> PrereqBitsets | None:
+    """Compiled prereqs for runtime_indexes, if they were built from prereq_map."""
+    if not runtime_indexes:
+        return None
+    prereq_bitsets = runtime_indexes.get("prereq_bitsets")
+    if prereq_bitsets is None or prereq_bitsets.prereq_map is not prereq_map:
+        return None
+    return prereq_bitsets
+
+
+def get_runtime_required_prereq_closure(
+    runtime_indexes: dict | None,
+    prereq_map: dict,
+) -> RequiredPrereqClosure | None:
+    """Required-prereq closure for runtime_indexes, if it was built from prereq_map."""
+    if not runtime_indexes:
+        return None
+    closure = runtime_indexes.get("required_prereq_closure")
+    if closure is None or closure.prereq_map is not prereq_map:
+        return None
+    return closure
+
+
+def _reusable_course_indexes(courses_df, *candidate_indexes) -> dict | None:
+    # Merged program slices copy data without touching courses_df, so the
+    # course index built for that frame carries over on force=True.
+    if courses_df is None:
+        return None
+    for runtime_indexes in candidate_indexes:
+        if runtime_indexes and runtime_indexes.get("courses_source") is courses_df:
+            return runtime_indexes.get("courses")
+    return None
+
+
+def _reusable_prereq_bitsets(course_rows, prereq_map, *candidate_indexes) -> PrereqBitsets | None:
+    for runtime_indexes in candidate_indexes:
+        prereq_bitsets = get_runtime_prereq_bitsets(runtime_indexes, prereq_map)
+        if prereq_bitsets is not None and prereq_bitsets.course_rows is course_rows:
+            return prereq_bitsets
+    return None
+
+
+def _reusable_required_prereq_closure(prereq_map, *candidate_indexes) -> RequiredPrereqClosure | None:
+    # Merged plan datasets and incremental reloads usually share prereq_map
+    # with the dataset they came from; its closure carries over unchanged.
+    if prereq_map is None:
+        return None
+    for runtime_indexes in candidate_indexes:
+        closure = get_runtime_required_prereq_closure(runtime_indexes, prereq_map)
+        if closure is not None:
+            return closure
+    return None
+
+
+def _track_input_fingerprints(
+    buckets_df: pd.DataFrame | None,
+    course_bucket_map_df: pd.DataFrame | None,
+) -> dict[str, str]:
+    """Hash each track's bucket rows and mapping rows, in order, per track key."""
+    digests: dict[str, "hashlib._Hash"] = {}
+    for label, frame in (("buckets", buckets_df), ("map", course_bucket_map_df)):
+        if frame is None or len(frame) == 0 or "track_id" not in frame.columns:
+            continue
+        row_hashes = pd.util.hash_pandas_object(frame.astype(str), index=False).to_numpy()
+        track_keys = frame["track_id"].astype(str).str.strip().str.upper().to_numpy()
+        header = f"{label}:{'|'.join(map(str, frame.columns))}".encode("utf-8")
+        for track_key in sorted(set(track_keys.tolist())):
+            digest = digests.setdefault(track_key, hashlib.sha256())
+            digest.update(header)
+            digest.update(row_hashes[track_keys == track_key].tobytes())
+    return {track_key: digest.hexdigest() for track_key, digest in digests.items()}
+
+
+def ensure_runtime_indexes(
+    data: dict,
+    *,
+    force: bool = False,
+    course_indexes: dict | None = None,
+    reusable_runtime_indexes: dict | None = None,
+    warm_tracks=None,
+) -> dict:
+    """
+    Build course and per-track runtime indexes onto data.
+
+    Track indexes are built lazily on first lookup (see
+    _LazyTrackIndexRegistry). Pass warm_tracks, an iterable of track ids or
+    "*" for all, to build those eagerly.
+
+    Pass course_indexes to reuse an index built from the same courses_df
+    (e.g. an incremental reload that did not touch the catalog). Without it,
+    the course index and compiled prereqs of data's existing runtime_indexes
+    (or reusable_runtime_indexes) are reused when they were built from the
+    same courses_df and prereq_map objects, so force=True on a merged program
+    slice only rebuilds the track registry. Pass
+    reusable_runtime_indexes when courses, equivalencies, and double-count
+    policy are unchanged; tracks whose bucket/mapping rows hash the same are
+    then carried over instead of rebuilt (only those already built).
+    """
     runtime_indexes = data.get("runtime_indexes")
     if runtime_indexes is not None and not force:
         return data
@@ -403,8 +743,14 @@ def ensure_runtime_indexes(data: dict, *, force: bool = False) -> dict:
     equivalencies_df = data.get("equivalencies_df")
     double_count_policy_df = data.get("v2_double_count_policy_df")
 
-    tracks: dict[str, dict] = {}
-    course_indexes = _build_course_runtime_indexes(courses_df)
+    if course_indexes is None:
+        course_indexes = _reusable_course_indexes(
+            courses_df,
+            data.get("runtime_indexes"),
+            reusable_runtime_indexes,
+        ) or _build_course_runtime_indexes(courses_df, data.get("prereq_cache"))
+    # Only tracks with bucket rows get an index; mapping-only track ids have
+    # nothing to allocate into.
     track_ids: set[str] = set()
     if buckets_df is not None and len(buckets_df) > 0 and "track_id" in buckets_df.columns:
         track_ids.update(
@@ -412,28 +758,48 @@ def ensure_runtime_indexes(data: dict, *, force: bool = False) -> dict:
             for track_id in buckets_df["track_id"].tolist()
             if _normalize_track_key(track_id)
         )
-    if course_bucket_map_df is not None and len(course_bucket_map_df) > 0 and "track_id" in course_bucket_map_df.columns:
-        track_ids.update(
-            _normalize_track_key(track_id)
-            for track_id in course_bucket_map_df["track_id"].tolist()
-            if _normalize_track_key(track_id)
-        )
 
-    ndc_groups = data.get("no_double_count_groups") or []
-
-    for track_key in sorted(track_ids):
-        track_index = _build_track_runtime_index(
-            buckets_df,
-            course_bucket_map_df,
-            courses_df,
-            equivalencies_df,
-            track_key,
-            double_count_policy_df=double_count_policy_df,
-            course_indexes=course_indexes,
-        )
-        if track_index is not None:
-            track_index["no_double_count_groups"] = ndc_groups
-            tracks[track_key] = track_index
+    track_fingerprints = _track_input_fingerprints(buckets_df, course_bucket_map_df)
+    reusable_tracks = (reusable_runtime_indexes or {}).get("tracks") or {}
+    reusable_fingerprints = (reusable_runtime_indexes or {}).get("track_fingerprints") or {}
+    previously_built = (
+        reusable_tracks.built() if isinstance(reusable_tracks, _LazyTrackIndexRegistry) else reusable_tracks
+    )
+    carried_over = {
+        track_key: previous_index
+        for track_key, previous_index in previously_built.items()
+        if track_key in track_fingerprints
+        and reusable_fingerprints.get(track_key) == track_fingerprints[track_key]
+    }
+    prereq_bitsets = _reusable_prereq_bitsets(
+        course_indexes["rows"],
+        data.get("prereq_map"),
+        data.get("runtime_indexes"),
+        reusable_runtime_indexes,
+    ) or PrereqBitsets(course_indexes["rows"], data.get("prereq_map") or {})
+    required_prereq_closure = _reusable_required_prereq_closure(
+        data.get("prereq_map"),
+        data.get("runtime_indexes"),
+        reusable_runtime_indexes,
+    ) or RequiredPrereqClosure(data.get("prereq_map") or {})
+    tracks = _LazyTrackIndexRegistry(
+        track_ids,
+        {
+            "buckets_df": buckets_df,
+            "course_bucket_map_df": course_bucket_map_df,
+            "courses_df": courses_df,
+            "equivalencies_df": equivalencies_df,
+            "double_count_policy_df": double_count_policy_df,
+            "course_indexes": course_indexes,
+            "prereq_bitsets": prereq_bitsets,
+            "equiv_map": data.get("equiv_prereq_map"),
+            "cross_listed_map": data.get("cross_listed_map"),
+            "no_double_count_groups": data.get("no_double_count_groups") or [],
+        },
+        prebuilt=carried_over,
+    )
+    if warm_tracks is not None:
+        tracks.warm(None if warm_tracks == "*" else warm_tracks)
 
     parent_type_map: dict[str, str] = {}
     parent_buckets_df = data.get("parent_buckets_df")
@@ -446,7 +812,12 @@ def ensure_runtime_indexes(data: dict, *, force: bool = False) -> dict:
 
     data["runtime_indexes"] = {
         "courses": course_indexes,
+        "courses_source": courses_df,
+        "prereq_cache": data.get("prereq_cache"),
+        "prereq_bitsets": prereq_bitsets,
+        "required_prereq_closure": required_prereq_closure,
         "tracks": tracks,
+        "track_fingerprints": track_fingerprints,
         "parent_type_map": parent_type_map,
     }
     return data
@@ -577,261 +948,327 @@ def _expand_map_with_equivalencies(
     return expanded
 
 
-def allocate_courses(
-    completed: list[str],
-    in_progress: list[str],
-    buckets_df: pd.DataFrame,
-    course_bucket_map_df: pd.DataFrame,
-    courses_df: pd.DataFrame,
-    equivalencies_df: pd.DataFrame = None,
-    track_id: str = DEFAULT_TRACK_ID,
-    double_count_policy_df: pd.DataFrame | None = None,
-    runtime_indexes: dict | None = None,
-) -> dict:
+class AllocationMemo:
     """
-    Deterministically allocate completed courses to requirement buckets.
-
-    completed courses count toward satisfaction.
-    in_progress courses are display-only and do not fill buckets.
+    Bounded LRU of allocation results shared by every AllocationState.
+
+    Keys are (track index memo_token, track key, completed courses as a
+    sorted tuple, in_progress in caller order). The token stands in for the
+    dataset version: every built track index gets a fresh one, so a rebuild
+    (new dataset, merged plan, changed rows) never shares entries, while a
+    track carried over by an incremental reload keeps its own. Entries hold
+    only the key and the pickled result, never the index, so max_bytes
+    bounds the memo's real footprint and old indexes are freed as soon as
+    their snapshot is; their entries simply age out. Completed order never
+    changes an allocation, but duplicates and in_progress order do, so
+    neither is a plain set. Results are pickled on insert and unpickled on
+    every hit: callers get a private copy they may mutate, and each entry is
+    weighed by its exact pickled size.
     """
-    if buckets_df is None or len(buckets_df) == 0:
-        return {
-            "applied_by_bucket": {},
-            "double_counted_courses": [],
-            "remaining": {},
-            "notes": [],
-            "bucket_order": [],
-        }
 
-    track_key = _normalize_track_key(track_id)
-    track_runtime = get_runtime_track_index(runtime_indexes, track_key)
-    if track_runtime is None:
-        track_runtime = _build_track_runtime_index(
-            buckets_df,
-            course_bucket_map_df,
-            courses_df,
-            equivalencies_df,
-            track_key,
-            double_count_policy_df=double_count_policy_df,
-        )
-    if track_runtime is None:
-        return {
-            "applied_by_bucket": {},
-            "double_counted_courses": [],
-            "remaining": {},
-            "notes": [],
-            "bucket_order": [],
-        }
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 8_000_000):
+        self._lock = threading.Lock()
+        self._items: OrderedDict[tuple, bytes] = OrderedDict()
+        self._total_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self.configure(max_entries=max_entries, max_bytes=max_bytes)
+
+    def configure(self, *, max_entries: int | None = None, max_bytes: int | None = None) -> None:
+        """Change the bounds; max_entries=0 disables memoization, max_bytes=0 means no byte cap."""
+        with self._lock:
+            if max_entries is not None:
+                self.max_entries = max(0, int(max_entries))
+            if max_bytes is not None:
+                self.max_bytes = max(0, int(max_bytes))
+            self._trim_locked()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    @staticmethod
+    def key(track_runtime: dict, track_key: str, completed, in_progress) -> tuple | None:
+        """Memo key, or None for a track index without a memo_token (not memoized)."""
+        token = track_runtime.get("memo_token")
+        if token is None:
+            return None
+        return (token, track_key, tuple(sorted(completed)), tuple(in_progress))
+
+    def get(self, key: tuple) -> dict | None:
+        with self._lock:
+            blob = self._items.get(key)
+            if blob is None:
+                self._misses += 1
+                return None
+            self._items.move_to_end(key)
+            self._hits += 1
+        return pickle.loads(blob)
+
+    def put(self, key: tuple, result: dict) -> None:
+        blob = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            if not self.enabled or (self.max_bytes > 0 and len(blob) > self.max_bytes):
+                return
+            previous = self._items.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= len(previous)
+            self._items[key] = blob
+            self._total_bytes += len(blob)
+            self._trim_locked()
+
+    def _trim_locked(self) -> None:
+        while self._items and (
+            len(self._items) > self.max_entries
+            or (self.max_bytes > 0 and self._total_bytes > self.max_bytes)
+        ):
+            _, blob = self._items.popitem(last=False)
+            self._total_bytes -= len(blob)
+            self._evictions += 1
 
-    bucket_order = list(track_runtime["bucket_order"])
-    course_bucket_index = track_runtime["course_bucket_index"]
-    bucket_course_index = track_runtime["bucket_course_index"]
-    base_bucket_course_index = track_runtime["base_bucket_course_index"]
-    equivalent_course_map = track_runtime.get("equivalent_course_map", {})
-    allowed_pairs = track_runtime["allowed_pairs"]
-    course_credits_index = dict(track_runtime["course_credits_index"])
-    course_level_index = dict(track_runtime["course_level_index"])
-    bucket_meta = {
-        bid: {
-            **meta,
-            "slots_used": 0,
-            "credits_used": 0,
-        }
-        for bid, meta in track_runtime["bucket_meta_template"].items()
-    }
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._total_bytes = 0
 
-    def get_course_credits(course_code: str) -> int:
-        return course_credits_index.get(course_code, 3)
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._items),
+                "bytes": self._total_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            }
 
-    def get_course_level(course_code: str) -> int | None:
-        return course_level_index.get(course_code)
 
-    def get_ordered_buckets_for_course(course_code: str) -> list[dict]:
-        result = []
-        course_level = get_course_level(course_code)
+# Process-wide memo for allocations against runtime track indexes.
+_ALLOCATION_MEMO = AllocationMemo()
 
-        for bid in course_bucket_index.get(course_code, []):
-            if bid not in bucket_meta:
-                continue
-            min_lvl = bucket_meta[bid].get("min_level")
-            if min_lvl is not None and course_level is not None and course_level < min_lvl:
-                continue
-            mode = str(bucket_meta.get(bid, {}).get("requirement_mode", "") or "").strip().lower()
-            result.append(
-                {
-                    "bucket_id": bid,
-                    "requirement_mode": mode,
-                    "priority": bucket_meta.get(bid, {}).get("priority", 99),
-                    "parent_bucket_id": str(bucket_meta.get(bid, {}).get("parent_bucket_id", "") or "").strip(),
-                    "double_count_family_id": str(
-                        bucket_meta.get(bid, {}).get("double_count_family_id", "") or ""
-                    ).strip(),
-                }
-            )
 
-        # Base deterministic order.
-        result.sort(
-            key=lambda b: (
-                int(b.get("priority", 99)),
-                str(b["bucket_id"]),
-            )
-        )
+def get_allocation_memo() -> AllocationMemo:
+    return _ALLOCATION_MEMO
 
-        return order_buckets_same_family(result)
 
-    def _primary_assignment_anchor(ordered_buckets: list[dict]) -> str:
-        non_elective, elective = _partition_assignment_buckets(ordered_buckets)
-        primary = non_elective if non_elective else elective
-        if not primary:
-            return ""
-        return str(primary[0].get("bucket_id", "") or "")
+def _empty_allocation() -> dict:
+    return {
+        "applied_by_bucket": {},
+        "double_counted_courses": [],
+        "remaining": {},
+        "notes": [],
+        "bucket_order": [],
+    }
 
-    def _overflow_tiebreak(course_code: str, ordered_buckets: list[dict]) -> str:
-        anchor = _primary_assignment_anchor(ordered_buckets)
-        seed = f"{track_key}|{anchor}|{course_code}"
-        return hashlib.sha256(seed.encode("utf-8")).hexdigest()
 
-    def slots_remaining(bid: str) -> int:
-        meta = bucket_meta[bid]
-        if meta["needed_count"] is not None:
-            return max(0, meta["needed_count"] - meta["slots_used"])
-        if meta["needed_credits"] is not None:
-            return max(0, meta["needed_credits"] - meta["credits_used"])
-        return 0
+class AllocationState:
+    """
+    Completed-course allocation for one track that grows by apply() and
+    branches by fork().
+
+    result(in_progress) returns exactly what allocate_courses() returns for
+    every course applied so far. Primary placements (step 2 of the
+    allocation) are kept between calls. Courses that sort after everything
+    already placed are placed on top; otherwise the primary pass replays
+    from the track index's precomputed per-course bucket orders. A fork copies the placements, so a
+    branch can apply courses without touching its parent. With a memo,
+    result() is looked up in it first (see AllocationMemo).
+    """
 
-    def progress_needed_credits(bid: str) -> int:
-        meta = bucket_meta[bid]
-        needed_credits = meta.get("needed_credits")
-        if needed_credits is not None:
-            return max(0, int(needed_credits))
+    def __init__(self, track_runtime: dict | None, track_key: str, *, memo: AllocationMemo | None = None):
+        self._track = track_runtime
+        self._track_key = track_key
+        self._memo = memo
+        self._entries: list[tuple[tuple, str]] = []
+        self._completed: list[str] = []
+        self._primary: dict | None = None
+        self._placed_count = 0
+
+    @property
+    def courses(self) -> list[str]:
+        """Completed courses applied so far, in apply order."""
+        return list(self._completed)
+
+    def apply(self, courses) -> "AllocationState":
+        """Add completed courses; returns self."""
+        for code in courses:
+            self._completed.append(code)
+            if self._track is None:
+                continue
+            entry = (self._course_info(code)[0], code)
+            position = bisect.bisect_right(self._entries, entry)
+            self._entries.insert(position, entry)
+            if position < self._placed_count:
+                self._primary = None
+                self._placed_count = 0
+        return self
+
+    def fork(self) -> "AllocationState":
+        """Independent copy; only the read-only track index is shared."""
+        branch = self._empty_branch()
+        branch._entries = list(self._entries)
+        branch._completed = list(self._completed)
+        branch._primary = _copy_primary_placements(self._primary)
+        branch._placed_count = self._placed_count
+        return branch
+
+    def extended_to(self, courses: list[str]) -> "AllocationState":
+        """
+        A state holding exactly `courses`.
+
+        Returns self when nothing changes, a fork with the extra courses
+        applied when `courses` only adds to this state, and a fresh state
+        otherwise.
+        """
+        missing = Counter(courses)
+        missing.subtract(self._completed)
+        if any(count < 0 for count in missing.values()):
+            return self._empty_branch().apply(courses)
+        extra: list[str] = []
+        for code in courses:
+            if missing[code] > 0:
+                missing[code] -= 1
+                extra.append(code)
+        if not extra:
+            return self
+        return self.fork().apply(extra)
+
+    def result(self, in_progress: list[str] | None = None) -> dict:
+        """Allocation output for the applied courses plus display-only in_progress."""
+        if self._track is None:
+            return _empty_allocation()
+        in_progress = list(in_progress or [])
+        memo_key = None
+        if self._memo is not None and self._memo.enabled:
+            memo_key = AllocationMemo.key(self._track, self._track_key, self._completed, in_progress)
+            cached = self._memo.get(memo_key) if memo_key is not None else None
+            if cached is not None:
+                return cached
+        self._place_primary()
+        result = self._finish(_copy_primary_placements(self._primary), in_progress)
+        if memo_key is not None:
+            self._memo.put(memo_key, result)
+        return result
 
-        needed_count = meta.get("needed_count")
-        if needed_count is None:
-            return 0
+    # ── internals ────────────────────────────────────────────────────────
 
-        mapped_courses = base_bucket_course_index.get(bid, [])
-        if (
-            str(meta.get("requirement_mode", "") or "").strip().lower() == "required"
-            and len(mapped_courses) == int(needed_count)
-        ):
-            return sum(get_course_credits(code) for code in mapped_courses)
+    def _empty_branch(self) -> "AllocationState":
+        return AllocationState(self._track, self._track_key, memo=self._memo)
 
-        return max(0, int(needed_count) * 3)
+    def _course_info(self, course_code: str) -> tuple:
+        info = self._track["course_allocation_order"].get(course_code)
+        if info is None:
+            # Not mapped to any bucket: never placed, but still needs a sort key.
+            info = _course_allocation_info(self._track_key, course_code, [])
+        return info
 
-    def is_full(bid: str) -> bool:
-        return slots_remaining(bid) <= 0
+    def _course_credits(self, course_code: str) -> int:
+        return self._track["course_credits_index"].get(course_code, 3)
 
-    applied: dict[str, dict] = {
-        bid: {
-            "completed_applied": [],
-            "in_progress_applied": [],
-            "credits_applied": 0,
-            "in_progress_credits_applied": 0,
-            "satisfied": False,
-        }
-        for bid in bucket_meta
-    }
-    double_counted: list[dict] = []
-    notes: list[str] = []
-    completed_assignments: list[dict[str, object]] = []
-    primary_filled_buckets: set[str] = set()
+    def _slots_remaining(self, primary: dict, bid: str) -> int:
+        meta = self._track["bucket_meta_template"][bid]
+        if meta["needed_count"] is not None:
+            return max(0, meta["needed_count"] - primary["slots_used"][bid])
+        if meta["needed_credits"] is not None:
+            return max(0, meta["needed_credits"] - primary["credits_used"][bid])
+        return 0
 
-    def update_satisfied(bid: str):
-        meta = bucket_meta[bid]
+    def _assign(self, primary: dict, course_code: str, bid: str, credits: int) -> None:
+        meta = self._track["bucket_meta_template"][bid]
+        applied = primary["applied"][bid]
+        applied["completed_applied"].append(course_code)
+        applied["credits_applied"] += credits
+        primary["slots_used"][bid] += 1
+        primary["credits_used"][bid] += credits
         if meta["needed_count"] is not None:
-            applied[bid]["satisfied"] = (
-                len(applied[bid]["completed_applied"]) >= meta["needed_count"]
-            )
+            applied["satisfied"] = len(applied["completed_applied"]) >= meta["needed_count"]
         elif meta["needed_credits"] is not None:
-            applied[bid]["satisfied"] = (
-                applied[bid]["credits_applied"] >= meta["needed_credits"]
-            )
+            applied["satisfied"] = applied["credits_applied"] >= meta["needed_credits"]
         else:
             # No count or credit threshold — vacuously satisfied
-            applied[bid]["satisfied"] = True
-
-    def assign_completed_to_bucket(course_code: str, bid: str, credits: int):
-        applied[bid]["completed_applied"].append(course_code)
-        applied[bid]["credits_applied"] += credits
-        bucket_meta[bid]["slots_used"] += 1
-        bucket_meta[bid]["credits_used"] += credits
-        update_satisfied(bid)
-
-    # Build no-double-count reverse index for credit blocking.
-    ndc_groups = track_runtime.get("no_double_count_groups") or []
-    ndc_course_to_group: dict[str, int] = {}
-    for gi, group in enumerate(ndc_groups):
-        for member in group:
-            ndc_course_to_group[member] = gi
-    ndc_allocated_groups: dict[int, str] = {}  # group_index → first allocated code
-
-    # Step 1: sort completed courses so the most constrained are assigned first.
-    # Sort key: (fewest primary buckets, anchor bucket id, stable hash tiebreak, code).
-    # The hash tiebreak keeps same-slot collisions deterministic across runs.
-    completed_with_buckets = []
-    for code in completed:
-        ordered_buckets = get_ordered_buckets_for_course(code)
-        non_elective, elective = _partition_assignment_buckets(ordered_buckets)
-        primary_buckets = non_elective if non_elective else elective
-        completed_with_buckets.append((code, ordered_buckets, primary_buckets))
-    completed_with_buckets.sort(
-        key=lambda item: (
-            len(item[2]),
-            _primary_assignment_anchor(item[1]),
-            _overflow_tiebreak(item[0], item[1]),
-            item[0],
-        )
-    )
-
-    # Step 2: assign completed courses.
-    for course_code, ordered_buckets, primary_buckets in completed_with_buckets:
-        if not primary_buckets:
-            continue
-        # No-double-count credit blocking: skip if another course in the
-        # same NDC group has already been allocated.
-        ndc_gi = ndc_course_to_group.get(course_code)
-        if ndc_gi is not None and ndc_gi in ndc_allocated_groups:
-            already = ndc_allocated_groups[ndc_gi]
-            notes.append(
-                f"{course_code} not counted toward progress — overlaps with {already} (no double credit)."
-            )
-            continue
-        credits = get_course_credits(course_code)
-        assigned_to: list[str] = []
-        non_elective_buckets, elective_buckets = _partition_assignment_buckets(ordered_buckets)
-        assignment_pool = non_elective_buckets if non_elective_buckets else elective_buckets
-
-        # Primary assignment: first eligible non-full bucket.
-        for bucket_info in assignment_pool:
-            bid = bucket_info["bucket_id"]
-            if is_full(bid):
+            applied["satisfied"] = True
+
+    def _place_primary(self) -> None:
+        """Step 2: give each completed course, in sort order, its primary bucket."""
+        if self._primary is None:
+            bucket_ids = list(self._track["bucket_meta_template"])
+            ndc_course_to_group: dict[str, int] = {}
+            for gi, group in enumerate(self._track.get("no_double_count_groups") or []):
+                for member in group:
+                    ndc_course_to_group[member] = gi
+            self._primary = {
+                "applied": {
+                    bid: {
+                        "completed_applied": [],
+                        "in_progress_applied": [],
+                        "credits_applied": 0,
+                        "in_progress_credits_applied": 0,
+                        "satisfied": False,
+                    }
+                    for bid in bucket_ids
+                },
+                "slots_used": dict.fromkeys(bucket_ids, 0),
+                "credits_used": dict.fromkeys(bucket_ids, 0),
+                "notes": [],
+                "completed_assignments": [],
+                "primary_filled_buckets": set(),
+                "ndc_course_to_group": ndc_course_to_group,
+                "ndc_allocated_groups": {},  # group_index → first allocated code
+            }
+            self._placed_count = 0
+
+        primary = self._primary
+        for _sort_key, course_code in self._entries[self._placed_count:]:
+            _, ordered_buckets, primary_buckets = self._course_info(course_code)
+            if not primary_buckets:
+                continue
+            # No-double-count credit blocking: skip if another course in the
+            # same NDC group has already been allocated.
+            ndc_gi = primary["ndc_course_to_group"].get(course_code)
+            if ndc_gi is not None and ndc_gi in primary["ndc_allocated_groups"]:
+                already = primary["ndc_allocated_groups"][ndc_gi]
+                primary["notes"].append(
+                    f"{course_code} not counted toward progress — overlaps with {already} (no double credit)."
+                )
                 continue
-            assign_completed_to_bucket(course_code, bid, credits)
-            assigned_to.append(bid)
-            break
-
-        # Overflow rule: if all non-elective buckets are already full, let the
-        # extra course spill into elective pools only.
-        if not assigned_to and non_elective_buckets and elective_buckets:
-            for bucket_info in elective_buckets:
+            credits = self._course_credits(course_code)
+            assigned_to: list[str] = []
+            non_elective_buckets, elective_buckets = _partition_assignment_buckets(ordered_buckets)
+            assignment_pool = non_elective_buckets if non_elective_buckets else elective_buckets
+
+            # Primary assignment: first eligible non-full bucket.
+            for bucket_info in assignment_pool:
                 bid = bucket_info["bucket_id"]
-                if is_full(bid):
+                if self._slots_remaining(primary, bid) <= 0:
                     continue
-                assign_completed_to_bucket(course_code, bid, credits)
+                self._assign(primary, course_code, bid, credits)
                 assigned_to.append(bid)
-                assignment_pool = elective_buckets
                 break
 
-        if not assigned_to:
-            continue
+            # Overflow rule: if all non-elective buckets are already full, let the
+            # extra course spill into elective pools only.
+            if not assigned_to and non_elective_buckets and elective_buckets:
+                for bucket_info in elective_buckets:
+                    bid = bucket_info["bucket_id"]
+                    if self._slots_remaining(primary, bid) <= 0:
+                        continue
+                    self._assign(primary, course_code, bid, credits)
+                    assigned_to.append(bid)
+                    break
 
-        # Mark NDC group as allocated so subsequent members are blocked.
-        if assigned_to and ndc_gi is not None:
-            ndc_allocated_groups[ndc_gi] = course_code
+            if not assigned_to:
+                continue
+
+            # Mark NDC group as allocated so subsequent members are blocked.
+            if ndc_gi is not None:
+                primary["ndc_allocated_groups"][ndc_gi] = course_code
 
-        if assigned_to:
-            primary_filled_buckets.add(assigned_to[0])
-            completed_assignments.append(
+            primary["primary_filled_buckets"].add(assigned_to[0])
+            primary["completed_assignments"].append(
                 {
                     "course_code": course_code,
                     "credits": credits,
@@ -840,142 +1277,251 @@ def allocate_courses(
                     "primary_bucket": assigned_to[0],
                 }
             )
+        self._placed_count = len(self._entries)
+
+    def _finish(self, primary: dict, in_progress: list[str]) -> dict:
+        """Steps 3-6 on a private copy of the primary placements."""
+        track = self._track
+        bucket_meta = track["bucket_meta_template"]
+        bucket_order = list(track["bucket_order"])
+        bucket_course_index = track["bucket_course_index"]
+        base_bucket_course_index = track["base_bucket_course_index"]
+        equivalent_course_map = track.get("equivalent_course_map", {})
+        double_count_policy = track["double_count_policy"]
+        applied = primary["applied"]
+        notes = primary["notes"]
+        primary_filled_buckets = primary["primary_filled_buckets"]
+        double_counted: list[dict] = []
+
+        # Step 3: add valid double-count placements after every course has a
+        # primary home. This preserves overflow behavior by preferring unique
+        # courses before reusing one across multiple buckets.
+        for assignment in primary["completed_assignments"]:
+            course_code = str(assignment["course_code"])
+            credits = int(assignment["credits"])
+            ordered_buckets = assignment["ordered_buckets"]
+            assigned_to = assignment["assigned_to"]
+            primary_bucket = str(assignment["primary_bucket"])
+
+            for bucket_info in ordered_buckets:
+                bid = bucket_info["bucket_id"]
+                if bid in assigned_to:
+                    continue
 
-    # Step 3: add valid double-count placements after every course has a
-    # primary home. This preserves overflow behavior by preferring unique
-    # courses before reusing one across multiple buckets.
-    for assignment in completed_assignments:
-        course_code = str(assignment["course_code"])
-        credits = int(assignment["credits"])
-        ordered_buckets = assignment["ordered_buckets"]
-        assigned_to = assignment["assigned_to"]
-        primary_bucket = str(assignment["primary_bucket"])
-
-        for bucket_info in ordered_buckets:
-            bid = bucket_info["bucket_id"]
-            if bid in assigned_to:
-                continue
-
-            if (
-                str(bucket_meta[bid].get("requirement_mode", "") or "").strip().lower() == "credits_pool"
-                and primary_bucket != bid
-                and bid in primary_filled_buckets
-            ):
-                continue
-
-            pairwise_ok = True
-            for existing in assigned_to:
-                if frozenset([existing, bid]) not in allowed_pairs:
-                    pairwise_ok = False
-                    break
-            if not pairwise_ok:
-                continue
+                if (
+                    str(bucket_meta[bid].get("requirement_mode", "") or "").strip().lower() == "credits_pool"
+                    and primary_bucket != bid
+                    and bid in primary_filled_buckets
+                ):
+                    continue
 
-            if is_full(bid):
-                notes.append(
-                    f"{course_code} could also count toward "
-                    f"{bucket_meta[bid]['label']} but that bucket is already satisfied."
-                )
-                continue
+                if not double_count_policy.allows_all(assigned_to, bid):
+                    continue
 
-            assign_completed_to_bucket(course_code, bid, credits)
-            assigned_to.append(bid)
+                if self._slots_remaining(primary, bid) <= 0:
+                    notes.append(
+                        f"{course_code} could also count toward "
+                        f"{bucket_meta[bid]['label']} but that bucket is already satisfied."
+                    )
+                    continue
 
-        if len(assigned_to) > 1:
-            double_counted.append(
-                {
-                    "course_code": course_code,
-                    "buckets": assigned_to,
-                }
-            )
+                self._assign(primary, course_code, bid, credits)
+                assigned_to.append(bid)
 
-    # Step 4: in-progress display only.
-    # Respect pairwise double-count policy so in-progress courses don't appear
-    # in multiple same-parent buckets simultaneously (visual double-count bug).
-    for course_code in in_progress:
-        eligible_buckets = [
-            {"bucket_id": bucket["bucket_id"]}
-            for bucket in get_ordered_buckets_for_course(course_code)
-        ]
-        credits = get_course_credits(course_code)
-        ip_assigned_to: list[str] = []
-        for bucket_info in eligible_buckets:
-            bid = bucket_info["bucket_id"]
-            if course_code in applied[bid]["in_progress_applied"]:
-                ip_assigned_to.append(bid)
-                continue
-            if not ip_assigned_to:
-                applied[bid]["in_progress_applied"].append(course_code)
-                applied[bid]["in_progress_credits_applied"] += credits
-                ip_assigned_to.append(bid)
-            else:
-                pairwise_ok = all(
-                    frozenset([existing, bid]) in allowed_pairs
-                    for existing in ip_assigned_to
+            if len(assigned_to) > 1:
+                double_counted.append(
+                    {
+                        "course_code": course_code,
+                        "buckets": assigned_to,
+                    }
                 )
-                if pairwise_ok:
+
+        # Step 4: in-progress display only.
+        # Respect pairwise double-count policy so in-progress courses don't appear
+        # in multiple same-parent buckets simultaneously (visual double-count bug).
+        for course_code in in_progress:
+            credits = self._course_credits(course_code)
+            ip_assigned_to: list[str] = []
+            for bucket_info in self._course_info(course_code)[1]:
+                bid = bucket_info["bucket_id"]
+                if course_code in applied[bid]["in_progress_applied"]:
+                    ip_assigned_to.append(bid)
+                    continue
+                if not ip_assigned_to:
                     applied[bid]["in_progress_applied"].append(course_code)
                     applied[bid]["in_progress_credits_applied"] += credits
                     ip_assigned_to.append(bid)
+                else:
+                    if double_count_policy.allows_all(ip_assigned_to, bid):
+                        applied[bid]["in_progress_applied"].append(course_code)
+                        applied[bid]["in_progress_credits_applied"] += credits
+                        ip_assigned_to.append(bid)
+
+        # Step 5: remaining view.
+        completed_set = set(self._completed)
+        in_progress_set = set(in_progress)
+        taken_with_equivalents = set(completed_set | in_progress_set)
+        for taken_code in list(taken_with_equivalents):
+            taken_with_equivalents.update(equivalent_course_map.get(taken_code, set()))
+        remaining: dict[str, dict] = {}
+        for bid in bucket_order:
+            if bid not in bucket_meta:
+                continue
+            meta = bucket_meta[bid]
+            slots = self._slots_remaining(primary, bid)
+            needed_val = (
+                meta["needed_count"] if meta["needed_count"] is not None else meta["needed_credits"]
+            )
+            requirement_mode = str(meta.get("requirement_mode", "") or "").strip().lower()
+            if requirement_mode == "required":
+                canonical_bucket_courses = base_bucket_course_index.get(bid, [])
+                remaining_courses = [
+                    code
+                    for code in canonical_bucket_courses
+                    if not ({code} | set(equivalent_course_map.get(code, set()))) & (completed_set | in_progress_set)
+                ]
+            else:
+                bucket_courses = bucket_course_index.get(bid, [])
+                remaining_courses = [c for c in bucket_courses if c not in taken_with_equivalents]
+            remaining[bid] = {
+                "needed": needed_val,
+                "slots_remaining": slots,
+                "remaining_courses": remaining_courses,
+                "label": meta["label"],
+                "is_credit_based": meta["needed_count"] is None,
+            }
+
+        # Step 6: finalized applied output.
+        applied_by_bucket: dict[str, dict] = {}
+        for bid in bucket_order:
+            if bid not in applied:
+                continue
+            meta = bucket_meta[bid]
+            applied_by_bucket[bid] = {
+                **applied[bid],
+                "label": meta["label"],
+                "needed": self._progress_needed_credits(bid),
+                "is_credit_based": meta["needed_count"] is None,
+                "needed_count": meta["needed_count"],
+                "configured_needed_count": meta.get("configured_needed_count"),
+                "requirement_mode": meta["requirement_mode"],
+                "count_strategy": meta.get("count_strategy", ""),
+            }
 
-    # Step 5: remaining view.
-    completed_set = set(completed)
-    in_progress_set = set(in_progress)
-    taken_with_equivalents = set(completed_set | in_progress_set)
-    for taken_code in list(taken_with_equivalents):
-        taken_with_equivalents.update(equivalent_course_map.get(taken_code, set()))
-    remaining: dict[str, dict] = {}
-    for bid in bucket_order:
-        if bid not in bucket_meta:
-            continue
-        meta = bucket_meta[bid]
-        slots = slots_remaining(bid)
-        needed_val = (
-            meta["needed_count"] if meta["needed_count"] is not None else meta["needed_credits"]
-        )
-        requirement_mode = str(meta.get("requirement_mode", "") or "").strip().lower()
-        if requirement_mode == "required":
-            canonical_bucket_courses = base_bucket_course_index.get(bid, [])
-            remaining_courses = [
-                code
-                for code in canonical_bucket_courses
-                if not ({code} | set(equivalent_course_map.get(code, set()))) & (completed_set | in_progress_set)
-            ]
-        else:
-            bucket_courses = bucket_course_index.get(bid, [])
-            remaining_courses = [c for c in bucket_courses if c not in taken_with_equivalents]
-        remaining[bid] = {
-            "needed": needed_val,
-            "slots_remaining": slots,
-            "remaining_courses": remaining_courses,
-            "label": meta["label"],
-            "is_credit_based": meta["needed_count"] is None,
+        return {
+            "applied_by_bucket": applied_by_bucket,
+            "double_counted_courses": double_counted,
+            "remaining": remaining,
+            "notes": notes,
+            "bucket_order": bucket_order,
         }
 
-    # Step 6: finalized applied output.
-    applied_by_bucket: dict[str, dict] = {}
-    for bid in bucket_order:
-        if bid not in applied:
-            continue
-        meta = bucket_meta[bid]
-        needed_val = (
-            meta["needed_count"] if meta["needed_count"] is not None else meta["needed_credits"]
-        )
-        applied_by_bucket[bid] = {
-            **applied[bid],
-            "label": meta["label"],
-            "needed": progress_needed_credits(bid),
-            "is_credit_based": meta["needed_count"] is None,
-            "needed_count": meta["needed_count"],
-            "configured_needed_count": meta.get("configured_needed_count"),
-            "requirement_mode": meta["requirement_mode"],
-            "count_strategy": meta.get("count_strategy", ""),
-        }
+    def _progress_needed_credits(self, bid: str) -> int:
+        meta = self._track["bucket_meta_template"][bid]
+        needed_credits = meta.get("needed_credits")
+        if needed_credits is not None:
+            return max(0, int(needed_credits))
+
+        needed_count = meta.get("needed_count")
+        if needed_count is None:
+            return 0
+
+        mapped_courses = self._track["base_bucket_course_index"].get(bid, [])
+        if (
+            str(meta.get("requirement_mode", "") or "").strip().lower() == "required"
+            and len(mapped_courses) == int(needed_count)
+        ):
+            return sum(self._course_credits(code) for code in mapped_courses)
+
+        return max(0, int(needed_count) * 3)
 
+
+def _copy_primary_placements(primary: dict | None) -> dict | None:
+    """Copy everything steps 3-6 (or a fork) may mutate."""
+    if primary is None:
+        return None
     return {
-        "applied_by_bucket": applied_by_bucket,
-        "double_counted_courses": double_counted,
-        "remaining": remaining,
-        "notes": notes,
-        "bucket_order": bucket_order,
+        **primary,
+        "applied": {
+            bid: {
+                **applied,
+                "completed_applied": list(applied["completed_applied"]),
+                "in_progress_applied": list(applied["in_progress_applied"]),
+            }
+            for bid, applied in primary["applied"].items()
+        },
+        "slots_used": dict(primary["slots_used"]),
+        "credits_used": dict(primary["credits_used"]),
+        "notes": list(primary["notes"]),
+        "completed_assignments": [
+            {**assignment, "assigned_to": list(assignment["assigned_to"])}
+            for assignment in primary["completed_assignments"]
+        ],
+        "primary_filled_buckets": set(primary["primary_filled_buckets"]),
+        "ndc_allocated_groups": dict(primary["ndc_allocated_groups"]),
     }
+
+
+def start_allocation(
+    completed: list[str],
+    buckets_df: pd.DataFrame,
+    course_bucket_map_df: pd.DataFrame,
+    courses_df: pd.DataFrame,
+    equivalencies_df: pd.DataFrame = None,
+    track_id: str = DEFAULT_TRACK_ID,
+    double_count_policy_df: pd.DataFrame | None = None,
+    runtime_indexes: dict | None = None,
+) -> AllocationState:
+    """
+    AllocationState for `completed`, taking the same inputs as
+    allocate_courses() minus in_progress (which is passed to result()).
+    """
+    track_key = _normalize_track_key(track_id)
+    track_runtime = None
+    memo = None
+    if buckets_df is not None and len(buckets_df) > 0:
+        track_runtime = get_runtime_track_index(runtime_indexes, track_key)
+        if track_runtime is not None:
+            # Only shared, long-lived indexes are worth memoizing against.
+            memo = _ALLOCATION_MEMO
+        else:
+            track_runtime = _build_track_runtime_index(
+                buckets_df,
+                course_bucket_map_df,
+                courses_df,
+                equivalencies_df,
+                track_key,
+                double_count_policy_df=double_count_policy_df,
+            )
+    return AllocationState(track_runtime, track_key, memo=memo).apply(completed)
+
+
+def allocate_courses(
+    completed: list[str],
+    in_progress: list[str],
+    buckets_df: pd.DataFrame,
+    course_bucket_map_df: pd.DataFrame,
+    courses_df: pd.DataFrame,
+    equivalencies_df: pd.DataFrame = None,
+    track_id: str = DEFAULT_TRACK_ID,
+    double_count_policy_df: pd.DataFrame | None = None,
+    runtime_indexes: dict | None = None,
+) -> dict:
+    """
+    Deterministically allocate completed courses to requirement buckets.
+
+    completed courses count toward satisfaction.
+    in_progress courses are display-only and do not fill buckets.
+    Callers that allocate a growing course set should keep an AllocationState
+    from start_allocation() instead.
+    """
+    return start_allocation(
+        completed,
+        buckets_df,
+        course_bucket_map_df,
+        courses_df,
+        equivalencies_df,
+        track_id=track_id,
+        double_count_policy_df=double_count_policy_df,
+        runtime_indexes=runtime_indexes,
+    ).result(in_progress)
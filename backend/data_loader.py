@@ -1,10 +1,18 @@
+import hashlib
 import os
 import re
+import sys
+import time
+import tracemalloc
+
+# Ensure backend/ is on sys.path so sibling imports also work under
+# `python -m backend.data_loader`.
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 import pandas as pd
 
-from allocator import ensure_runtime_indexes
-from prereq_parser import parse_prereqs
+from allocator import ensure_runtime_indexes, refresh_course_offering_indexes
+from prereq_parser import PrereqCache
 
 
 class _CsvDirSource:
@@ -25,6 +33,61 @@ class _CsvDirSource:
         return sheet in self.sheet_names
 
 
+def _count_rows(value) -> int:
+    if isinstance(value, pd.DataFrame):
+        return len(value)
+    if isinstance(value, (tuple, list)):
+        return sum(len(item) for item in value if isinstance(item, pd.DataFrame))
+    if isinstance(value, (dict, set)):
+        return len(value)
+    return 0
+
+
+class LoadProfiler:
+    """
+    Per-stage wall time, row counts, and (optionally) peak allocation for one
+    load_data()/reload_data() call.
+
+    Rows in/out are the total DataFrame rows passed to and returned by a stage
+    (entries, for dict outputs). Peak allocation uses tracemalloc and is only
+    collected with trace_memory=True, since tracing slows loading severalfold.
+    """
+
+    def __init__(self, *, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.stages: list[dict] = []
+        self._started = time.perf_counter()
+
+    def run(self, stage: str, func, *args, rows_out=None, **kwargs):
+        """Call func(*args, **kwargs) and record it under `stage`."""
+        rows_in = _count_rows(list(args) + list(kwargs.values()))
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            baseline_bytes = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        result = func(*args, **kwargs)
+        record = {
+            "stage": stage,
+            "wall_ms": round((time.perf_counter() - started) * 1000.0, 2),
+            "rows_in": rows_in,
+            "rows_out": rows_out(result) if rows_out is not None else _count_rows(result),
+        }
+        if tracing:
+            record["peak_alloc_kb"] = round(
+                max(0, tracemalloc.get_traced_memory()[1] - baseline_bytes) / 1024.0, 1
+            )
+        self.stages.append(record)
+        return result
+
+    def summary(self, mode: str) -> dict:
+        return {
+            "mode": mode,
+            "total_ms": round((time.perf_counter() - self._started) * 1000.0, 2),
+            "stages": list(self.stages),
+        }
+
+
 _BOOL_TRUTHY = {"true", "1", "yes", "y"}
 _REQUIRED_V2_SHEETS = {
     "programs",
@@ -94,6 +157,22 @@ def _safe_bool_col(df: pd.DataFrame, col: str) -> pd.DataFrame:
     return df
 
 
+def _text_column(df: pd.DataFrame, col: str) -> pd.Series:
+    """Column as stripped strings ("" for missing values or a missing column)."""
+    if col not in df.columns:
+        return pd.Series("", index=df.index, dtype=str)
+    return df[col].fillna("").astype(str).str.strip()
+
+
+def _frame_or_empty(df: pd.DataFrame) -> pd.DataFrame:
+    """Return df, or a column-less frame when it has no rows.
+
+    Normalizers fill defaults for absent columns, so an empty result is
+    passed the same way a row-built `pd.DataFrame([])` would be.
+    """
+    return df if len(df) > 0 else pd.DataFrame()
+
+
 def _parse_flag_set(raw) -> list[str]:
     ordered: list[str] = []
     seen: set[str] = set()
@@ -865,16 +944,24 @@ def _resolve_runtime_needed_counts(
                 group_metadata,
             )
 
-    for idx, row in merged_sub.iterrows():
-        if count_strategy.loc[idx] != "canonical_mapped":
-            continue
-        key = (
-            str(row.get("program_id", "") or "").strip().upper(),
-            str(row.get("sub_bucket_id", "") or "").strip(),
-        )
-        derived_count = mapped_counts.get(key)
-        if derived_count:
-            effective_needed_count.loc[idx] = derived_count
+    if not mapped_counts:
+        return effective_needed_count, count_strategy
+    mapped_counts_df = pd.DataFrame(
+        [(program_id, sub_bucket_id, count) for (program_id, sub_bucket_id), count in mapped_counts.items()],
+        columns=["program_id", "sub_bucket_id", "derived_count"],
+    )
+    keys = pd.DataFrame(
+        {
+            "program_id": _text_column(merged_sub, "program_id").str.upper().to_numpy(),
+            "sub_bucket_id": _text_column(merged_sub, "sub_bucket_id").to_numpy(),
+        }
+    )
+    derived_count = pd.Series(
+        keys.merge(mapped_counts_df, on=["program_id", "sub_bucket_id"], how="left")["derived_count"].to_numpy(),
+        index=merged_sub.index,
+    )
+    use_derived = (count_strategy == "canonical_mapped") & derived_count.notna() & (derived_count != 0)
+    effective_needed_count = effective_needed_count.where(~use_derived, derived_count)
 
     return effective_needed_count, count_strategy
 
@@ -891,141 +978,92 @@ def _convert_parent_child_model_to_v2(
     cb = _normalize_child_buckets_df(child_buckets_df)
     mbc = _normalize_master_bucket_courses_df(master_bucket_courses_df)
 
-    # Build V2 programs from parent buckets.
-    programs_rows = []
-    parent_meta: dict[str, dict] = {}
-    for _, row in pb.iterrows():
-        pid = str(row["parent_bucket_id"]).strip().upper()
-        ptype = str(row.get("type", "major") or "major").strip().lower()
-        parent_major = str(row.get("parent_major", "") or "").strip().upper()
-        family = str(row.get("double_count_family_id", "") or "").strip().upper()
-        active = bool(row.get("active", True))
-        req_primary = bool(row.get("requires_primary_major", False))
-        is_universal = ptype == "universal"
-        required_major_id = str(row.get("required_major", "") or "").strip().upper()
-        is_default = bool(row.get("is_default", False))
-
-        kind = "minor" if ptype == "minor" else ("track" if ptype == "track" else "major")
-        program_parent = parent_major if kind == "track" else ""
-        programs_rows.append(
-            {
-                "program_id": pid,
-                "program_label": str(row.get("parent_bucket_label", pid) or pid).strip(),
-                "kind": kind,
-                "parent_major_id": program_parent,
-                "active": active,
-                "requires_primary_major": req_primary,
-                "applies_to_all": is_universal,
-                "required_major_id": required_major_id,
-                "is_default": is_default,
-                "college_alias": str(row.get("college_alias", "") or "").strip().lower(),
-            }
+    # Every parent bucket is its own program scope (majors, tracks, minors,
+    # universal), so children and mappings are owned by their parent id.
+    parent_ids = pb["parent_bucket_id"]
+    parent_labels = pb["parent_bucket_label"].where(pb["parent_bucket_label"] != "", parent_ids)
+    kind = pb["type"].map({"minor": "minor", "track": "track"}).fillna("major")
+    programs_df = _normalize_programs_df(
+        _frame_or_empty(
+            pd.DataFrame(
+                {
+                    "program_id": parent_ids,
+                    "program_label": parent_labels,
+                    "kind": kind,
+                    "parent_major_id": pb["parent_major"].where(kind == "track", ""),
+                    "active": pb["active"].astype(bool),
+                    "requires_primary_major": pb["requires_primary_major"].astype(bool),
+                    "applies_to_all": pb["type"] == "universal",
+                    "required_major_id": pb["required_major"],
+                    "is_default": pb["is_default"].astype(bool),
+                    "college_alias": pb["college_alias"],
+                }
+            )
         )
-        parent_meta[pid] = {
-            "type": ptype,
-            "parent_major": parent_major,
-            "double_count_family_id": family or pid,
-            "label": str(row.get("parent_bucket_label", pid) or pid).strip(),
-            "active": active,
-            "display_parent_alias": str(row.get("display_parent_alias", "") or "").strip().upper(),
-            "planner_parent_priority": int(row.get("planner_parent_priority", 2) or 2),
-        }
-    programs_df = _normalize_programs_df(pd.DataFrame(programs_rows))
-
-    # Build V2 buckets with majors/tracks/minors as standalone programs.
-    bucket_rows: list[dict] = []
-    child_rows: list[dict] = []
-    map_rows: list[dict] = []
-    parent_owner: dict[str, tuple[str, str]] = {}
-
-    for parent_id, meta in parent_meta.items():
-        ptype = meta["type"]
-        parent_major = meta["parent_major"]
-        family = str(meta.get("double_count_family_id", "") or "").strip().upper() or parent_id
-        active = bool(meta["active"])
-        label = str(meta["label"] or parent_id)
-        display_parent_alias = str(meta.get("display_parent_alias", "") or "").strip().upper()
-        planner_parent_priority = int(meta.get("planner_parent_priority", 2) or 2)
-
-        if ptype == "track":
-            owner_program = parent_id
-            track_required = ""
-        elif ptype == "minor":
-            owner_program = parent_id   # minor owns its own bucket scope
-            track_required = ""          # no track_required linkage
-        else:
-            owner_program = parent_id
-            track_required = ""
+    )
 
-        parent_owner[parent_id] = (owner_program, track_required)
-        bucket_rows.append(
-            {
-                "program_id": owner_program,
-                "bucket_id": parent_id,
-                "bucket_label": label,
-                "priority": planner_parent_priority,
-                "track_required": track_required,
-                "double_count_family_id": family,
-                "active": active,
-                "display_parent_alias": display_parent_alias,
-                "planner_parent_priority": planner_parent_priority,
-            }
-        )
+    # One bucket per parent id: first-seen order, last-seen values.
+    parents = pb.assign(parent_bucket_label=parent_labels)
+    first_seen = parent_ids.drop_duplicates(keep="first")
+    parents = parents.drop_duplicates("parent_bucket_id", keep="last").set_index("parent_bucket_id")
+    parents = parents.loc[first_seen.to_numpy()]
+    parent_priority = parents["planner_parent_priority"].astype(int)
+    parent_priority = parent_priority.where(parent_priority != 0, 2)
+    parent_family = parents["double_count_family_id"]
+    bucket_frame = pd.DataFrame(
+        {
+            "program_id": parents.index,
+            "bucket_id": parents.index,
+            "bucket_label": parents["parent_bucket_label"].to_numpy(),
+            "priority": parent_priority.to_numpy(),
+            "track_required": "",
+            "double_count_family_id": parent_family.where(parent_family != "", parents.index.to_series()).to_numpy(),
+            "active": parents["active"].astype(bool).to_numpy(),
+            "display_parent_alias": parents["display_parent_alias"].to_numpy(),
+            "planner_parent_priority": parent_priority.to_numpy(),
+        }
+    )
 
-    child_lookup: dict[tuple[str, str], tuple[str, str]] = {}
-    for _, row in cb.iterrows():
-        parent_id = str(row.get("parent_bucket_id", "") or "").strip().upper()
-        if not parent_id:
-            continue
-        owner_program, track_required = parent_owner.get(parent_id, (parent_id, ""))
-        child_id = str(row.get("child_bucket_id", "") or "").strip().upper()
-        if not child_id:
-            continue
-        mode = str(row.get("requirement_mode", "required") or "required").strip().lower()
-        courses_required = row.get("courses_required")
-        credits_required = row.get("credits_required")
-        child_rows.append(
-            {
-                "program_id": owner_program,
-                "bucket_id": parent_id,
-                "sub_bucket_id": child_id,
-                "sub_bucket_label": str(row.get("child_bucket_label", child_id) or child_id).strip(),
-                "courses_required": courses_required,
-                "credits_required": credits_required,
-                "count_strategy": str(row.get("count_strategy", "manual") or "manual").strip().lower(),
-                "min_level": row.get("min_level"),
-                "role": _map_requirement_mode_to_role(mode),
-                "requirement_mode": mode,
-                # Priority intentionally omitted (NaN) so runtime derives deterministic order.
-                "priority": None,
-                "notes": str(row.get("notes", "") or "").strip(),
-                "planner_tier": row.get("planner_tier"),
-                "planner_bucket_rank": row.get("planner_bucket_rank"),
-                "bucket_flags": str(row.get("bucket_flags", "") or "").strip().lower(),
-                "dynamic_pool_tag": str(row.get("dynamic_pool_tag", "") or "").strip().lower(),
-                "dynamic_pool_exclusive": bool(row.get("dynamic_pool_exclusive", False)),
-            }
-        )
-        child_lookup[(parent_id, child_id)] = (owner_program, track_required)
+    children = cb[(cb["parent_bucket_id"] != "") & (cb["child_bucket_id"] != "")]
+    child_frame = pd.DataFrame(
+        {
+            "program_id": children["parent_bucket_id"],
+            "bucket_id": children["parent_bucket_id"],
+            "sub_bucket_id": children["child_bucket_id"],
+            "sub_bucket_label": children["child_bucket_label"].where(
+                children["child_bucket_label"] != "",
+                children["child_bucket_id"],
+            ),
+            "courses_required": children["courses_required"],
+            "credits_required": children["credits_required"],
+            "count_strategy": children["count_strategy"],
+            "min_level": children["min_level"],
+            "role": children["requirement_mode"].map(_map_requirement_mode_to_role),
+            "requirement_mode": children["requirement_mode"],
+            # Priority intentionally omitted (NaN) so runtime derives deterministic order.
+            "priority": pd.Series(None, index=children.index, dtype=object),
+            "notes": children["notes"].str.strip(),
+            "planner_tier": children["planner_tier"],
+            "planner_bucket_rank": children["planner_bucket_rank"],
+            "bucket_flags": children["bucket_flags"].astype(str).str.strip().str.lower(),
+            "dynamic_pool_tag": children["dynamic_pool_tag"],
+            "dynamic_pool_exclusive": children["dynamic_pool_exclusive"].astype(bool),
+        }
+    )
 
-    for _, row in mbc.iterrows():
-        parent_id = str(row.get("parent_bucket_id", "") or "").strip().upper()
-        child_id = str(row.get("child_bucket_id", "") or "").strip().upper()
-        if not parent_id or not child_id:
-            continue
-        owner_program, _ = child_lookup.get((parent_id, child_id), parent_owner.get(parent_id, (parent_id, "")))
-        map_rows.append(
-            {
-                "program_id": owner_program,
-                "sub_bucket_id": child_id,
-                "course_code": str(row.get("course_code", "") or "").strip(),
-                "notes": str(row.get("notes", "") or "").strip(),
-            }
-        )
+    mappings = mbc[(mbc["parent_bucket_id"] != "") & (mbc["child_bucket_id"] != "")]
+    map_frame = pd.DataFrame(
+        {
+            "program_id": mappings["parent_bucket_id"],
+            "sub_bucket_id": mappings["child_bucket_id"],
+            "course_code": mappings["course_code"],
+            "notes": mappings["notes"].str.strip(),
+        }
+    )
 
-    v2_buckets_df = _normalize_v2_buckets_df(pd.DataFrame(bucket_rows))
-    v2_sub_buckets_df = _normalize_v2_sub_buckets_df(pd.DataFrame(child_rows))
-    v2_courses_all_buckets_df = _normalize_v2_courses_all_buckets_df(pd.DataFrame(map_rows))
+    v2_buckets_df = _normalize_v2_buckets_df(_frame_or_empty(bucket_frame).reset_index(drop=True))
+    v2_sub_buckets_df = _normalize_v2_sub_buckets_df(_frame_or_empty(child_frame).reset_index(drop=True))
+    v2_courses_all_buckets_df = _normalize_v2_courses_all_buckets_df(_frame_or_empty(map_frame).reset_index(drop=True))
 
     return programs_df, v2_buckets_df, v2_sub_buckets_df, v2_courses_all_buckets_df
 
@@ -1274,14 +1312,15 @@ def _normalize_offering_rows(
         src = src[src["term_code"] != ""]
         src["semester_label"] = src["term_code"].apply(_term_code_to_label)
 
-        for _, row in src.iterrows():
-            code = str(row.get("course_code", "")).strip()
-            label = str(row.get("semester_label", "")).strip()
-            if not code or not label:
-                continue
-            offered = bool(row.get("offered", False))
-            course_terms.setdefault(code, {})
-            course_terms[code][label] = course_terms[code].get(label, False) or offered
+        labelled = src.assign(semester_label=src["semester_label"].astype(str).str.strip())
+        labelled = labelled[labelled["semester_label"] != ""]
+        offered_any = (
+            labelled.assign(offered=labelled["offered"].astype(bool))
+            .groupby(["course_code", "semester_label"], sort=False)["offered"]
+            .any()
+        )
+        for (code, label), offered in offered_any.items():
+            course_terms.setdefault(code, {})[label] = bool(offered)
         ordered_semesters = sorted(
             {str(v).strip() for v in src["semester_label"].tolist() if str(v).strip()},
             key=_semester_sort_key,
@@ -1296,20 +1335,19 @@ def _normalize_offering_rows(
     if not semester_cols:
         return {}, []
 
-    for col in semester_cols:
-        src[col] = src[col].apply(
-            lambda v: False if pd.isna(v) else (
-                v if isinstance(v, bool) else str(v).strip().lower() in {"1", "true", "yes", "y"}
-            )
-        )
-
-    for _, row in src.iterrows():
-        code = str(row.get("course_code", "")).strip()
-        if not code:
-            continue
-        course_terms.setdefault(code, {})
-        for sem_col in semester_cols:
-            course_terms[code][sem_col] = bool(row.get(sem_col, False))
+    # str(True) lowers to "true" and missing values to "nan"/"none", so one
+    # string test covers bools, truthy text, and blanks.
+    offered_flags = pd.DataFrame(
+        {
+            col: src[col].astype(str).str.strip().str.lower().isin({"1", "true", "yes", "y"}).to_numpy()
+            for col in semester_cols
+        },
+        index=src["course_code"].to_numpy(),
+    )
+    # Repeated course rows overwrite earlier ones, as row-by-row assignment did.
+    offered_flags = offered_flags[~offered_flags.index.duplicated(keep="last")]
+    for code, flags in zip(offered_flags.index, offered_flags.to_numpy().tolist()):
+        course_terms[code] = dict(zip(semester_cols, flags))
     return course_terms, semester_cols
 
 
@@ -1398,38 +1436,42 @@ def _synthesize_dynamic_elective_pool_mappings(
     if len(tagged) == 0:
         return course_bucket_map_df, 0
 
-    new_rows: list[dict] = []
-    for _, bucket in dynamic_buckets.iterrows():
-        track_id = str(bucket.get("track_id", "") or "").strip().upper()
-        bucket_id = str(bucket.get("bucket_id", "") or "").strip()
-        if not track_id or not bucket_id:
-            continue
-
-        dynamic_pool_tag = str(bucket.get("dynamic_pool_tag", "") or "").strip().lower()
-        if not dynamic_pool_tag:
-            continue
-
-        min_level = pd.to_numeric(bucket.get("min_level"), errors="coerce")
-        eligible = tagged[tagged["elective_pool_tag"] == dynamic_pool_tag]
-        if pd.notna(min_level):
-            eligible = eligible[eligible["level"].fillna(-1) >= float(min_level)]
-        if len(eligible) == 0:
-            continue
-
-        for course_code in eligible["course_code"].tolist():
-            new_rows.append(
-                {
-                    "track_id": track_id,
-                    "course_code": str(course_code).strip(),
-                    "bucket_id": bucket_id,
-                    "notes": f"dynamic:elective_pool_tag={dynamic_pool_tag}",
-                }
-            )
-
-    if not new_rows:
+    dynamic_buckets = pd.DataFrame(
+        {
+            "track_id": _text_column(dynamic_buckets, "track_id").str.upper(),
+            "bucket_id": _text_column(dynamic_buckets, "bucket_id"),
+            "elective_pool_tag": _text_column(dynamic_buckets, "dynamic_pool_tag").str.lower(),
+            "min_level": pd.to_numeric(dynamic_buckets.get("min_level"), errors="coerce"),
+        }
+    )
+    dynamic_buckets = dynamic_buckets[
+        (dynamic_buckets["track_id"] != "")
+        & (dynamic_buckets["bucket_id"] != "")
+        & (dynamic_buckets["elective_pool_tag"] != "")
+    ]
+    # Pair every dynamic bucket with the tagged courses in its pool, keeping
+    # bucket order first and catalog order second.
+    pairs = (
+        dynamic_buckets.assign(_bucket_pos=range(len(dynamic_buckets)))
+        .merge(
+            tagged.assign(_course_pos=range(len(tagged))),
+            on="elective_pool_tag",
+            how="inner",
+        )
+        .sort_values(["_bucket_pos", "_course_pos"], kind="stable")
+    )
+    pairs = pairs[pairs["min_level"].isna() | (pairs["level"].fillna(-1) >= pairs["min_level"])]
+    if len(pairs) == 0:
         return course_bucket_map_df, 0
 
-    synthesized_df = pd.DataFrame(new_rows)
+    synthesized_df = pd.DataFrame(
+        {
+            "track_id": pairs["track_id"].to_numpy(),
+            "course_code": pairs["course_code"].to_numpy(),
+            "bucket_id": pairs["bucket_id"].to_numpy(),
+            "notes": ("dynamic:elective_pool_tag=" + pairs["elective_pool_tag"]).to_numpy(),
+        }
+    )
     merged = pd.concat([course_bucket_map_df.copy(), synthesized_df], ignore_index=True)
     merged = merged.drop_duplicates(subset=["track_id", "bucket_id", "course_code"], keep="first")
     return merged, len(synthesized_df)
@@ -1760,29 +1802,34 @@ def _load_v2_equivalencies(xl: pd.ExcelFile, sheet_set: set[str]) -> pd.DataFram
 
 def _unpivot_wide_equivalencies(eq: pd.DataFrame) -> pd.DataFrame:
     """Unpivot wide-format equivalencies (one row per group) into internal long format."""
-    rows = []
-    for _, r in eq.iterrows():
-        raw_id = r.get("id", "")
-        gid = "" if pd.isna(raw_id) else str(raw_id).strip()
-        if not gid:
-            continue
-        raw_type = r.get("type", "equivalent")
-        rtype = ("equivalent" if pd.isna(raw_type) else str(raw_type).strip().lower()) or "equivalent"
-        raw_scope = r.get("parent_bucket", "")
-        scope = "" if pd.isna(raw_scope) else str(raw_scope).strip()
-        for col in ("course_1", "course_2", "course_3"):
-            raw = r.get(col, "")
-            code = "" if pd.isna(raw) else str(raw).strip()
-            if code:
-                rows.append({
-                    "equiv_group_id": gid,
-                    "course_code": code,
-                    "relation_type": rtype,
-                    "label": "",
-                    "scope_program_id": scope,
-                })
-
-    out = pd.DataFrame(rows, columns=["equiv_group_id", "course_code", "relation_type", "label", "scope_program_id"])
+    columns = ["equiv_group_id", "course_code", "relation_type", "label", "scope_program_id"]
+    group_ids = _text_column(eq, "id")
+    relation_types = _text_column(eq, "type").str.lower()
+    relation_types = relation_types.where(relation_types != "", "equivalent")
+    scopes = _text_column(eq, "parent_bucket")
+
+    course_cols = [col for col in ("course_1", "course_2", "course_3") if col in eq.columns]
+    if course_cols and len(eq) > 0:
+        base = pd.DataFrame(
+            {
+                "equiv_group_id": group_ids,
+                "relation_type": relation_types,
+                "scope_program_id": scopes,
+                "_row_pos": range(len(eq)),
+            }
+        )
+        long = pd.concat(
+            [
+                base.assign(course_code=_text_column(eq, col), _col_pos=col_pos)
+                for col_pos, col in enumerate(course_cols)
+            ],
+            ignore_index=True,
+        )
+        long = long[(long["equiv_group_id"] != "") & (long["course_code"] != "")]
+        long = long.sort_values(["_row_pos", "_col_pos"], kind="stable")
+        out = long.assign(label="")[columns].reset_index(drop=True)
+    else:
+        out = pd.DataFrame(columns=columns)
     if len(out) > 0:
         invalid_mask = ~out["relation_type"].isin(_VALID_RELATION_TYPES)
         if invalid_mask.any():
@@ -1792,26 +1839,77 @@ def _unpivot_wide_equivalencies(eq: pd.DataFrame) -> pd.DataFrame:
     return out
 
 
-def load_data(data_path: str) -> dict:
-    """Load workbook using parent/child schema or legacy V2 compatibility schema.
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
 
-    Accepts either:
-    - A path to a .xlsx workbook (original behavior).
-    - A path to a directory of CSV files (one per sheet, e.g. data/).
+
+def compute_sheet_digests(data_path: str) -> dict[str, str]:
+    """Return a SHA-256 content digest per sheet.
+
+    CSV directories hash each `<sheet>.csv` file; a workbook is hashed as a
+    single `workbook` entry because its sheets share one file.
     """
     if os.path.isdir(data_path):
-        xl = _CsvDirSource(data_path)
-    else:
-        xl = pd.ExcelFile(data_path)
-    sheet_set = set(xl.sheet_names)
+        return {
+            name[:-4]: _file_sha256(os.path.join(data_path, name))
+            for name in sorted(os.listdir(data_path))
+            if name.endswith(".csv")
+        }
+    return {"workbook": _file_sha256(data_path)}
+
+
+# Sheets consumed by each load stage. Sheets outside every stage (quips,
+# policies, ...) never reach the runtime dataset, so edits to them neither
+# change the dataset version nor trigger a reload.
+_COURSE_STAGE_SHEETS = frozenset({
+    "courses",
+    "course_hard_prereqs",
+    "course_soft_prereqs",
+    "course_prereqs",
+})
+# Offerings only touch the offered_* columns, so an offerings-only edit
+# re-applies the overlay onto the cached catalog instead of reparsing it.
+_OFFERING_STAGE_SHEETS = frozenset({"course_offerings"})
+_BUCKET_STAGE_SHEETS = frozenset({
+    "parent_buckets",
+    "child_buckets",
+    _CANONICAL_MAP_SHEET,
+    _LEGACY_CANONICAL_MAP_SHEET,
+    _LEGACY_MAP_SHEET,
+    "programs",
+    "buckets",
+    "sub_buckets",
+    "double_count_policy",
+})
+_EQUIVALENCY_STAGE_SHEETS = frozenset({"course_equivalencies"})
+_LOAD_STAGE_SHEETS = {
+    "courses": _COURSE_STAGE_SHEETS,
+    "offerings": _OFFERING_STAGE_SHEETS,
+    "buckets": _BUCKET_STAGE_SHEETS,
+    "equivalencies": _EQUIVALENCY_STAGE_SHEETS,
+}
+_WORKBOOK_DIGEST_KEY = "workbook"
+RUNTIME_SHEETS = frozenset().union(*_LOAD_STAGE_SHEETS.values())
+
+
+def compute_data_version(sheet_digests: dict[str, str]) -> str:
+    """Collapse the digests of runtime sheets into one short dataset version."""
+    digest = hashlib.sha256()
+    for sheet in sorted(sheet_digests):
+        if sheet not in RUNTIME_SHEETS and sheet != _WORKBOOK_DIGEST_KEY:
+            continue
+        digest.update(f"{sheet}:{sheet_digests[sheet]}\n".encode("utf-8"))
+    return digest.hexdigest()[:16]
 
-    if "courses" not in sheet_set:
-        raise ValueError("Workbook must contain a 'courses' sheet.")
 
+def _load_bucket_stage(xl, sheet_set: set[str], profiler: LoadProfiler) -> dict:
+    """Parse program/bucket sheets into the V2 frames and tracks table."""
     has_parent_child = _REQUIRED_PARENT_CHILD_SHEETS.issubset(sheet_set)
     map_sheet = None
-
-    courses_df = xl.parse("courses")
     parent_buckets_df = pd.DataFrame()
     child_buckets_df = pd.DataFrame()
     master_bucket_courses_df = pd.DataFrame()
@@ -1831,10 +1929,18 @@ def load_data(data_path: str) -> dict:
                 f"'{_CANONICAL_MAP_SHEET}'."
             )
 
-        parent_buckets_df = _normalize_parent_buckets_df(xl.parse("parent_buckets"))
-        child_buckets_df = _normalize_child_buckets_df(xl.parse("child_buckets"))
+        parent_buckets_df = profiler.run(
+            "normalize_parent_buckets", _normalize_parent_buckets_df, xl.parse("parent_buckets")
+        )
+        child_buckets_df = profiler.run(
+            "normalize_child_buckets", _normalize_child_buckets_df, xl.parse("child_buckets")
+        )
         if map_sheet == _CANONICAL_MAP_SHEET:
-            master_bucket_courses_df = _normalize_master_bucket_courses_df(xl.parse(map_sheet))
+            master_bucket_courses_df = profiler.run(
+                "normalize_master_bucket_courses",
+                _normalize_master_bucket_courses_df,
+                xl.parse(map_sheet),
+            )
         elif map_sheet == _LEGACY_CANONICAL_MAP_SHEET:
             legacy_map = _normalize_v2_courses_all_buckets_df(xl.parse(map_sheet))
             master_bucket_courses_df = _normalize_master_bucket_courses_df(
@@ -1856,7 +1962,9 @@ def load_data(data_path: str) -> dict:
                 )
             )
 
-        master_bucket_courses_df, elective_mappings_removed = _purge_elective_mappings(
+        master_bucket_courses_df, elective_mappings_removed = profiler.run(
+            "purge_elective_mappings",
+            _purge_elective_mappings,
             child_buckets_df,
             master_bucket_courses_df,
         )
@@ -1866,7 +1974,9 @@ def load_data(data_path: str) -> dict:
             v2_buckets_df,
             v2_sub_buckets_df,
             v2_courses_all_buckets_df,
-        ) = _convert_parent_child_model_to_v2(
+        ) = profiler.run(
+            "convert_parent_child_model_to_v2",
+            _convert_parent_child_model_to_v2,
             parent_buckets_df,
             child_buckets_df,
             master_bucket_courses_df,
@@ -1910,6 +2020,32 @@ def load_data(data_path: str) -> dict:
             }
         )
 
+    return {
+        "has_parent_child": has_parent_child,
+        "map_sheet": map_sheet,
+        "elective_mappings_removed": elective_mappings_removed,
+        "parent_buckets_df": parent_buckets_df,
+        "child_buckets_df": child_buckets_df,
+        "master_bucket_courses_df": master_bucket_courses_df,
+        "v2_programs_df": v2_programs_df,
+        "v2_buckets_df": v2_buckets_df,
+        "v2_sub_buckets_df": v2_sub_buckets_df,
+        "v2_courses_all_buckets_df": v2_courses_all_buckets_df,
+        "v2_double_count_policy_df": v2_double_count_policy_df,
+        "tracks_df": _build_tracks_from_programs(v2_programs_df),
+    }
+
+
+def _parse_prereq_map(courses_df: pd.DataFrame, prereq_cache: PrereqCache) -> dict:
+    return {
+        code: prereq_cache.compile(prereq_hard)
+        for code, prereq_hard in zip(courses_df["course_code"].tolist(), courses_df["prereq_hard"].tolist())
+    }
+
+
+def _load_course_stage(xl, sheet_set: set[str], profiler: LoadProfiler) -> dict:
+    """Parse the course catalog, overlay prereq/offering sheets, and parse prereqs."""
+    courses_df = xl.parse("courses")
     course_hard_prereqs_df = (
         xl.parse("course_hard_prereqs") if "course_hard_prereqs" in sheet_set else pd.DataFrame()
     )
@@ -1917,26 +2053,16 @@ def load_data(data_path: str) -> dict:
         xl.parse("course_soft_prereqs") if "course_soft_prereqs" in sheet_set else pd.DataFrame()
     )
     course_prereqs_df = xl.parse("course_prereqs") if "course_prereqs" in sheet_set else pd.DataFrame()
-    course_offerings_df = xl.parse("course_offerings") if "course_offerings" in sheet_set else pd.DataFrame()
     if len(course_hard_prereqs_df) > 0 or len(course_soft_prereqs_df) > 0:
-        courses_df = _overlay_course_hard_prereqs(courses_df, course_hard_prereqs_df)
-        courses_df = _overlay_course_soft_prereqs(courses_df, course_soft_prereqs_df)
+        courses_df = profiler.run(
+            "overlay_course_hard_prereqs", _overlay_course_hard_prereqs, courses_df, course_hard_prereqs_df
+        )
+        courses_df = profiler.run(
+            "overlay_course_soft_prereqs", _overlay_course_soft_prereqs, courses_df, course_soft_prereqs_df
+        )
     else:
-        courses_df = _overlay_course_prereqs(courses_df, course_prereqs_df)
-    courses_df = _overlay_course_offerings(courses_df, course_offerings_df)
-
-    equivalencies_df = _load_v2_equivalencies(xl, sheet_set)
-    tracks_df = _build_tracks_from_programs(v2_programs_df)
-    buckets_df, course_bucket_map_df = _derive_runtime_from_v2(
-        v2_buckets_df,
-        v2_sub_buckets_df,
-        v2_courses_all_buckets_df,
-        equivalencies_df=equivalencies_df,
-    )
-
-    # Normalize booleans on course offering flags for runtime consumers.
-    for col in ["offered_fall", "offered_spring", "offered_summer"]:
-        courses_df = _safe_bool_col(courses_df, col)
+        courses_df = profiler.run("overlay_course_prereqs", _overlay_course_prereqs, courses_df, course_prereqs_df)
+    courses_df = _apply_course_offerings(courses_df, xl, sheet_set, profiler)
 
     courses_df["course_code"] = courses_df["course_code"].fillna("").astype(str).str.strip()
     courses_df["prereq_hard"] = courses_df.get("prereq_hard", pd.Series(dtype=str)).fillna("none")
@@ -1953,20 +2079,94 @@ def load_data(data_path: str) -> dict:
         .str.lower()
     )
 
-    course_bucket_map_df, dynamic_mappings_added = _synthesize_dynamic_elective_pool_mappings(
+    # not_frequently_offered tag injection disabled — offering filtering is off.
+    catalog_codes = set(c for c in courses_df["course_code"].tolist() if c)
+
+    # One cache per catalog load; ensure_runtime_indexes() reuses it for
+    # prereq_concurrent, so each distinct string is parsed once per version.
+    prereq_cache = PrereqCache()
+    prereq_map = profiler.run("parse_prereqs", _parse_prereq_map, courses_df, prereq_cache)
+
+    return {
+        "courses_df": courses_df,
+        "catalog_codes": catalog_codes,
+        "prereq_map": prereq_map,
+        "prereq_cache": prereq_cache,
+    }
+
+
+def _apply_course_offerings(
+    courses_df: pd.DataFrame,
+    xl,
+    sheet_set: set[str],
+    profiler: LoadProfiler,
+) -> pd.DataFrame:
+    course_offerings_df = xl.parse("course_offerings") if "course_offerings" in sheet_set else pd.DataFrame()
+    courses_df = profiler.run(
+        "overlay_course_offerings", _overlay_course_offerings, courses_df, course_offerings_df
+    )
+    # Normalize booleans on course offering flags for runtime consumers.
+    for col in ["offered_fall", "offered_spring", "offered_summer"]:
+        courses_df = _safe_bool_col(courses_df, col)
+    return courses_df
+
+
+def _reload_offering_stage(course_stage: dict, xl, sheet_set: set[str], profiler: LoadProfiler) -> dict:
+    """Re-apply offerings onto a cached catalog; prereqs and codes are reused."""
+    return dict(
+        course_stage,
+        courses_df=_apply_course_offerings(course_stage["courses_df"], xl, sheet_set, profiler),
+    )
+
+
+def _load_equivalency_stage(xl, sheet_set: set[str], profiler: LoadProfiler) -> dict:
+    """Load equivalency rows and the lookup maps derived from them."""
+    equivalencies_df = profiler.run("load_equivalencies", _load_v2_equivalencies, xl, sheet_set)
+    return {
+        "equivalencies_df": equivalencies_df,
+        "equiv_prereq_map": _build_equiv_prereq_map(equivalencies_df),
+        "cross_listed_map": _build_cross_listed_map(equivalencies_df),
+        "no_double_count_groups": _build_no_double_count_groups(equivalencies_df),
+    }
+
+
+def _assemble_runtime_data(
+    bucket_stage: dict,
+    course_stage: dict,
+    equivalency_stage: dict,
+    sheet_digests: dict[str, str],
+    profiler: LoadProfiler,
+    *,
+    mode: str = "full",
+    course_indexes: dict | None = None,
+    reusable_runtime_indexes: dict | None = None,
+) -> dict:
+    """Join stage outputs into the runtime dataset and build runtime indexes."""
+    courses_df = course_stage["courses_df"]
+    catalog_codes = course_stage["catalog_codes"]
+    prereq_map = course_stage["prereq_map"]
+    equivalencies_df = equivalency_stage["equivalencies_df"]
+    has_parent_child = bucket_stage["has_parent_child"]
+    map_sheet = bucket_stage["map_sheet"]
+    elective_mappings_removed = bucket_stage["elective_mappings_removed"]
+
+    buckets_df, course_bucket_map_df = profiler.run(
+        "derive_runtime_from_v2",
+        _derive_runtime_from_v2,
+        bucket_stage["v2_buckets_df"],
+        bucket_stage["v2_sub_buckets_df"],
+        bucket_stage["v2_courses_all_buckets_df"],
+        equivalencies_df=equivalencies_df,
+    )
+
+    course_bucket_map_df, dynamic_mappings_added = profiler.run(
+        "synthesize_dynamic_elective_pool_mappings",
+        _synthesize_dynamic_elective_pool_mappings,
         courses_df,
         buckets_df,
         course_bucket_map_df,
     )
 
-    # not_frequently_offered tag injection disabled — offering filtering is off.
-    catalog_codes = set(c for c in courses_df["course_code"].tolist() if c)
-
-    prereq_map: dict = {}
-    for _, row in courses_df.iterrows():
-        code = row["course_code"]
-        prereq_map[code] = parse_prereqs(row.get("prereq_hard", "none"))
-
     # Startup integrity checks.
     map_codes = set(course_bucket_map_df["course_code"].astype(str).str.strip().tolist())
     orphaned_codes = sorted(map_codes - catalog_codes)
@@ -2008,28 +2208,228 @@ def load_data(data_path: str) -> dict:
     else:
         print("[INFO] Loaded legacy V2 workbook model (compatibility mode).")
 
+    v2_courses_all_buckets_df = bucket_stage["v2_courses_all_buckets_df"]
     data = {
         "courses_df": courses_df,
         "equivalencies_df": equivalencies_df,
-        "equiv_prereq_map": _build_equiv_prereq_map(equivalencies_df),
-        "cross_listed_map": _build_cross_listed_map(equivalencies_df),
-        "no_double_count_groups": _build_no_double_count_groups(equivalencies_df),
+        "equiv_prereq_map": equivalency_stage["equiv_prereq_map"],
+        "cross_listed_map": equivalency_stage["cross_listed_map"],
+        "no_double_count_groups": equivalency_stage["no_double_count_groups"],
         "buckets_df": buckets_df,
         "course_bucket_map_df": course_bucket_map_df,
-        "tracks_df": tracks_df,
+        "tracks_df": bucket_stage["tracks_df"],
         "catalog_codes": catalog_codes,
         "prereq_map": prereq_map,
+        "prereq_cache": course_stage["prereq_cache"],
         "v2_detected": True,
         "parent_child_detected": has_parent_child,
-        "parent_buckets_df": parent_buckets_df,
-        "child_buckets_df": child_buckets_df,
-        "master_bucket_courses_df": master_bucket_courses_df,
-        "v2_programs_df": v2_programs_df,
-        "v2_buckets_df": v2_buckets_df,
-        "v2_sub_buckets_df": v2_sub_buckets_df,
+        "parent_buckets_df": bucket_stage["parent_buckets_df"],
+        "child_buckets_df": bucket_stage["child_buckets_df"],
+        "master_bucket_courses_df": bucket_stage["master_bucket_courses_df"],
+        "v2_programs_df": bucket_stage["v2_programs_df"],
+        "v2_buckets_df": bucket_stage["v2_buckets_df"],
+        "v2_sub_buckets_df": bucket_stage["v2_sub_buckets_df"],
         "v2_courses_all_buckets_df": v2_courses_all_buckets_df,
         # Backward-compatible alias for callers not yet migrated.
         "v2_course_sub_buckets_df": v2_courses_all_buckets_df,
-        "v2_double_count_policy_df": v2_double_count_policy_df,
+        "v2_double_count_policy_df": bucket_stage["v2_double_count_policy_df"],
+        "sheet_digests": sheet_digests,
+        "data_version": compute_data_version(sheet_digests),
+        # Stage outputs kept for reload_data(); values are shared, not copied.
+        "load_stages": {
+            "buckets": bucket_stage,
+            "courses": course_stage,
+            "equivalencies": equivalency_stage,
+        },
     }
-    return ensure_runtime_indexes(data)
+    data = profiler.run(
+        "ensure_runtime_indexes",
+        ensure_runtime_indexes,
+        data,
+        course_indexes=course_indexes,
+        reusable_runtime_indexes=reusable_runtime_indexes,
+        rows_out=lambda indexed: len(indexed["runtime_indexes"]["tracks"]),
+    )
+    data["load_profile"] = profiler.summary(mode)
+    return data
+
+
+def _open_source(data_path: str):
+    if os.path.isdir(data_path):
+        xl = _CsvDirSource(data_path)
+    else:
+        xl = pd.ExcelFile(data_path)
+    sheet_set = set(xl.sheet_names)
+    if "courses" not in sheet_set:
+        raise ValueError("Workbook must contain a 'courses' sheet.")
+    return xl, sheet_set
+
+
+def load_data(data_path: str, profiler: LoadProfiler | None = None) -> dict:
+    """Load workbook using parent/child schema or legacy V2 compatibility schema.
+
+    Accepts either:
+    - A path to a .xlsx workbook (original behavior).
+    - A path to a directory of CSV files (one per sheet, e.g. data/).
+
+    Per-stage timings are stored under data["load_profile"]; pass a
+    LoadProfiler(trace_memory=True) to also record peak allocations.
+    """
+    profiler = profiler or LoadProfiler()
+    sheet_digests = profiler.run("compute_sheet_digests", compute_sheet_digests, data_path)
+    xl, sheet_set = _open_source(data_path)
+    bucket_stage = _load_bucket_stage(xl, sheet_set, profiler)
+    course_stage = _load_course_stage(xl, sheet_set, profiler)
+    equivalency_stage = _load_equivalency_stage(xl, sheet_set, profiler)
+    return _assemble_runtime_data(bucket_stage, course_stage, equivalency_stage, sheet_digests, profiler)
+
+
+def changed_load_stages(previous_digests: dict[str, str], sheet_digests: dict[str, str]) -> set[str]:
+    """Return the load stages whose input sheets differ between two digest maps."""
+    changed_sheets = {
+        sheet
+        for sheet in set(previous_digests) | set(sheet_digests)
+        if previous_digests.get(sheet) != sheet_digests.get(sheet)
+    }
+    return {
+        stage
+        for stage, stage_sheets in _LOAD_STAGE_SHEETS.items()
+        if changed_sheets & stage_sheets
+    }
+
+
+def reload_data(data_path: str, previous: dict | None) -> dict:
+    """Reload a CSV directory, rebuilding only stages whose sheets changed.
+
+    Unchanged stage outputs (and the course runtime index when the catalog is
+    untouched) are reused from `previous`. Workbooks, or datasets loaded
+    without stage outputs, fall back to a full load_data().
+    """
+    previous = previous or {}
+    previous_stages = previous.get("load_stages")
+    previous_digests = previous.get("sheet_digests")
+    if not previous_stages or previous_digests is None or not os.path.isdir(data_path):
+        return load_data(data_path)
+
+    profiler = LoadProfiler()
+    sheet_digests = profiler.run("compute_sheet_digests", compute_sheet_digests, data_path)
+    dirty_stages = changed_load_stages(previous_digests, sheet_digests)
+    if not dirty_stages:
+        data = dict(previous)
+        data["sheet_digests"] = sheet_digests
+        return data
+
+    xl, sheet_set = _open_source(data_path)
+    bucket_stage = (
+        _load_bucket_stage(xl, sheet_set, profiler) if "buckets" in dirty_stages else previous_stages["buckets"]
+    )
+    previous_course_indexes = (previous.get("runtime_indexes") or {}).get("courses")
+    course_indexes = None
+    if "courses" in dirty_stages:
+        course_stage = _load_course_stage(xl, sheet_set, profiler)
+    elif "offerings" in dirty_stages:
+        course_stage = _reload_offering_stage(previous_stages["courses"], xl, sheet_set, profiler)
+        if previous_course_indexes is not None:
+            course_indexes = refresh_course_offering_indexes(
+                previous_course_indexes,
+                course_stage["courses_df"],
+            )
+    else:
+        course_stage = previous_stages["courses"]
+        course_indexes = previous_course_indexes
+    equivalency_stage = (
+        _load_equivalency_stage(xl, sheet_set, profiler)
+        if "equivalencies" in dirty_stages
+        else previous_stages["equivalencies"]
+    )
+    # Track indexes read course credits/levels, equivalencies, and the policy
+    # table, so per-track reuse is only safe when none of those moved.
+    reusable_runtime_indexes = None
+    if (
+        course_indexes is not None
+        and "equivalencies" not in dirty_stages
+        and bucket_stage["v2_double_count_policy_df"].equals(
+            previous_stages["buckets"]["v2_double_count_policy_df"]
+        )
+    ):
+        reusable_runtime_indexes = previous.get("runtime_indexes")
+    print(f"[INFO] Incremental reload rebuilt stage(s): {', '.join(sorted(dirty_stages))}.")
+    return _assemble_runtime_data(
+        bucket_stage,
+        course_stage,
+        equivalency_stage,
+        sheet_digests,
+        profiler,
+        mode="incremental",
+        course_indexes=course_indexes,
+        reusable_runtime_indexes=reusable_runtime_indexes,
+    )
+
+
+def format_load_profile(profile: dict) -> str:
+    """Render a load_profile dict as a fixed-width table."""
+    stages = profile.get("stages") or []
+    show_memory = any("peak_alloc_kb" in stage for stage in stages)
+    width = max([len("stage")] + [len(stage["stage"]) for stage in stages])
+    header = f"{'stage':<{width}}  {'wall_ms':>9}"
+    if show_memory:
+        header += f"  {'peak_kb':>9}"
+    header += f"  {'rows_in':>8}  {'rows_out':>8}"
+    lines = [header, "-" * len(header)]
+    for stage in stages:
+        line = f"{stage['stage']:<{width}}  {stage['wall_ms']:>9.1f}"
+        if show_memory:
+            line += f"  {stage.get('peak_alloc_kb', 0.0):>9.1f}"
+        line += f"  {stage['rows_in']:>8}  {stage['rows_out']:>8}"
+        lines.append(line)
+    lines.append("-" * len(header))
+    lines.append(f"{'total (' + profile.get('mode', 'full') + ')':<{width}}  {profile.get('total_ms', 0.0):>9.1f}")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Load MarqBot runtime data and report per-stage cost.")
+    parser.add_argument(
+        "data_path",
+        nargs="?",
+        default=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data"),
+        help="CSV directory or .xlsx workbook (default: data/).",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Trace peak allocation per stage and build every track index (slower).",
+    )
+    parser.add_argument("--json", action="store_true", help="Print the profile as JSON.")
+    args = parser.parse_args(argv)
+
+    if args.profile:
+        tracemalloc.start()
+    profiler = LoadProfiler(trace_memory=args.profile)
+    data = load_data(args.data_path, profiler)
+    if args.profile:
+        # Track indexes are built lazily at runtime; build them all here so
+        # their cost shows up next to the load stages.
+        tracks = data["runtime_indexes"]["tracks"]
+        profiler.run("build_track_indexes", tracks.warm, rows_out=lambda built: built)
+        tracemalloc.stop()
+    profile = profiler.summary(data["load_profile"]["mode"])
+    profile["prereq_cache"] = data["prereq_cache"].stats()
+
+    if args.json:
+        print(json.dumps(profile, indent=2))
+    else:
+        print(format_load_profile(profile))
+        cache_stats = profile["prereq_cache"]
+        print(
+            f"prereq cache: {cache_stats['distinct']} distinct string(s), "
+            f"{cache_stats['lookups']} lookup(s), hit rate {cache_stats['hit_rate']:.1%}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
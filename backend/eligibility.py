@@ -1,6 +1,6 @@
 import re
 import pandas as pd
-from prereq_parser import prereq_course_codes, prereqs_satisfied, build_prereq_check_string
+from prereq_parser import prereq_course_codes, prereqs_satisfied, build_prereq_check_string, compile_prereqs
 from requirements import (
     SOFT_WARNING_TAGS,
     COMPLEX_PREREQ_TAGS,
@@ -12,6 +12,8 @@ from requirements import (
 from unlocks import build_reverse_prereq_map
 from allocator import (
     get_runtime_course_index,
+    get_runtime_prereq_bitsets,
+    get_runtime_prereq_cache,
     get_runtime_track_index,
     _build_track_equivalent_course_map,
     _safe_bool,
@@ -386,6 +388,104 @@ def _prereqs_satisfied_for_semester(
     return prereqs_satisfied(parsed, prereq_source, equiv_map=equiv_map)
 
 
+def _bitset_prereqs_satisfied(
+    prereq_pos: int,
+    *,
+    allow_concurrent: bool,
+    has_explicit_concurrent: bool,
+    hard_on_completed,
+    hard_on_semester,
+    concurrent_on_semester,
+) -> bool:
+    """_prereqs_satisfied_for_semester() read off precomputed PrereqBitsets vectors."""
+    if has_explicit_concurrent:
+        return bool(hard_on_completed[prereq_pos] and concurrent_on_semester[prereq_pos])
+    if allow_concurrent:
+        return bool(hard_on_semester[prereq_pos])
+    return bool(hard_on_completed[prereq_pos])
+
+
+def _prereqs_satisfied_without_semester(
+    *,
+    prereq_pos: int | None,
+    prereq_vectors: dict | None,
+    parsed: dict,
+    parsed_concurrent: dict,
+    allow_concurrent: bool,
+    has_explicit_concurrent: bool,
+    completed_set: set[str],
+    satisfied_codes: set[str],
+    equiv_map: dict[str, set[str]] | None,
+) -> bool:
+    if prereq_pos is not None and prereq_vectors is not None:
+        return _bitset_prereqs_satisfied(
+            prereq_pos,
+            allow_concurrent=allow_concurrent,
+            has_explicit_concurrent=has_explicit_concurrent,
+            **prereq_vectors,
+        )
+    return _prereqs_satisfied_for_semester(
+        parsed=parsed,
+        parsed_concurrent=parsed_concurrent,
+        allow_concurrent=allow_concurrent,
+        has_explicit_concurrent=has_explicit_concurrent,
+        completed_set=completed_set,
+        satisfied_codes=satisfied_codes,
+        semester_codes=set(),
+        equiv_map=equiv_map,
+    )
+
+
+def _with_equivalents(codes: set[str], equiv_map: dict[str, set[str]] | None) -> set[str]:
+    """codes plus their one-hop equivalents, as prereqs_satisfied() expands them."""
+    expanded = set(codes)
+    if equiv_map:
+        for code in codes:
+            expanded.update(equiv_map.get(code, set()))
+    return expanded
+
+
+def _semester_prereq_watchers(prepared_candidates: list[dict], semester_codes: set[str]) -> dict[str, list[dict]]:
+    """
+    Reverse prereq map restricted to same-semester edges: course code ->
+    pending candidates whose outcome can change when that code is taken in the
+    same semester (concurrent prereqs, or hard prereqs when concurrency is
+    allowed). The shared reverse_map only carries hard-prereq edges.
+    """
+    watchers: dict[str, list[dict]] = {}
+    for candidate in prepared_candidates:
+        if candidate["manual_review"] or candidate["code"] in semester_codes:
+            continue
+        if candidate["has_explicit_concurrent"]:
+            watched_codes = prereq_course_codes(candidate["parsed_concurrent"])
+        elif candidate["allow_concurrent"]:
+            watched_codes = prereq_course_codes(candidate["parsed"])
+        else:
+            continue
+        for watched_code in dict.fromkeys(watched_codes):
+            watchers.setdefault(watched_code, []).append(candidate)
+    return watchers
+
+
+def _semester_prereqs_hold(
+    candidate: dict,
+    *,
+    semester_satisfied: set[str],
+    completed_set: set[str],
+    equiv_map: dict[str, set[str]] | None,
+    prereq_vectors: dict | None,
+) -> bool:
+    """Re-check a semester-sensitive candidate against an equivalency-expanded semester set."""
+    if candidate["has_explicit_concurrent"]:
+        prereq_pos = candidate["prereq_pos"]
+        if prereq_pos is not None and prereq_vectors is not None:
+            hard_ok = bool(prereq_vectors["hard_on_completed"][prereq_pos])
+        else:
+            hard_ok = prereqs_satisfied(candidate["parsed"], completed_set, equiv_map=equiv_map)
+        return hard_ok and prereqs_satisfied(candidate["parsed_concurrent"], semester_satisfied)
+    return prereqs_satisfied(candidate["parsed"], semester_satisfied)
+
+
 def _missing_from(
     parsed_req: dict,
     source: set[str],
@@ -425,9 +525,9 @@ def _same_semester_prereqs(
     allow_concurrent: bool,
     has_explicit_concurrent: bool,
     satisfied_codes: set[str],
-    semester_codes: set[str],
+    extra_semester_codes: set[str],
 ) -> list[str]:
-    extra_semester_codes = set(semester_codes) - satisfied_codes
+    """Same-semester courses this candidate leans on; extra_semester_codes excludes satisfied_codes."""
     if not extra_semester_codes:
         return []
     if has_explicit_concurrent:
@@ -666,7 +766,42 @@ def get_course_eligible_buckets(
     return order_buckets_same_family(result)
 
 
-def get_eligible_courses(
+def _candidate_course_rows(
+    course_rows: list[dict],
+    prereq_bitsets,
+    runtime_track: dict,
+    allocator_remaining: dict,
+    unmet_remaining_courses: set[str],
+    *,
+    include_swap_pool: bool,
+    equiv_map: dict[str, set[str]] | None,
+) -> list[dict]:
+    """
+    Catalog rows that can matter to this request, in catalog order.
+
+    A row is only returned when it maps to a track bucket (an open one unless
+    include_swap_pool) or bridges to an unmet course, and it can only affect
+    same-semester concurrency as a prereq ancestor of such a row. So the scan
+    is the prereq closure of open-bucket courses; the swap pool starts from
+    the track's whole candidate universe instead.
+    """
+    if include_swap_pool:
+        seeds = set(runtime_track["candidate_universe"])
+    else:
+        seeds = set()
+        bucket_course_index = runtime_track.get("bucket_course_index", {})
+        for bucket_id, remaining in allocator_remaining.items():
+            if (remaining or {}).get("slots_remaining", 0) > 0:
+                seeds.update(bucket_course_index.get(bucket_id, ()))
+    seeds |= unmet_remaining_courses
+    owner_pos = prereq_bitsets.owner_pos
+    positions = sorted(
+        owner_pos[code] for code in prereq_bitsets.ancestors(seeds, equiv_map) if code in owner_pos
+    )
+    return [course_rows[pos] for pos in positions]
+
+
+def _collect_eligible_courses(
     courses_df: pd.DataFrame,
     completed: list[str],
     in_progress: list[str],
@@ -681,40 +816,19 @@ def get_eligible_courses(
     runtime_indexes: dict | None = None,
     *,
     selected_program_ids: list[str] | None = None,
-    restrict_to_unmet_buckets: bool = True,
+    include_swap_pool: bool = False,
     is_honors_student: bool = False,
     equiv_map: dict[str, set[str]] | None = None,
     cross_listed_map: dict[str, set[str]] | None = None,
     current_standing: int = 0,
     student_stage: str | None = None,
-) -> list[dict]:
+) -> list[tuple[dict, bool]]:
     """
-    Returns eligible courses for the target term, sorted by:
-      1. Primary bucket priority (ascending = most important first)
-      2. Multi-bucket score (descending = more unmet buckets filled = better)
-      3. Prerequisite level (ascending = earlier classes first)
-
-    Eligible = not yet taken AND prereqs satisfied AND not manual_review.
-    Term offering is warning-only in recommendation mode (no hard exclusion).
+    Build eligibility rows for get_eligible_courses() / get_eligible_course_views().
 
-    Each returned dict:
-    {
-      "course_code": str,
-      "course_name": str,
-      "credits": int,
-      "primary_bucket": str,          # bucket_id of highest-priority bucket
-      "primary_bucket_label": str,
-      "fills_buckets": [str, ...],    # all bucket_ids this course can fill
-      "multi_bucket_score": int,      # count of unmet buckets filled
-      "prereq_check": str,            # human-readable prereq label
-      "has_soft_requirement": bool,
-      "soft_tags": [str, ...],        # non-blocking soft tags
-      "all_soft_tags": [str, ...],    # full prereq_soft tags (internal ranking helper)
-      "manual_review": bool,          # True if prereq_hard is unsupported
-      "low_confidence": bool,         # offering_confidence != high
-      "notes": str | None,            # course notes from sheet
-      "unlocks": [],                  # filled in by server.py
-    }
+    Returns unsorted (row, recommendable) pairs. A row is recommendable when it
+    fills an unmet bucket or bridges to one; with include_swap_pool, rows that
+    only map to already-met buckets are kept too, flagged not recommendable.
     """
     completed_set = set(completed)
     in_progress_set = set(in_progress)
@@ -845,6 +959,35 @@ def get_eligible_courses(
     if course_rows is None:
         course_rows = [row for _, row in courses_df.iterrows()]
 
+    # With runtime indexes, prereqs for the whole catalog are evaluated as a
+    # few bitset passes up front; rows without a compiled prereq fall back to
+    # prereqs_satisfied().
+    prereq_bitsets = (
+        get_runtime_prereq_bitsets(runtime_indexes, prereq_map) if runtime_courses is not None else None
+    )
+    prereq_vectors = None
+    if prereq_bitsets is not None:
+        satisfied_bits = prereq_bitsets.bitset(satisfied_codes, equiv_map)
+        prereq_vectors = {
+            "hard_on_completed": prereq_bitsets.hard.evaluate(prereq_bitsets.bitset(completed_set, equiv_map)),
+            "hard_on_semester": prereq_bitsets.hard.evaluate(satisfied_bits),
+            "concurrent_on_semester": prereq_bitsets.concurrent.evaluate(satisfied_bits),
+        }
+        if (
+            runtime_track is not None
+            and runtime_track.get("candidate_universe") is not None
+            and len(course_rows) == len(prereq_bitsets)
+        ):
+            course_rows = _candidate_course_rows(
+                course_rows,
+                prereq_bitsets,
+                runtime_track,
+                allocator_remaining or {},
+                unmet_remaining_courses,
+                include_swap_pool=include_swap_pool,
+                equiv_map=equiv_map,
+            )
+
     prepared_candidates: list[dict] = []
     semester_candidate_codes: set[str] = set()
 
@@ -883,8 +1026,10 @@ def get_eligible_courses(
         if parsed_concurrent is None:
             parsed_concurrent = prereq_map.get(f"{code}::__concurrent__")
         if parsed_concurrent is None:
-            from prereq_parser import parse_prereqs
-            parsed_concurrent = parse_prereqs(raw_concurrent if not _is_none_prereq(raw_concurrent) else "none")
+            parsed_concurrent = compile_prereqs(
+                raw_concurrent if not _is_none_prereq(raw_concurrent) else "none",
+                get_runtime_prereq_cache(runtime_indexes),
+            )
 
         manual_review = parsed["type"] == "unsupported"
         soft_tags = row.get("soft_tags")
@@ -896,15 +1041,20 @@ def get_eligible_courses(
         allow_concurrent = any(tag in CONCURRENT_TAGS for tag in soft_tags)
         has_explicit_concurrent = not _is_none_prereq(raw_concurrent)
 
-        prereq_ok_without_semester = _prereqs_satisfied_for_semester(
-            parsed=parsed,
-            parsed_concurrent=parsed_concurrent,
+        prereq_pos = prereq_bitsets.owner_pos.get(code) if prereq_bitsets is not None else None
+        prereq_inputs = {
+            "prereq_pos": prereq_pos,
+            "prereq_vectors": prereq_vectors,
+            "parsed": parsed,
+            "parsed_concurrent": parsed_concurrent,
+            "completed_set": completed_set,
+            "satisfied_codes": satisfied_codes,
+            "equiv_map": equiv_map,
+        }
+        prereq_ok_without_semester = _prereqs_satisfied_without_semester(
             allow_concurrent=allow_concurrent,
             has_explicit_concurrent=has_explicit_concurrent,
-            completed_set=completed_set,
-            satisfied_codes=satisfied_codes,
-            semester_codes=set(),
-            equiv_map=equiv_map,
+            **prereq_inputs,
         )
 
         restriction_blocked, _restriction_reason, cleared_restriction_tags, blocking_restriction_tag = _evaluate_soft_restrictions(
@@ -924,8 +1074,13 @@ def get_eligible_courses(
         if cleared_restriction_tags:
             soft_tags = [tag for tag in soft_tags if tag not in cleared_restriction_tags]
 
-        allow_concurrent = any(tag in CONCURRENT_TAGS for tag in soft_tags)
-        has_explicit_concurrent = not _is_none_prereq(raw_concurrent)
+        if any(tag in CONCURRENT_TAGS for tag in soft_tags) != allow_concurrent:
+            allow_concurrent = not allow_concurrent
+            prereq_ok_without_semester = _prereqs_satisfied_without_semester(
+                allow_concurrent=allow_concurrent,
+                has_explicit_concurrent=has_explicit_concurrent,
+                **prereq_inputs,
+            )
         complex_tag_blocks = (
             any(tag in COMPLEX_PREREQ_TAGS for tag in soft_tags)
             and not (parsed["type"] == "none" and (allow_concurrent or has_explicit_concurrent))
@@ -953,6 +1108,8 @@ def get_eligible_courses(
             "offered_this_term": offered_this_term,
             "parsed": parsed,
             "parsed_concurrent": parsed_concurrent,
+            "prereq_pos": prereq_pos,
+            "prereq_ok_without_semester": prereq_ok_without_semester,
             "manual_review": manual_review,
             "soft_tags": soft_tags,
             "allow_concurrent": allow_concurrent,
@@ -961,25 +1118,33 @@ def get_eligible_courses(
             "warning_text": warning_text,
         })
 
-    changed = True
-    while changed:
-        changed = False
-        for candidate in prepared_candidates:
-            if candidate["manual_review"] or candidate["code"] in semester_candidate_codes:
-                continue
-            if _prereqs_satisfied_for_semester(
-                parsed=candidate["parsed"],
-                parsed_concurrent=candidate["parsed_concurrent"],
-                allow_concurrent=candidate["allow_concurrent"],
-                has_explicit_concurrent=candidate["has_explicit_concurrent"],
-                completed_set=completed_set,
-                satisfied_codes=satisfied_codes,
-                semester_codes=semester_candidate_codes,
-                equiv_map=equiv_map,
-            ):
-                semester_candidate_codes.add(candidate["code"])
-                changed = True
-
+    # Same-semester concurrency: admit every candidate whose prereqs hold on
+    # completed + in-progress alone, then re-check only the candidates that
+    # watch a newly admitted course (or one of its equivalents).
+    for candidate in prepared_candidates:
+        if not candidate["manual_review"] and candidate["prereq_ok_without_semester"]:
+            semester_candidate_codes.add(candidate["code"])
+    semester_watchers = _semester_prereq_watchers(prepared_candidates, semester_candidate_codes)
+    semester_satisfied = _with_equivalents(satisfied_codes | semester_candidate_codes, equiv_map)
+    worklist = list(semester_candidate_codes)
+    while worklist and semester_watchers:
+        admitted_code = worklist.pop()
+        for watched_code in _with_equivalents({admitted_code}, equiv_map):
+            for candidate in semester_watchers.get(watched_code, []):
+                if candidate["code"] in semester_candidate_codes:
+                    continue
+                if _semester_prereqs_hold(
+                    candidate,
+                    semester_satisfied=semester_satisfied,
+                    completed_set=completed_set,
+                    equiv_map=equiv_map,
+                    prereq_vectors=prereq_vectors,
+                ):
+                    semester_candidate_codes.add(candidate["code"])
+                    semester_satisfied |= _with_equivalents({candidate["code"]}, equiv_map)
+                    worklist.append(candidate["code"])
+
+    extra_semester_codes = semester_candidate_codes - satisfied_codes
     results = []
 
     for candidate in prepared_candidates:
@@ -1057,11 +1222,9 @@ def get_eligible_courses(
             key=lambda bucket: (bucket["priority"], str(bucket.get("bucket_id", ""))),
         )
 
-        if not unmet_buckets and not bridge_target_buckets:
-            if not restrict_to_unmet_buckets and eligible_buckets:
-                pass
-            else:
-                continue
+        recommendable = bool(unmet_buckets or bridge_target_buckets)
+        if not recommendable and not (include_swap_pool and eligible_buckets):
+            continue
 
         multi_bucket_score = len(unmet_buckets)
         display_buckets = _prune_discovery_elective_display(eligible_buckets, unmet_buckets)
@@ -1095,7 +1258,7 @@ def get_eligible_courses(
             allow_concurrent=allow_concurrent,
             has_explicit_concurrent=has_explicit_concurrent,
             satisfied_codes=satisfied_codes,
-            semester_codes=semester_candidate_codes,
+            extra_semester_codes=extra_semester_codes,
         )
 
         if has_explicit_concurrent:
@@ -1134,7 +1297,7 @@ def get_eligible_courses(
         warning_tags = [tag for tag in soft_tags if tag in SOFT_WARNING_TAGS]
         has_soft_requirement = bool(warning_tags)
 
-        results.append({
+        results.append(({
             "course_code": code,
             "course_name": str(row.get("course_name", "")),
             "credits": int(row.get("credits", 3)) if not pd.isna(row.get("credits", 3)) else 3,
@@ -1164,8 +1327,18 @@ def get_eligible_courses(
             "low_confidence": low_confidence,
             "notes": course_notes,
             "unlocks": [],  # populated by server.py
-        })
+        }, recommendable))
+
+    return results
+
 
+def _finalize_eligible_results(
+    results: list[dict],
+    *,
+    is_honors_student: bool,
+    equiv_map: dict[str, set[str]] | None,
+) -> list[dict]:
+    """Apply honors dedup and the eligibility sort order to one result view."""
     # ── Honors dedup: drop base courses when H variant is also eligible ──
     if is_honors_student and equiv_map:
         result_codes = {r["course_code"] for r in results}
@@ -1194,6 +1367,148 @@ def get_eligible_courses(
     return results
 
 
+def get_eligible_courses(
+    courses_df: pd.DataFrame,
+    completed: list[str],
+    in_progress: list[str],
+    target_term: str,
+    prereq_map: dict,
+    allocator_remaining: dict,
+    course_bucket_map_df: pd.DataFrame,
+    buckets_df: pd.DataFrame,
+    equivalencies_df: pd.DataFrame = None,
+    track_id: str = DEFAULT_TRACK_ID,
+    reverse_map: dict[str, list[str]] | None = None,
+    runtime_indexes: dict | None = None,
+    *,
+    selected_program_ids: list[str] | None = None,
+    restrict_to_unmet_buckets: bool = True,
+    is_honors_student: bool = False,
+    equiv_map: dict[str, set[str]] | None = None,
+    cross_listed_map: dict[str, set[str]] | None = None,
+    current_standing: int = 0,
+    student_stage: str | None = None,
+) -> list[dict]:
+    """
+    Returns eligible courses for the target term, sorted by:
+      1. Primary bucket priority (ascending = most important first)
+      2. Multi-bucket score (descending = more unmet buckets filled = better)
+      3. Prerequisite level (ascending = earlier classes first)
+
+    Eligible = not yet taken AND prereqs satisfied AND not manual_review.
+    Term offering is warning-only in recommendation mode (no hard exclusion).
+
+    Each returned dict:
+    {
+      "course_code": str,
+      "course_name": str,
+      "credits": int,
+      "primary_bucket": str,          # bucket_id of highest-priority bucket
+      "primary_bucket_label": str,
+      "fills_buckets": [str, ...],    # all bucket_ids this course can fill
+      "multi_bucket_score": int,      # count of unmet buckets filled
+      "prereq_check": str,            # human-readable prereq label
+      "has_soft_requirement": bool,
+      "soft_tags": [str, ...],        # non-blocking soft tags
+      "all_soft_tags": [str, ...],    # full prereq_soft tags (internal ranking helper)
+      "manual_review": bool,          # True if prereq_hard is unsupported
+      "low_confidence": bool,         # offering_confidence != high
+      "notes": str | None,            # course notes from sheet
+      "unlocks": [],                  # filled in by server.py
+    }
+    """
+    entries = _collect_eligible_courses(
+        courses_df,
+        completed,
+        in_progress,
+        target_term,
+        prereq_map,
+        allocator_remaining,
+        course_bucket_map_df,
+        buckets_df,
+        equivalencies_df,
+        track_id,
+        reverse_map,
+        runtime_indexes,
+        selected_program_ids=selected_program_ids,
+        include_swap_pool=not restrict_to_unmet_buckets,
+        is_honors_student=is_honors_student,
+        equiv_map=equiv_map,
+        cross_listed_map=cross_listed_map,
+        current_standing=current_standing,
+        student_stage=student_stage,
+    )
+    return _finalize_eligible_results(
+        [result for result, _recommendable in entries],
+        is_honors_student=is_honors_student,
+        equiv_map=equiv_map,
+    )
+
+
+def get_eligible_course_views(
+    courses_df: pd.DataFrame,
+    completed: list[str],
+    in_progress: list[str],
+    target_term: str,
+    prereq_map: dict,
+    allocator_remaining: dict,
+    course_bucket_map_df: pd.DataFrame,
+    buckets_df: pd.DataFrame,
+    equivalencies_df: pd.DataFrame = None,
+    track_id: str = DEFAULT_TRACK_ID,
+    reverse_map: dict[str, list[str]] | None = None,
+    runtime_indexes: dict | None = None,
+    *,
+    selected_program_ids: list[str] | None = None,
+    is_honors_student: bool = False,
+    equiv_map: dict[str, set[str]] | None = None,
+    cross_listed_map: dict[str, set[str]] | None = None,
+    current_standing: int = 0,
+    student_stage: str | None = None,
+) -> tuple[list[dict], list[dict]]:
+    """
+    One eligibility pass, two views: (recommendable, swap_pool).
+
+    `recommendable` equals get_eligible_courses(...) and `swap_pool` equals
+    get_eligible_courses(..., restrict_to_unmet_buckets=False), but candidate
+    preparation, soft-restriction checks, and same-semester concurrency run
+    once. Rows in the two views are separate dicts, so callers can annotate
+    one view without touching the other.
+    """
+    entries = _collect_eligible_courses(
+        courses_df,
+        completed,
+        in_progress,
+        target_term,
+        prereq_map,
+        allocator_remaining,
+        course_bucket_map_df,
+        buckets_df,
+        equivalencies_df,
+        track_id,
+        reverse_map,
+        runtime_indexes,
+        selected_program_ids=selected_program_ids,
+        include_swap_pool=True,
+        is_honors_student=is_honors_student,
+        equiv_map=equiv_map,
+        cross_listed_map=cross_listed_map,
+        current_standing=current_standing,
+        student_stage=student_stage,
+    )
+    recommendable = _finalize_eligible_results(
+        [result for result, is_recommendable in entries if is_recommendable],
+        is_honors_student=is_honors_student,
+        equiv_map=equiv_map,
+    )
+    swap_pool = _finalize_eligible_results(
+        [dict(result) for result, _recommendable in entries],
+        is_honors_student=is_honors_student,
+        equiv_map=equiv_map,
+    )
+    return recommendable, swap_pool
+
+
 def check_can_take(
     requested_code: str,
     courses_df: pd.DataFrame,
@@ -1290,8 +1605,10 @@ def check_can_take(
     raw_concurrent = row.get("prereq_concurrent", "none")
     parsed_concurrent = row.get("parsed_concurrent")
     if parsed_concurrent is None:
-        from prereq_parser import parse_prereqs
-        parsed_concurrent = parse_prereqs(raw_concurrent if not _is_none_prereq(raw_concurrent) else "none")
+        parsed_concurrent = compile_prereqs(
+            raw_concurrent if not _is_none_prereq(raw_concurrent) else "none",
+            get_runtime_prereq_cache(runtime_indexes),
+        )
 
     # Check soft tags
     soft_tags = row.get("soft_tags")
@@ -0,0 +1,75 @@
+"""
+Gunicorn settings for the production container.
+
+Preload mode (default, GUNICORN_PRELOAD=1) imports `server` once in the
+master so the runtime dataset, reverse prereq map, and chain depths are built
+a single time and shared copy-on-write by every forked worker. Objects alive
+at that point are moved into the GC's permanent generation with
+`gc.freeze()`, so collections inside workers do not touch (and copy) the
+shared pages.
+
+Workers never reload data on their own in this mode. To pick up new data,
+send SIGHUP to the master: it reloads the dataset once, re-freezes, and
+gracefully replaces every worker with a fresh fork.
+
+Workers are threaded (gthread, GUNICORN_THREADS per worker, default 4).
+Identical in-flight /recommend and /replan requests are coalesced per
+process (`_recommend_single_flight`), which only happens when one worker
+serves concurrent requests; sync workers would never see a duplicate.
+"""
+
+import gc
+import os
+import sys
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    raw = str(os.environ.get(name, "")).strip().lower()
+    if not raw:
+        return default
+    return raw in {"1", "true", "yes", "y", "on"}
+
+
+def _env_int(name: str, default: int, minimum: int = 1) -> int:
+    try:
+        return max(minimum, int(os.environ.get(name, "")))
+    except (TypeError, ValueError):
+        return default
+
+
+preload_app = _env_flag("GUNICORN_PRELOAD", True)
+worker_class = str(os.environ.get("GUNICORN_WORKER_CLASS", "")).strip() or "gthread"
+threads = _env_int("GUNICORN_THREADS", 4)
+
+
+def _server_module():
+    return sys.modules.get("server")
+
+
+def _freeze_shared_heap() -> None:
+    gc.collect()
+    gc.freeze()
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+    app_module = _server_module()
+    if app_module is not None:
+        app_module._worker_reload_enabled = False
+    _freeze_shared_heap()
+    server.log.info("Preloaded runtime data in master; %d objects frozen", gc.get_freeze_count())
+
+
+def on_reload(server):
+    if not preload_app:
+        return
+    app_module = _server_module()
+    if app_module is None:
+        return
+    # Let the previous dataset be collected once nothing references it.
+    gc.unfreeze()
+    try:
+        app_module._reload_data_if_changed()
+    finally:
+        _freeze_shared_heap()
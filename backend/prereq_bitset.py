@@ -0,0 +1,165 @@
+"""
+Bitset prerequisite evaluation.
+
+Parsed prereq dicts (see prereq_parser.parse_prereqs) are compiled once per
+dataset into flat integer arrays so that "which courses does this student
+satisfy?" is a couple of NumPy passes over the whole catalog instead of one
+recursive prereqs_satisfied() call per course.
+
+Every parsed prereq reduces to an AND of clauses, where each clause is
+"at least `need` of these course ids":
+
+  none                     → no clauses (always satisfied)
+  single C                 → [1 of {C}]
+  or [A, B]                → [1 of {A, B}]
+  choose_n k [A, B, C]     → [k of {A, B, C}]
+  and [A, or(B, C)]        → [1 of {A}], [1 of {B, C}]
+  unsupported              → [1 of {}]  (never satisfied)
+
+A student's course set becomes a boolean vector over the course-id universe
+(`bitset()`), with one-hop equivalencies folded in exactly as
+prereqs_satisfied(..., equiv_map=...) expands them.
+
+`ancestors()` walks the same hard and concurrent prereq edges transitively;
+eligibility uses it to limit a request to courses that can reach an open
+bucket.
+"""
+
+from typing import Iterable
+
+import numpy as np
+from prereq_parser import prereq_course_codes
+
+
+class _ClauseProgram:
+    """One compiled prereq per owner course, as flat clause/leaf arrays."""
+
+    def __init__(self, clauses_by_owner: list[list[tuple[int, list[int]]]]):
+        leaf_ids: list[int] = []
+        leaf_clause: list[int] = []
+        clause_need: list[int] = []
+        clause_owner: list[int] = []
+        for owner, clauses in enumerate(clauses_by_owner):
+            for need, ids in clauses:
+                clause_index = len(clause_need)
+                clause_need.append(need)
+                clause_owner.append(owner)
+                leaf_ids.extend(ids)
+                leaf_clause.extend([clause_index] * len(ids))
+        self.n_owners = len(clauses_by_owner)
+        self.leaf_ids = np.asarray(leaf_ids, dtype=np.int32)
+        self.leaf_clause = np.asarray(leaf_clause, dtype=np.int32)
+        self.clause_need = np.asarray(clause_need, dtype=np.int32)
+        self.clause_owner = np.asarray(clause_owner, dtype=np.int32)
+
+    def evaluate(self, bits: np.ndarray) -> np.ndarray:
+        """Return a bool vector: owner i's prereq is satisfied by `bits`."""
+        hits = np.bincount(
+            self.leaf_clause,
+            weights=bits[self.leaf_ids],
+            minlength=len(self.clause_need),
+        )
+        failed_clauses = self.clause_owner[hits < self.clause_need]
+        return np.bincount(failed_clauses, minlength=self.n_owners) == 0
+
+
+class PrereqBitsets:
+    """
+    Hard and concurrent prereqs for a course catalog, compiled for bitset
+    evaluation.
+
+    `owner_pos[code]` is the row of a course in the vectors returned by
+    `hard.evaluate()` / `concurrent.evaluate()`. `course_rows` and
+    `prereq_map` are the inputs the programs were compiled from; callers
+    holding a different mapping must not use these results. `prereq_codes[code]` lists every course named
+    in that course's hard or concurrent prereq.
+    """
+
+    def __init__(self, course_rows: list[dict], prereq_map: dict):
+        self.course_rows = course_rows
+        self.prereq_map = prereq_map
+        self.code_ids: dict[str, int] = {}
+        self.owner_pos: dict[str, int] = {}
+        self.prereq_codes: dict[str, tuple[str, ...]] = {}
+        hard_clauses: list[list[tuple[int, list[int]]]] = []
+        concurrent_clauses: list[list[tuple[int, list[int]]]] = []
+        for row in course_rows:
+            code = row["course_code"]
+            if code in self.owner_pos:
+                continue
+            self.owner_pos[code] = len(hard_clauses)
+            self._course_id(code)
+            parsed = prereq_map.get(code, {"type": "none"})
+            parsed_concurrent = row.get("parsed_concurrent") or {"type": "none"}
+            hard_clauses.append(self._compile(parsed))
+            concurrent_clauses.append(self._compile(parsed_concurrent))
+            prereq_codes = prereq_course_codes(parsed) + prereq_course_codes(parsed_concurrent)
+            if prereq_codes:
+                self.prereq_codes[code] = tuple(dict.fromkeys(prereq_codes))
+        self.hard = _ClauseProgram(hard_clauses)
+        self.concurrent = _ClauseProgram(concurrent_clauses)
+
+    def __len__(self) -> int:
+        return len(self.owner_pos)
+
+    def _course_id(self, code: str) -> int:
+        course_id = self.code_ids.get(code)
+        if course_id is None:
+            course_id = len(self.code_ids)
+            self.code_ids[code] = course_id
+        return course_id
+
+    def _compile(self, parsed: dict) -> list[tuple[int, list[int]]]:
+        req_type = parsed.get("type")
+        if req_type == "none":
+            return []
+        if req_type == "single":
+            return [(1, [self._course_id(parsed["course"])])]
+        if req_type == "or":
+            return [(1, [self._course_id(code) for code in parsed["courses"]])]
+        if req_type == "choose_n":
+            return [(int(parsed["count"]), [self._course_id(code) for code in parsed["courses"]])]
+        if req_type == "and":
+            clauses: list[tuple[int, list[int]]] = []
+            for clause in parsed["courses"]:
+                if isinstance(clause, dict):
+                    clauses.extend(self._compile(clause))
+                else:
+                    clauses.append((1, [self._course_id(clause)]))
+            return clauses
+        # unsupported (or unknown) grammar is never auto-satisfied.
+        return [(1, [])]
+
+    def bitset(
+        self,
+        codes: Iterable[str],
+        equiv_map: dict[str, set[str]] | None = None,
+    ) -> np.ndarray:
+        """Bool vector over course ids for `codes`, plus their equivalents."""
+        codes = set(codes)
+        if equiv_map:
+            for code in list(codes):
+                codes.update(equiv_map.get(code, ()))
+        bits = np.zeros(len(self.code_ids), dtype=bool)
+        ids = [self.code_ids[code] for code in codes if code in self.code_ids]
+        if ids:
+            bits[ids] = True
+        return bits
+
+    def ancestors(
+        self,
+        codes: Iterable[str],
+        equiv_map: dict[str, set[str]] | None = None,
+    ) -> set[str]:
+        """`codes` plus every course reachable through prereq edges or equivalencies."""
+        reached: set[str] = set()
+        stack = list(codes)
+        while stack:
+            code = stack.pop()
+            if code in reached:
+                continue
+            reached.add(code)
+            stack.extend(self.prereq_codes.get(code, ()))
+            if equiv_map:
+                stack.extend(equiv_map.get(code, ()))
+        return reached
@@ -1,4 +1,6 @@
 import re
+import threading
+
 import pandas as pd
 from normalizer import normalize_code
 
@@ -165,6 +167,78 @@ def parse_prereqs(prereq_str) -> dict:
     return {"type": "single", "course": normalized}
 
 
+def _prereq_cache_key(prereq_str) -> str:
+    """Collapse raw prereq cells that parse identically onto one cache key."""
+    if prereq_str is None or (isinstance(prereq_str, float) and pd.isna(prereq_str)):
+        return "none"
+    s = str(prereq_str).strip()
+    return "none" if s.lower() in NONE_VALUES else s
+
+
+class PrereqCache:
+    """
+    Memoized parse_prereqs() keyed by the raw prereq string.
+
+    Each distinct string is parsed once; later lookups return the same
+    parsed dict, so callers must treat results as read-only. The loader
+    keeps one cache per dataset version (hard and concurrent prereqs share
+    it), and `stats()` reports how much parsing it saved.
+    """
+
+    def __init__(self):
+        self._entries: dict[str, dict] = {}
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def compile(self, prereq_str) -> dict:
+        key = _prereq_cache_key(prereq_str)
+        with self._lock:
+            parsed = self._entries.get(key)
+            if parsed is not None:
+                self._hits += 1
+                return parsed
+            parsed = parse_prereqs(key)
+            self._entries[key] = parsed
+            self._misses += 1
+            return parsed
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "distinct": len(self._entries),
+                "lookups": lookups,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state.pop("_lock", None)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+def compile_prereqs(prereq_str, cache: PrereqCache | None = None) -> dict:
+    """
+    parse_prereqs() through the dataset's PrereqCache.
+
+    Without a cache (no loaded dataset) the string is parsed directly; there
+    is no process-wide cache, so nothing outlives a dataset version.
+    """
+    if cache is None:
+        return parse_prereqs(_prereq_cache_key(prereq_str))
+    return cache.compile(prereq_str)
+
+
 def prereqs_satisfied(
     parsed_prereq: dict,
     satisfied_codes: set,
@@ -44,11 +44,14 @@ def _build_parent_bucket_map(track_buckets_df: pd.DataFrame) -> dict[str, str]:
     has_parent = "parent_bucket_id" in track_buckets_df.columns
     if not has_family and not has_parent:
         return out
-    for _, row in track_buckets_df.iterrows():
-        child = str(row.get("bucket_id", "") or "").strip()
-        family = str(row.get("double_count_family_id", "") or "").strip()
+    n_rows = len(track_buckets_df)
+    families = track_buckets_df["double_count_family_id"].tolist() if has_family else [""] * n_rows
+    parents = track_buckets_df["parent_bucket_id"].tolist() if has_parent else [""] * n_rows
+    for bucket_id, family_raw, parent_raw in zip(track_buckets_df["bucket_id"].tolist(), families, parents):
+        child = str(bucket_id or "").strip()
+        family = str(family_raw or "").strip()
         if not family:
-            family = str(row.get("parent_bucket_id", "") or "").strip()
+            family = str(parent_raw or "").strip()
         if child and family:
             out[child] = family
     return out
@@ -62,6 +65,16 @@ def _canon_node_pair(type_a: str, id_a: str, type_b: str, id_b: str) -> tuple[st
     return (b[0], b[1], a[0], a[1])
 
 
+def _policy_column(frame: pd.DataFrame, column: str, default) -> list:
+    return frame[column].tolist() if column in frame.columns else [default] * len(frame)
+
+
+def _policy_allow_flag(allow) -> bool:
+    if isinstance(allow, str):
+        return allow.strip().lower() in {"1", "true", "yes", "y"}
+    return bool(allow)
+
+
 def _build_policy_lookup(
     double_count_policy_df: pd.DataFrame,
     program_id: str,
@@ -91,18 +104,17 @@ def _build_policy_lookup(
     # v1.6 simplified schema (sub-bucket pair exceptions).
     if {"sub_bucket_id_a", "sub_bucket_id_b"}.issubset(set(policy.columns)):
         lookup: dict[tuple[str, str, str, str], bool] = {}
-        for _, row in policy.iterrows():
-            sub_a = str(row.get("sub_bucket_id_a", "") or "").strip()
-            sub_b = str(row.get("sub_bucket_id_b", "") or "").strip()
+        for sub_a_raw, sub_b_raw, allow in zip(
+            policy["sub_bucket_id_a"].tolist(),
+            policy["sub_bucket_id_b"].tolist(),
+            _policy_column(policy, "allow_double_count", False),
+        ):
+            sub_a = str(sub_a_raw or "").strip()
+            sub_b = str(sub_b_raw or "").strip()
             if not sub_a or not sub_b:
                 continue
             key = _canon_node_pair("sub_bucket", sub_a, "sub_bucket", sub_b)
-            allow = row.get("allow_double_count", False)
-            if isinstance(allow, str):
-                allow = allow.strip().lower() in {"1", "true", "yes", "y"}
-            else:
-                allow = bool(allow)
-            lookup[key] = allow
+            lookup[key] = _policy_allow_flag(allow)
         return lookup
 
     # Compatibility fallback: old-style policy can omit node_type columns.
@@ -120,19 +132,15 @@ def _build_policy_lookup(
         return {}
 
     lookup: dict[tuple[str, str, str, str], bool] = {}
-    for _, row in policy.iterrows():
-        key = _canon_node_pair(
-            row.get("node_type_a", ""),
-            row.get("node_id_a", ""),
-            row.get("node_type_b", ""),
-            row.get("node_id_b", ""),
-        )
-        allow = row.get("allow_double_count", False)
-        if isinstance(allow, str):
-            allow = allow.strip().lower() in {"1", "true", "yes", "y"}
-        else:
-            allow = bool(allow)
-        lookup[key] = allow
+    for type_a, id_a, type_b, id_b, allow in zip(
+        policy["node_type_a"].tolist(),
+        policy["node_id_a"].tolist(),
+        policy["node_type_b"].tolist(),
+        policy["node_id_b"].tolist(),
+        policy["allow_double_count"].tolist(),
+    ):
+        key = _canon_node_pair(type_a, id_a, type_b, id_b)
+        lookup[key] = _policy_allow_flag(allow)
     return lookup
 
 
@@ -169,13 +177,73 @@ def _policy_pair_allowed(
     return True
 
 
-def get_allowed_double_count_pairs(
+class DoubleCountPolicy:
+    """
+    Compiled pairwise double-count rules for one track.
+
+    Bucket ids map to dense integers, and row i is a bitset of the buckets
+    that may share a course with bucket i, so a pair check is two dict hits
+    and a shift. Unknown bucket ids and a bucket paired with itself are never
+    allowed.
+    """
+
+    __slots__ = ("bucket_ids", "bucket_index", "_rows")
+
+    def __init__(self, bucket_ids: list[str], rows: list[int]):
+        self.bucket_ids = tuple(bucket_ids)
+        self.bucket_index = {bid: i for i, bid in enumerate(self.bucket_ids)}
+        self._rows = list(rows)
+
+    def allows(self, bucket_a: str, bucket_b: str) -> bool:
+        i = self.bucket_index.get(bucket_a)
+        j = self.bucket_index.get(bucket_b)
+        if i is None or j is None:
+            return False
+        return bool(self._rows[i] >> j & 1)
+
+    def allows_all(self, assigned, bucket_id: str) -> bool:
+        """True when bucket_id may double-count with every bucket in `assigned`."""
+        j = self.bucket_index.get(bucket_id)
+        if j is None:
+            return not assigned
+        row = self._rows[j]
+        for bid in assigned:
+            i = self.bucket_index.get(bid)
+            if i is None or not row >> i & 1:
+                return False
+        return True
+
+    def pairs(self) -> set[frozenset[str]]:
+        """The allowed pairs as a set of frozensets."""
+        out: set[frozenset[str]] = set()
+        for i, row in enumerate(self._rows):
+            for j in range(i + 1, len(self.bucket_ids)):
+                if row >> j & 1:
+                    out.add(frozenset([self.bucket_ids[i], self.bucket_ids[j]]))
+        return out
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, DoubleCountPolicy):
+            return NotImplemented
+        return self.bucket_ids == other.bucket_ids and self._rows == other._rows
+
+    def __getstate__(self):
+        return (self.bucket_ids, self._rows)
+
+    def __setstate__(self, state) -> None:
+        bucket_ids, rows = state
+        self.bucket_ids = bucket_ids
+        self.bucket_index = {bid: i for i, bid in enumerate(bucket_ids)}
+        self._rows = rows
+
+
+def compile_double_count_policy(
     buckets_df: pd.DataFrame,
     track_id: str | None = None,
     double_count_policy_df: pd.DataFrame | None = None,
-) -> set[frozenset[str]]:
+) -> DoubleCountPolicy:
     """
-    Return allowed bucket pairs for the current runtime track/program.
+    Compile the allowed bucket pairs for the current runtime track/program.
 
     Default behavior:
     - same double-count family => denied
@@ -185,24 +253,24 @@ def get_allowed_double_count_pairs(
     - sub-bucket rule > family(bucket) rule > hierarchy default
     """
     if buckets_df is None or len(buckets_df) == 0:
-        return set()
+        return DoubleCountPolicy([], [])
 
     if track_id is None:
         # Legacy callers pass already filtered bucket rows.
-        track_buckets = buckets_df.copy()
+        track_buckets = buckets_df
         inferred_track_id = None
     else:
         if "track_id" in buckets_df.columns:
             track_buckets = buckets_df[
                 buckets_df["track_id"].astype(str).str.strip().str.upper()
                 == str(track_id).strip().upper()
-            ].copy()
+            ]
         else:
-            track_buckets = buckets_df.copy()
+            track_buckets = buckets_df
         inferred_track_id = str(track_id).strip().upper()
 
     if len(track_buckets) == 0 or "bucket_id" not in track_buckets.columns:
-        return set()
+        return DoubleCountPolicy([], [])
 
     policy_lookup: dict[tuple[str, str, str, str], bool] = {}
     if inferred_track_id and double_count_policy_df is not None and len(double_count_policy_df) > 0:
@@ -216,14 +284,22 @@ def get_allowed_double_count_pairs(
             if str(b).strip()
         }
     )
-    allowed_pairs: set[frozenset[str]] = set()
+    rows = [0] * len(bucket_ids)
     for i in range(len(bucket_ids)):
         for j in range(i + 1, len(bucket_ids)):
-            a = bucket_ids[i]
-            b = bucket_ids[j]
-            if _policy_pair_allowed(a, b, parent_map, policy_lookup):
-                allowed_pairs.add(frozenset([a, b]))
-    return allowed_pairs
+            if _policy_pair_allowed(bucket_ids[i], bucket_ids[j], parent_map, policy_lookup):
+                rows[i] |= 1 << j
+                rows[j] |= 1 << i
+    return DoubleCountPolicy(bucket_ids, rows)
+
+
+def get_allowed_double_count_pairs(
+    buckets_df: pd.DataFrame,
+    track_id: str | None = None,
+    double_count_policy_df: pd.DataFrame | None = None,
+) -> set[frozenset[str]]:
+    """Allowed bucket pairs as frozensets; see compile_double_count_policy()."""
+    return compile_double_count_policy(buckets_df, track_id, double_count_policy_df).pairs()
 
 
 def bucket_family_key(bucket: dict) -> str:
@@ -0,0 +1,150 @@
+"""
+Precompiled runtime bundle for load_data().
+
+Every worker boot otherwise re-parses the CSV sheets, converts the
+parent/child model, parses every prereq string, and rebuilds each track
+index. The compile step below runs that pipeline once and pickles the
+resulting runtime dict next to a content hash of its inputs (the source
+sheets plus the loader modules that derive from them). At boot,
+`load_runtime_bundle()` returns the unpickled dict only when that hash still
+matches; callers fall back to `load_data()` otherwise.
+
+Usage:
+    python backend/runtime_bundle.py
+    python backend/runtime_bundle.py --data data --out build/runtime_bundle.pkl
+
+Bundles are trusted build artifacts (they are unpickled), so only load files
+produced by this script.
+"""
+
+import argparse
+import hashlib
+import os
+import pickle
+import sys
+import time
+
+import pandas as pd
+
+import data_loader
+
+BUNDLE_FORMAT_VERSION = 1
+BUNDLE_PATH_ENV = "RUNTIME_BUNDLE_PATH"
+
+_BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+_PROJECT_ROOT = os.path.dirname(_BACKEND_DIR)
+_DEFAULT_BUNDLE_PATH = os.path.join(_PROJECT_ROOT, "build", "runtime_bundle.pkl")
+# Modules whose output is baked into the bundle; editing any of them must
+# invalidate previously compiled bundles.
+_LOADER_MODULES = (
+    "data_loader.py",
+    "allocator.py",
+    "normalizer.py",
+    "prereq_parser.py",
+    "prereq_bitset.py",
+    "requirements.py",
+    "validators.py",
+)
+
+
+def configured_bundle_path() -> str | None:
+    """Return the bundle path from RUNTIME_BUNDLE_PATH, or None when unset."""
+    raw = str(os.environ.get(BUNDLE_PATH_ENV, "")).strip()
+    if not raw:
+        return None
+    if not os.path.isabs(raw):
+        raw = os.path.join(_PROJECT_ROOT, raw)
+    return raw
+
+
+def compute_source_digest(data_path: str) -> str:
+    """Hash the data sheets, loader sources, and format/runtime versions."""
+    digest = hashlib.sha256()
+    digest.update(f"bundle-v{BUNDLE_FORMAT_VERSION}".encode("utf-8"))
+    digest.update(f"|py{sys.version_info.major}.{sys.version_info.minor}".encode("utf-8"))
+    digest.update(f"|pandas{pd.__version__}".encode("utf-8"))
+    for module_name in _LOADER_MODULES:
+        module_path = os.path.join(_BACKEND_DIR, module_name)
+        digest.update(f"|module:{module_name}|".encode("utf-8"))
+        with open(module_path, "rb") as f:
+            digest.update(f.read())
+    for sheet, sheet_digest in sorted(data_loader.compute_sheet_digests(data_path).items()):
+        digest.update(f"|sheet:{sheet}:{sheet_digest}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def compile_runtime_bundle(data_path: str, bundle_path: str) -> dict:
+    """Run load_data() once and write the pickled runtime bundle."""
+    source_digest = compute_source_digest(data_path)
+    data = data_loader.load_data(data_path)
+    bundle = {
+        "format_version": BUNDLE_FORMAT_VERSION,
+        "source_digest": source_digest,
+        "data": data,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(bundle_path)), exist_ok=True)
+    tmp_path = f"{bundle_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(bundle, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, bundle_path)
+    return data
+
+
+def load_runtime_bundle(data_path: str, bundle_path: str | None = None) -> dict | None:
+    """
+    Return the bundled runtime dict for data_path, or None when the bundle is
+    missing, unreadable, or was compiled from different inputs.
+    """
+    bundle_path = bundle_path or configured_bundle_path()
+    if not bundle_path or not os.path.isfile(bundle_path):
+        return None
+    try:
+        expected_digest = compute_source_digest(data_path)
+    except OSError:
+        return None
+    try:
+        with open(bundle_path, "rb") as f:
+            bundle = pickle.load(f)
+    except Exception as exc:
+        print(f"[WARN] Runtime bundle unreadable ({bundle_path}): {exc}", file=sys.stderr)
+        return None
+    if (
+        not isinstance(bundle, dict)
+        or bundle.get("format_version") != BUNDLE_FORMAT_VERSION
+        or bundle.get("source_digest") != expected_digest
+    ):
+        print(
+            f"[INFO] Runtime bundle is stale ({bundle_path}); loading from source data.",
+        )
+        return None
+    data = bundle.get("data")
+    return data if isinstance(data, dict) else None
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Compile the MarqBot runtime data bundle.")
+    parser.add_argument(
+        "--data",
+        default=os.path.join(_PROJECT_ROOT, "data"),
+        help="CSV directory or .xlsx workbook to compile (default: data/).",
+    )
+    parser.add_argument(
+        "--out",
+        default=configured_bundle_path() or _DEFAULT_BUNDLE_PATH,
+        help="Bundle output path (default: $RUNTIME_BUNDLE_PATH or build/runtime_bundle.pkl).",
+    )
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    data = compile_runtime_bundle(args.data, args.out)
+    elapsed_ms = (time.perf_counter() - started) * 1000.0
+    size_kb = os.path.getsize(args.out) / 1024.0
+    print(
+        f"[OK] Compiled {len(data['catalog_codes'])} courses into {args.out} "
+        f"({size_kb:.0f} KB, {elapsed_ms:.0f} ms)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
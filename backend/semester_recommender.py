@@ -8,18 +8,22 @@ import pandas as pd
 from requirements import (
     DEFAULT_TRACK_ID,
     BLOCKING_WARNING_THRESHOLD,
-    get_allowed_double_count_pairs,
+    DoubleCountPolicy,
+    compile_double_count_policy,
     get_buckets_by_role,
 )
 from allocator import (
+    AllocationState,
     allocate_courses,
     ensure_runtime_indexes,
     get_applied_bucket_progress_units,
+    start_allocation,
+    _build_track_course_conflict_map,
     _safe_int,
     _infer_requirement_mode,
 )
-from unlocks import get_blocking_warnings
-from eligibility import get_eligible_courses, parse_term
+from unlocks import UnlockIndex, get_blocking_warnings
+from eligibility import get_eligible_course_views, get_eligible_courses, parse_term
 from prereq_parser import prereq_course_codes
 from scheduling_styles import (
     StyleConfig,
@@ -614,7 +618,7 @@ def _select_assignable_buckets_allocator_style(
     picks_per_bucket: dict[str, int],
     enforce_bucket_cap: bool,
     max_per_bucket: int,
-    allowed_pairs: set[frozenset[str]],
+    double_count_policy: DoubleCountPolicy,
     bucket_meta: dict[str, dict],
 ) -> list[str]:
     ordered = _order_buckets_allocator_style(candidate_bucket_ids, bucket_meta)
@@ -622,14 +626,7 @@ def _select_assignable_buckets_allocator_style(
     for bid in ordered:
         if virtual_remaining.get(bid, 0) <= 0:
             continue
-        if not assigned:
-            assigned.append(bid)
-            continue
-        pairwise_ok = all(
-            frozenset([existing, bid]) in allowed_pairs
-            for existing in assigned
-        )
-        if pairwise_ok:
+        if double_count_policy.allows_all(assigned, bid):
             assigned.append(bid)
     return assigned
 
@@ -1273,6 +1270,7 @@ def _build_projected_outputs(
     track_id: str,
     *,
     prebuilt_alloc: dict | None = None,
+    allocation_state: AllocationState | None = None,
     parent_type_map: dict[str, str] | None = None,
     bucket_track_required_map: dict[str, str] | None = None,
     bucket_parent_map: dict[str, str] | None = None,
@@ -1282,6 +1280,10 @@ def _build_projected_outputs(
     projected_in_progress_for_progress = _dedupe_codes(in_progress + selected_codes)
     if prebuilt_alloc is not None and not selected_codes:
         projected_alloc_for_progress = prebuilt_alloc
+    elif allocation_state is not None:
+        projected_alloc_for_progress = allocation_state.extended_to(
+            projected_completed_for_progress
+        ).result(projected_in_progress_for_progress)
     else:
         projected_alloc_for_progress = allocate_courses(
             projected_completed_for_progress,
@@ -1317,47 +1319,14 @@ def _build_course_conflict_map(data: dict, track_id: str) -> dict[str, set[str]]
     track_key = _normalize_course_code(track_id)
     runtime_indexes = data.get("runtime_indexes") or {}
     track_runtime = (runtime_indexes.get("tracks") or {}).get(track_key) or {}
-
-    conflict_map: dict[str, set[str]] = {}
-
-    def _link_members(members: set[str]) -> None:
-        if len(members) < 2:
-            return
-        for member in members:
-            conflict_map.setdefault(member, set()).update(members - {member})
-
-    equivalent_course_map = track_runtime.get("equivalent_course_map") or {}
-    for raw_code, raw_aliases in equivalent_course_map.items():
-        members = {
-            _normalize_course_code(raw_code),
-            *{
-                _normalize_course_code(alias)
-                for alias in (raw_aliases or set())
-            },
-        }
-        _link_members({code for code in members if code})
-
-    cross_listed_map = data.get("cross_listed_map") or {}
-    for raw_code, raw_aliases in cross_listed_map.items():
-        members = {
-            _normalize_course_code(raw_code),
-            *{
-                _normalize_course_code(alias)
-                for alias in (raw_aliases or set())
-            },
-        }
-        _link_members({code for code in members if code})
-
-    ndc_groups = track_runtime.get("no_double_count_groups") or data.get("no_double_count_groups") or []
-    for raw_group in ndc_groups:
-        members = {
-            _normalize_course_code(member)
-            for member in (raw_group or set())
-            if _normalize_course_code(member)
-        }
-        _link_members(members)
-
-    return conflict_map
+    prebuilt = track_runtime.get("course_conflict_map")
+    if prebuilt is not None:
+        return prebuilt
+    return _build_track_course_conflict_map(
+        track_runtime.get("equivalent_course_map") or {},
+        data.get("cross_listed_map"),
+        track_runtime.get("no_double_count_groups") or data.get("no_double_count_groups") or [],
+    )
 
 
 def _expand_with_course_conflicts(
@@ -1662,9 +1631,11 @@ def _build_manual_selected_semester_result(
     data: dict,
     track_id: str,
     reverse_map: dict,
+    unlock_index: UnlockIndex | None,
     current_standing: int,
     assumes_in_progress_completion: bool,
     alloc: dict,
+    allocation_state: AllocationState,
     progress_sem: dict,
     non_manual_swap_sem: list[dict],
     eligible_count_sem: int,
@@ -1731,6 +1702,7 @@ def _build_manual_selected_semester_result(
         completed,
         in_progress,
         threshold=BLOCKING_WARNING_THRESHOLD,
+        unlock_index=unlock_index,
     )
 
     projected_progress_sem = _build_projected_outputs(
@@ -1739,6 +1711,7 @@ def _build_manual_selected_semester_result(
         selected_codes,
         data,
         track_id,
+        allocation_state=allocation_state,
         parent_type_map=parent_type_map,
         bucket_track_required_map=bucket_track_required_map,
         bucket_parent_map=bucket_parent_map,
@@ -1900,6 +1873,62 @@ def _course_codes_for_bucket_flag(
     return codes
 
 
+def _track_scoring_context(data: dict, track_id: str) -> dict:
+    """
+    Lookup maps that run_recommendation_semester() needs for a track.
+
+    They depend only on the dataset and track id, so with runtime indexes they
+    are built on first use and kept on the track's runtime index; every later
+    semester and request reuses them. Callers must treat them as read-only.
+    """
+    runtime_indexes = data.get("runtime_indexes") or {}
+    runtime_track = (runtime_indexes.get("tracks") or {}).get(str(track_id or "").strip().upper())
+    parent_type_source = runtime_indexes.get("parent_type_map")
+    if runtime_track is not None:
+        cached = runtime_track.get("scoring_context")
+        if cached is not None and cached["parent_type_source"] is parent_type_source:
+            return cached
+
+    selection_bucket_meta = _build_selection_bucket_meta(data, track_id)
+    parent_type_map = _build_parent_type_map(data)
+    bucket_parent_map = _build_bucket_parent_map(data, track_id)
+    context = {
+        "parent_type_source": parent_type_source,
+        "selection_bucket_meta": selection_bucket_meta,
+        "parent_type_map": parent_type_map,
+        "bucket_track_required_map": _build_bucket_track_required_map(data, track_id),
+        "bucket_parent_map": bucket_parent_map,
+        "bucket_role_map": _build_bucket_role_map(data, track_id),
+        "course_conflict_map": _build_course_conflict_map(data, track_id),
+        "double_count_policy": (
+            runtime_track["double_count_policy"]
+            if runtime_track is not None
+            else compile_double_count_policy(
+                data.get("buckets_df", pd.DataFrame()),
+                track_id=track_id,
+                double_count_policy_df=data.get("v2_double_count_policy_df"),
+            )
+        ),
+        "writ_course_codes": _course_codes_for_bucket_flag(
+            data.get("course_bucket_map_df"),
+            track_id,
+            selection_bucket_meta,
+            "writ_bucket",
+            legacy_local_bucket_id="MCC_WRIT",
+        ),
+        "declared_dept_set": _build_declared_dept_set(
+            data,
+            track_id,
+            bucket_parent_map,
+            parent_type_map,
+            selection_bucket_meta,
+        ),
+    }
+    if runtime_track is not None:
+        runtime_track["scoring_context"] = context
+    return context
+
+
 def _candidate_advances_declared_or_bcc_requirement(
     candidate: dict,
     bucket_parent_map: dict[str, str],
@@ -1945,6 +1974,8 @@ def run_recommendation_semester(
     student_stage: str | None = None,
     scheduling_style: str | None = None,
     manual_selected_codes: list[str] | None = None,
+    allocation_state: AllocationState | None = None,
+    unlock_index: UnlockIndex | None = None,
 ) -> dict:
     """Run the full recommendation pipeline for a single semester.
 
@@ -1983,48 +2014,33 @@ def run_recommendation_semester(
     # ── Phase 1: Allocation ───────────────────────────────────────────
     # Walk the student's completed + in-progress courses through the bucket
     # tree to determine which buckets still need courses and how many slots
-    # remain in each.
+    # remain in each. A caller planning several semesters passes the state it
+    # is growing; it is extended to `completed` rather than rebuilt.
     term = parse_term(target_semester_label)
-    alloc = allocate_courses(
-        completed,
-        in_progress,
-        data["buckets_df"],
-        data["course_bucket_map_df"],
-        data["courses_df"],
-        data["equivalencies_df"],
-        track_id=track_id,
-        double_count_policy_df=data.get("v2_double_count_policy_df"),
-        runtime_indexes=data.get("runtime_indexes"),
-    )
-    selection_bucket_meta = _build_selection_bucket_meta(data, track_id)
+    if allocation_state is None:
+        allocation_state = start_allocation(
+            completed,
+            data["buckets_df"],
+            data["course_bucket_map_df"],
+            data["courses_df"],
+            data["equivalencies_df"],
+            track_id=track_id,
+            double_count_policy_df=data.get("v2_double_count_policy_df"),
+            runtime_indexes=data.get("runtime_indexes"),
+        )
+    else:
+        allocation_state = allocation_state.extended_to(completed)
+    alloc = allocation_state.result(in_progress)
+    scoring_context = _track_scoring_context(data, track_id)
+    selection_bucket_meta = scoring_context["selection_bucket_meta"]
 
     # ── Phase 2: Eligibility ──────────────────────────────────────────
     # Filter the full course catalog to courses the student can actually take
     # this term: prerequisites met, not already completed/in-progress, mapped
-    # to at least one unsatisfied bucket, and offered this term.
-    eligible_sem = get_eligible_courses(
-        data["courses_df"],
-        completed,
-        in_progress,
-        term,
-        data["prereq_map"],
-        alloc["remaining"],
-        data["course_bucket_map_df"],
-        data["buckets_df"],
-        data["equivalencies_df"],
-        track_id=track_id,
-        reverse_map=reverse_map,
-        runtime_indexes=data.get("runtime_indexes"),
-        selected_program_ids=selection_program_ids,
-        is_honors_student=is_honors_student,
-        equiv_map=data.get("equiv_prereq_map"),
-        cross_listed_map=data.get("cross_listed_map"),
-        current_standing=current_standing,
-        student_stage=student_stage,
-    )
-    # Edit-mode swap pools should expose the full can-take list, not just
-    # courses that still advance an unmet bucket in the current plan.
-    eligible_swap_sem = get_eligible_courses(
+    # to at least one unsatisfied bucket, and offered this term. The same pass
+    # yields the edit-mode swap pool, which exposes the full can-take list,
+    # not just courses that still advance an unmet bucket in the current plan.
+    eligible_sem, eligible_swap_sem = get_eligible_course_views(
         data["courses_df"],
         completed,
         in_progress,
@@ -2043,9 +2059,8 @@ def run_recommendation_semester(
         cross_listed_map=data.get("cross_listed_map"),
         current_standing=current_standing,
         student_stage=student_stage,
-        restrict_to_unmet_buckets=False,
     )
-    conflict_map_sem = _build_course_conflict_map(data, track_id)
+    conflict_map_sem = scoring_context["course_conflict_map"]
     _annotate_candidates_with_conflicts(eligible_sem, conflict_map_sem)
     _annotate_candidates_with_conflicts(eligible_swap_sem, conflict_map_sem)
     for candidate in eligible_sem:
@@ -2093,12 +2108,12 @@ def run_recommendation_semester(
 
     # ── Phase 4: Scoring setup ────────────────────────────────────────
     # Build lookup maps, progress state, WRIT tracking, and the core prereq
-    # blocker set.  These are computed once and reused by the ranking and
-    # selection phases.
-    parent_type_map = _build_parent_type_map(data)
-    bucket_track_required_map = _build_bucket_track_required_map(data, track_id)
-    bucket_parent_map = _build_bucket_parent_map(data, track_id)
-    bucket_role_map = _build_bucket_role_map(data, track_id)
+    # blocker set.  The lookup maps come from the per-track scoring context;
+    # the rest is computed once here and reused by ranking and selection.
+    parent_type_map = scoring_context["parent_type_map"]
+    bucket_track_required_map = scoring_context["bucket_track_required_map"]
+    bucket_parent_map = scoring_context["bucket_parent_map"]
+    bucket_role_map = scoring_context["bucket_role_map"]
 
     progress_sem = annotate_progress_with_recommendation_hierarchy(
         build_progress_output(alloc, data["course_bucket_map_df"]),
@@ -2112,13 +2127,7 @@ def run_recommendation_semester(
         bid for bid, info in progress_sem.items()
         if not info.get("satisfied", True)
     ]
-    writ_course_codes = _course_codes_for_bucket_flag(
-        data.get("course_bucket_map_df"),
-        track_id,
-        selection_bucket_meta,
-        "writ_bucket",
-        legacy_local_bucket_id="MCC_WRIT",
-    )
+    writ_course_codes = scoring_context["writ_course_codes"]
     historical_writ_courses = {
         str(code or "").strip().upper()
         for code in (completed + in_progress)
@@ -2134,9 +2143,11 @@ def run_recommendation_semester(
             data=data,
             track_id=track_id,
             reverse_map=reverse_map,
+            unlock_index=unlock_index,
             current_standing=current_standing,
             assumes_in_progress_completion=assumes_in_progress_completion,
             alloc=alloc,
+            allocation_state=allocation_state,
             progress_sem=progress_sem,
             non_manual_swap_sem=non_manual_swap_sem,
             eligible_count_sem=eligible_count_sem,
@@ -2213,6 +2224,7 @@ def run_recommendation_semester(
                 selected_codes,
                 data,
                 track_id,
+                allocation_state=allocation_state,
                 parent_type_map=parent_type_map,
                 bucket_track_required_map=bucket_track_required_map,
                 bucket_parent_map=bucket_parent_map,
@@ -2242,6 +2254,7 @@ def run_recommendation_semester(
             [],
             data,
             track_id,
+            allocation_state=allocation_state,
             prebuilt_alloc=alloc,
             parent_type_map=parent_type_map,
             bucket_track_required_map=bucket_track_required_map,
@@ -2291,13 +2304,7 @@ def run_recommendation_semester(
         core_prereq_blockers_sem |= _prereq_courses(data["prereq_map"].get(core_code, {"type": "none"}))
     _chain = chain_depths or {}
     foundation_slots_open_sem = _open_foundation_slots(alloc["remaining"], selection_bucket_meta)
-    declared_dept_set = _build_declared_dept_set(
-        data,
-        track_id,
-        bucket_parent_map,
-        parent_type_map,
-        selection_bucket_meta,
-    )
+    declared_dept_set = scoring_context["declared_dept_set"]
     # ── Phase 5: Tier assignment & style application ─────────────────
     # Assign each candidate a base tier from the bucket hierarchy (1-7),
     # then remap through the active style's tier map.  The base tier is
@@ -2364,11 +2371,7 @@ def run_recommendation_semester(
     eligible_count_sem = len(ranked_sem)
     # ---------- Selection setup ----------
     selected_sem = []
-    allowed_pairs = get_allowed_double_count_pairs(
-        data.get("buckets_df", pd.DataFrame()),
-        track_id=track_id,
-        double_count_policy_df=data.get("v2_double_count_policy_df"),
-    )
+    double_count_policy = scoring_context["double_count_policy"]
     virtual_remaining = {
         bid: rem.get("slots_remaining", 0)
         for bid, rem in alloc["remaining"].items()
@@ -2387,7 +2390,7 @@ def run_recommendation_semester(
             picks_per_bucket,
             enforce_bucket_cap=enforce_bucket_cap,
             max_per_bucket=_MAX_PER_BUCKET_PER_SEM,
-            allowed_pairs=allowed_pairs,
+            double_count_policy=double_count_policy,
             bucket_meta=selection_bucket_meta,
         )
 
@@ -2650,7 +2653,7 @@ def run_recommendation_semester(
                     picks_per_bucket,
                     enforce_bucket_cap=False,
                     max_per_bucket=_MAX_PER_BUCKET_PER_SEM,
-                    allowed_pairs=allowed_pairs,
+                    double_count_policy=double_count_policy,
                     bucket_meta=selection_bucket_meta,
                 )
                 if not assigned_buckets:
@@ -2690,6 +2693,7 @@ def run_recommendation_semester(
         completed,
         in_progress,
         threshold=BLOCKING_WARNING_THRESHOLD,
+        unlock_index=unlock_index,
     )
 
     in_progress_note_sem = _build_in_progress_note(
@@ -2704,6 +2708,7 @@ def run_recommendation_semester(
         selected_codes,
         data,
         track_id,
+        allocation_state=allocation_state,
         parent_type_map=parent_type_map,
         bucket_track_required_map=bucket_track_required_map,
         bucket_parent_map=bucket_parent_map,
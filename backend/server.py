@@ -2,10 +2,13 @@ import os
 import sys
 import time
 import threading
+import gzip
 import hashlib
 import json
+import struct
 from datetime import datetime, timezone
 from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
 from uuid import uuid4
 
 # Ensure backend/ is on sys.path so sibling imports work
@@ -18,6 +21,11 @@ from whitenoise import WhiteNoise
 from werkzeug.exceptions import NotFound
 from dotenv import load_dotenv
 
+try:
+    import brotli
+except ImportError:  # flask-compress installs it on CPython; gzip-only otherwise
+    brotli = None
+
 from normalizer import normalize_code, normalize_input
 from requirements import DEFAULT_TRACK_ID
 from validators import (
@@ -25,10 +33,18 @@ from validators import (
     expand_completed_with_prereqs_with_provenance,
     expand_in_progress_with_prereqs,
 )
-from unlocks import build_reverse_prereq_map, compute_chain_depths
+from unlocks import UnlockIndex, build_reverse_prereq_map, build_unlock_index, compute_chain_depths
 from eligibility import check_can_take, parse_term
-from data_loader import load_data
-from allocator import allocate_courses, ensure_runtime_indexes, get_applied_bucket_progress_units
+from data_loader import compute_data_version, compute_sheet_digests, load_data, reload_data
+from runtime_bundle import load_runtime_bundle
+from shared_cache import SharedCacheBackend, build_shared_cache
+from allocator import (
+    ensure_runtime_indexes,
+    get_allocation_memo,
+    get_applied_bucket_progress_units,
+    get_runtime_required_prereq_closure,
+    start_allocation,
+)
 from student_stage import (
     VALID_STUDENT_STAGES,
     infer_student_stage_from_courses,
@@ -66,7 +82,8 @@ elif not os.path.isabs(_env_data_path):
 else:
     DATA_PATH = _env_data_path
 _data_lock = threading.Lock()
-_data_mtime = None
+# Cheap (sheet, mtime_ns, size) fingerprint used to skip re-hashing unchanged files.
+_data_file_signature = None
 
 # -- Rate limiting (manual token bucket, 30 req/min per IP) ----------------
 _RATE_LIMIT_MAX = 30
@@ -109,24 +126,126 @@ _CAN_TAKE_CACHE_TTL_SECONDS = _env_float("CAN_TAKE_CACHE_TTL_SECONDS", 600.0, mi
 _PROGRAM_DATA_CACHE_TTL_SECONDS = _env_float("PROGRAM_DATA_CACHE_TTL_SECONDS", 1800.0, minimum=0.0)
 _RECOMMEND_CACHE_MAX_BYTES = _env_int("RECOMMEND_CACHE_MAX_BYTES", 8_000_000, minimum=0)
 _CAN_TAKE_CACHE_MAX_BYTES = _env_int("CAN_TAKE_CACHE_MAX_BYTES", 512_000, minimum=0)
+# Allocation results shared by progress snapshots, semesters, and projections
+# (keyed per track index build, so they survive a reload that keeps the track).
+_ALLOCATION_MEMO_SIZE = _env_int("ALLOCATION_MEMO_SIZE", 1024, minimum=0)
+_ALLOCATION_MEMO_MAX_BYTES = _env_int("ALLOCATION_MEMO_MAX_BYTES", 8_000_000, minimum=0)
+get_allocation_memo().configure(max_entries=_ALLOCATION_MEMO_SIZE, max_bytes=_ALLOCATION_MEMO_MAX_BYTES)
+# Optional second tier for /recommend, /replan, and /can-take responses,
+# shared by every worker: sqlite:///path.db (per host) or redis://host:port/db.
+_SHARED_CACHE_URL = str(os.environ.get("SHARED_CACHE_URL", "")).strip()
+_SHARED_CACHE_MAX_BYTES = _env_int("SHARED_CACHE_MAX_BYTES", 64_000_000, minimum=0)
+_SHARED_CACHE_TIMEOUT_SECONDS = _env_float("SHARED_CACHE_TIMEOUT_SECONDS", 0.25, minimum=0.0)
+# How long a duplicate /recommend or /replan waits for the identical
+# in-flight run; tied to the Gunicorn worker timeout.
+_SINGLE_FLIGHT_WAIT_SECONDS = _env_float("GUNICORN_TIMEOUT", 90.0, minimum=1.0)
+
+
+def _backend_build_id() -> str:
+    """Digest of the backend sources, so shared-tier entries never outlive a deploy."""
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(BACKEND_DIR)):
+        if not name.endswith(".py"):
+            continue
+        digest.update(f"|{name}|".encode("utf-8"))
+        with open(os.path.join(BACKEND_DIR, name), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
 
 
-def _estimate_json_payload_bytes(value) -> int:
-    try:
-        return len(
-            json.dumps(
-                value,
-                sort_keys=True,
-                separators=(",", ":"),
-                ensure_ascii=True,
-            ).encode("utf-8")
-        )
-    except (TypeError, ValueError):
-        return 0
+_SHARED_CACHE_KEY_PREFIX = f"build-{_backend_build_id()}:"
+
+
+@dataclass(frozen=True)
+class _EncodedResponse:
+    """
+    A JSON response body, serialized once, with its compressed variants.
+
+    `variants` maps a Content-Encoding ("identity", "gzip", "br") to the
+    exact bytes sent for it. Cache hits write these bytes out directly, and
+    the entry's budget weight is their total size.
+    """
+
+    variants: dict
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(body) for body in self.variants.values())
+
+    def to_bytes(self) -> bytes:
+        parts = []
+        for encoding, body in self.variants.items():
+            name = encoding.encode("ascii")
+            parts.append(struct.pack(">BI", len(name), len(body)))
+            parts.append(name)
+            parts.append(body)
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, blob: bytes) -> "_EncodedResponse":
+        variants = {}
+        pos = 0
+        view = memoryview(blob)
+        while pos < len(blob):
+            name_len, body_len = struct.unpack_from(">BI", blob, pos)
+            pos += 5
+            name = bytes(view[pos:pos + name_len]).decode("ascii")
+            pos += name_len
+            variants[name] = bytes(view[pos:pos + body_len])
+            pos += body_len
+        if pos != len(blob) or "identity" not in variants:
+            raise ValueError("malformed encoded response")
+        return cls(variants)
+
+
+def _encode_json_response(payload) -> _EncodedResponse:
+    """Serialize exactly as jsonify() would, then compress with flask-compress's settings."""
+    body = app.json.response(payload).get_data()
+    variants = {"identity": body}
+    if len(body) >= app.config.get("COMPRESS_MIN_SIZE", 500):
+        if brotli is not None:
+            variants["br"] = brotli.compress(
+                body,
+                mode=app.config.get("COMPRESS_BR_MODE", 0),
+                quality=app.config.get("COMPRESS_BR_LEVEL", 4),
+                lgwin=app.config.get("COMPRESS_BR_WINDOW", 22),
+                lgblock=app.config.get("COMPRESS_BR_BLOCK", 0),
+            )
+        variants["gzip"] = gzip.compress(body, compresslevel=app.config.get("COMPRESS_LEVEL", 6), mtime=0)
+    return _EncodedResponse(variants)
+
+
+def _encoded_response_bytes(entry: _EncodedResponse) -> int:
+    return entry.nbytes
+
+
+def _send_encoded_response(entry: _EncodedResponse):
+    """Serve a stored entry in the best encoding the client accepts."""
+    offered = [encoding for encoding in ("br", "gzip") if encoding in entry.variants]
+    encoding = request.accept_encodings.best_match(offered) if offered else None
+    response = app.response_class(entry.variants[encoding or "identity"], mimetype="application/json")
+    if encoding:
+        # flask-compress leaves responses that already carry Content-Encoding alone.
+        response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    return response
 
 
 class _LruResponseCache:
-    """Thread-safe bounded in-memory cache with optional TTL and byte budget."""
+    """
+    Thread-safe bounded in-memory cache with optional TTL and byte budget.
+
+    `_items` is in LRU order (eviction); `_expiry` maps keys to their
+    deadline in insertion order. Entries normally live for the cache's TTL
+    and a hit does not refresh it, so the oldest insert expires first:
+    expiry pops from the front of `_expiry` until it reaches a live entry,
+    and get/set are O(1) amortized under one short-held lock. set() may cap
+    an entry's lifetime below the TTL (a promoted shared-tier hit keeps its
+    remaining shared lifetime); such an entry can sit behind a longer-lived
+    head, so get() also checks the entry's own deadline. Counters are kept
+    per cache and per key scope (the key text before the first ":", e.g.
+    "recommend" vs "replan").
+    """
 
     def __init__(
         self,
@@ -141,8 +260,19 @@ class _LruResponseCache:
         self.max_bytes = max(0, int(max_bytes))
         self._size_estimator = size_estimator
         self._lock = threading.Lock()
-        self._items: OrderedDict[str, tuple[float, object, int]] = OrderedDict()
+        self._items: OrderedDict[str, tuple[object, int, float]] = OrderedDict()
+        self._expiry: OrderedDict[str, float] = OrderedDict()
         self._total_bytes = 0
+        self._reset_counters_locked()
+
+    def _reset_counters_locked(self) -> None:
+        self._hits = 0
+        self._misses = 0
+        self._expirations = 0
+        self._evictions_by_count = 0
+        self._evictions_by_bytes = 0
+        self._rejected_oversize = 0
+        self._scope_counts: dict[str, list[int]] = {}
 
     def _estimate_size(self, value) -> int:
         if self._size_estimator is None:
@@ -153,84 +283,446 @@ class _LruResponseCache:
         except (TypeError, ValueError):
             return 0
 
-    def _is_expired(self, stored_at: float, now: float) -> bool:
-        return self.ttl_seconds > 0 and (now - stored_at) >= self.ttl_seconds
-
-    def _purge_expired_locked(self, now: float) -> None:
-        if self.ttl_seconds <= 0:
-            return
-        expired_keys = [
-            key
-            for key, (stored_at, _, _) in self._items.items()
-            if self._is_expired(stored_at, now)
-        ]
-        for key in expired_keys:
-            _, _, weight = self._items.pop(key)
-            self._total_bytes -= weight
+    def _expire_locked(self, now: float) -> None:
+        expiry = self._expiry
+        while expiry:
+            key, expires_at = next(iter(expiry.items()))
+            if expires_at > now:
+                return
+            expiry.popitem(last=False)
+            self._total_bytes -= self._items.pop(key)[1]
+            self._expirations += 1
 
     def _trim_locked(self) -> None:
-        while self._items and (
-            len(self._items) > self.max_size
-            or (self.max_bytes > 0 and self._total_bytes > self.max_bytes)
-        ):
-            _, (_, _, weight) = self._items.popitem(last=False)
+        while self._items:
+            if len(self._items) > self.max_size:
+                self._evictions_by_count += 1
+            elif self.max_bytes > 0 and self._total_bytes > self.max_bytes:
+                self._evictions_by_bytes += 1
+            else:
+                return
+            key, (_, weight, _) = self._items.popitem(last=False)
+            self._expiry.pop(key, None)
             self._total_bytes -= weight
 
+    def _count_locked(self, key: str, hit: bool) -> None:
+        scope = key.partition(":")[0]
+        counts = self._scope_counts.get(scope)
+        if counts is None:
+            counts = self._scope_counts[scope] = [0, 0]
+        if hit:
+            self._hits += 1
+            counts[0] += 1
+        else:
+            self._misses += 1
+            counts[1] += 1
+
     def get(self, key: str):
         with self._lock:
             now = time.monotonic()
-            self._purge_expired_locked(now)
-            if key not in self._items:
+            self._expire_locked(now)
+            entry = self._items.get(key)
+            if entry is not None and entry[2] and entry[2] <= now:
+                del self._items[key]
+                del self._expiry[key]
+                self._total_bytes -= entry[1]
+                self._expirations += 1
+                entry = None
+            if entry is None:
+                self._count_locked(key, hit=False)
                 return None
-            stored_at, value, weight = self._items.pop(key)
-            if self._is_expired(stored_at, now):
-                self._total_bytes -= weight
-                return None
-            self._items[key] = (stored_at, value, weight)
-            return value
-
-    def set(self, key: str, value) -> None:
+            self._items.move_to_end(key)
+            self._count_locked(key, hit=True)
+            return entry[0]
+
+    def set(self, key: str, value, *, ttl_seconds: float | None = None) -> None:
+        """Store `value`; `ttl_seconds` can only shorten the cache's own TTL for this entry."""
+        weight = self._estimate_size(value)
+        lifetime = self.ttl_seconds
+        if ttl_seconds is not None:
+            lifetime = min(lifetime, ttl_seconds) if lifetime > 0 else ttl_seconds
+            if lifetime <= 0:
+                return
         with self._lock:
             now = time.monotonic()
-            self._purge_expired_locked(now)
-            weight = self._estimate_size(value)
+            self._expire_locked(now)
             if self.max_bytes > 0 and weight > self.max_bytes:
+                self._rejected_oversize += 1
                 return
-            if key in self._items:
-                _, _, existing_weight = self._items.pop(key)
-                self._total_bytes -= existing_weight
-            self._items[key] = (now, value, weight)
+            existing = self._items.pop(key, None)
+            if existing is not None:
+                self._expiry.pop(key, None)
+                self._total_bytes -= existing[1]
+            expires_at = now + lifetime if lifetime > 0 else 0.0
+            self._items[key] = (value, weight, expires_at)
+            if expires_at:
+                self._expiry[key] = expires_at
             self._total_bytes += weight
             self._trim_locked()
 
     def clear(self) -> None:
+        """Drop every entry and reset the counters, so stats describe only what follows."""
         with self._lock:
             self._items.clear()
+            self._expiry.clear()
             self._total_bytes = 0
+            self._reset_counters_locked()
 
+    def stats(self) -> dict:
+        with self._lock:
+            self._expire_locked(time.monotonic())
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._items),
+                "bytes": self._total_bytes,
+                "max_entries": self.max_size,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "expirations": self._expirations,
+                "evictions_by_count": self._evictions_by_count,
+                "evictions_by_bytes": self._evictions_by_bytes,
+                "rejected_oversize": self._rejected_oversize,
+                "scopes": {
+                    scope: {"hits": hits, "misses": misses}
+                    for scope, (hits, misses) in sorted(self._scope_counts.items())
+                },
+            }
 
-_recommend_response_cache = _LruResponseCache(
-    _RECOMMEND_CACHE_SIZE,
-    ttl_seconds=_RECOMMEND_CACHE_TTL_SECONDS,
-    max_bytes=_RECOMMEND_CACHE_MAX_BYTES,
-    size_estimator=_estimate_json_payload_bytes,
-)
-_can_take_response_cache = _LruResponseCache(
-    _CAN_TAKE_CACHE_SIZE,
-    ttl_seconds=_CAN_TAKE_CACHE_TTL_SECONDS,
-    max_bytes=_CAN_TAKE_CACHE_MAX_BYTES,
-    size_estimator=_estimate_json_payload_bytes,
-)
-_program_data_cache = _LruResponseCache(
-    _PROGRAM_DATA_CACHE_SIZE,
-    ttl_seconds=_PROGRAM_DATA_CACHE_TTL_SECONDS,
-)
+
+def _build_shared_response_cache() -> SharedCacheBackend | None:
+    try:
+        shared = build_shared_cache(
+            _SHARED_CACHE_URL,
+            max_bytes=_SHARED_CACHE_MAX_BYTES,
+            timeout_seconds=_SHARED_CACHE_TIMEOUT_SECONDS,
+        )
+    except ValueError as exc:
+        print(f"[WARN] Ignoring SHARED_CACHE_URL: {exc}", file=sys.stderr)
+        return None
+    if shared is not None:
+        print(f"[OK] Shared response cache enabled ({shared.kind})")
+    return shared
+
+
+_shared_response_cache = _build_shared_response_cache()
+
+
+# Shared-tier values start with their wall-clock expiry (0.0 = none), so a
+# promoted hit can keep the remaining lifetime instead of a fresh local TTL.
+_SHARED_ENTRY_HEADER = struct.Struct(">d")
+
+
+class _TieredResponseCache:
+    """
+    Per-process LRU in front of the optional shared backend.
+
+    Values are `_EncodedResponse` entries. A local miss falls through to
+    the shared tier, and a shared hit is promoted into the local LRU for at
+    most the shared entry's remaining lifetime. Writes go to both tiers with
+    the local cache's TTL; entries over its byte budget skip both.
+    Shared-tier keys are prefixed with `key_prefix` (the backend build id),
+    because the data version alone does not change when only code does.
+    Per-tier hit counters feed /health.
+    """
+
+    def __init__(
+        self,
+        local: _LruResponseCache,
+        shared: SharedCacheBackend | None = None,
+        *,
+        key_prefix: str = "",
+    ):
+        self.local = local
+        self.shared = shared
+        self.key_prefix = key_prefix
+        self._stats_lock = threading.Lock()
+        self._local_hits = 0
+        self._shared_hits = 0
+        self._misses = 0
+
+    def get(self, key: str):
+        value = self.local.get(key)
+        if value is None and self.shared is not None:
+            blob = self.shared.get(self.key_prefix + key)
+            if blob is not None:
+                remaining = None
+                try:
+                    (expires_at,) = _SHARED_ENTRY_HEADER.unpack_from(blob)
+                    value = _EncodedResponse.from_bytes(blob[_SHARED_ENTRY_HEADER.size:])
+                except (ValueError, struct.error):
+                    value = None
+                else:
+                    if expires_at:
+                        remaining = expires_at - time.time()
+                        if remaining <= 0:
+                            value = None
+                if value is not None:
+                    # Never outlive the shared copy: cap the local lifetime
+                    # at what the shared tier had left.
+                    self.local.set(key, value, ttl_seconds=remaining)
+                    with self._stats_lock:
+                        self._shared_hits += 1
+                    return value
+        with self._stats_lock:
+            if value is None:
+                self._misses += 1
+            else:
+                self._local_hits += 1
+        return value
+
+    def set(self, key: str, value: _EncodedResponse) -> None:
+        self.local.set(key, value)
+        if self.shared is None:
+            return
+        if self.local.max_bytes > 0 and value.nbytes > self.local.max_bytes:
+            return
+        ttl_seconds = self.local.ttl_seconds
+        expires_at = time.time() + ttl_seconds if ttl_seconds > 0 else 0.0
+        self.shared.set(
+            self.key_prefix + key,
+            _SHARED_ENTRY_HEADER.pack(expires_at) + value.to_bytes(),
+            ttl_seconds,
+        )
+
+    def clear(self) -> None:
+        self.local.clear()
+        with self._stats_lock:
+            self._local_hits = 0
+            self._shared_hits = 0
+            self._misses = 0
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            lookups = self._local_hits + self._shared_hits + self._misses
+            hits = self._local_hits + self._shared_hits
+            tiers = {
+                "local_hits": self._local_hits,
+                "shared_hits": self._shared_hits,
+                "misses": self._misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            }
+        tiers["local"] = self.local.stats()
+        return tiers
+
+
+class _SingleFlightTimeout(TimeoutError):
+    pass
+
+
+class _SingleFlight:
+    """
+    Run at most one computation per key at a time.
+
+    The first caller for a key runs `fn`; callers arriving while it runs
+    wait and get the same return value, or the same exception re-raised.
+    Nothing is remembered once the run finishes, so a failure is never
+    served to later requests. A waiter gives up after `wait_timeout`
+    seconds with _SingleFlightTimeout, so a stuck run cannot hold every
+    duplicate request behind it. Only threads of one process meet here,
+    so coalescing needs threaded workers (see gunicorn.conf.py).
+    """
+
+    class _Call:
+        __slots__ = ("done", "result", "error")
+
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error: BaseException | None = None
+
+    def __init__(self, wait_timeout: float | None = None):
+        self.wait_timeout = wait_timeout
+        self._lock = threading.Lock()
+        self._calls: dict[str, "_SingleFlight._Call"] = {}
+        self._runs = 0
+        self._coalesced = 0
+        self._wait_timeouts = 0
+
+    def do(self, key: str, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = self._Call()
+                self._runs += 1
+                leader = True
+            else:
+                self._coalesced += 1
+                leader = False
+        if not leader:
+            if not call.done.wait(self.wait_timeout):
+                with self._lock:
+                    self._wait_timeouts += 1
+                raise _SingleFlightTimeout(f"identical request still running after {self.wait_timeout}s")
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "runs": self._runs,
+                "coalesced": self._coalesced,
+                "wait_timeouts": self._wait_timeouts,
+                "in_flight": len(self._calls),
+            }
+
+
+# Process-wide: keys embed the data version, so runs never span snapshots.
+# Waiters give up when the worker timeout would have killed a sync request.
+_recommend_single_flight = _SingleFlight(wait_timeout=_SINGLE_FLIGHT_WAIT_SECONDS)
+
+
+class _CanonicalKeyIndex:
+    """
+    Bounded LRU from raw request keys to canonical cache keys.
+
+    An exact repeat of a body finds its canonical key here and can be served
+    before program resolution and course normalization run. It also counts
+    how many distinct raw bodies currently map to each canonical key.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max(1, int(max_size))
+        self._lock = threading.Lock()
+        self._aliases: OrderedDict[str, str] = OrderedDict()
+        self._bodies_per_key: dict[str, int] = {}
+
+    def get(self, raw_key: str) -> str | None:
+        with self._lock:
+            canonical_key = self._aliases.get(raw_key)
+            if canonical_key is not None:
+                self._aliases.move_to_end(raw_key)
+            return canonical_key
+
+    def record(self, raw_key: str, canonical_key: str) -> None:
+        with self._lock:
+            previous = self._aliases.pop(raw_key, None)
+            if previous is not None:
+                self._forget_locked(previous)
+            self._aliases[raw_key] = canonical_key
+            self._bodies_per_key[canonical_key] = self._bodies_per_key.get(canonical_key, 0) + 1
+            while len(self._aliases) > self.max_size:
+                _, evicted = self._aliases.popitem(last=False)
+                self._forget_locked(evicted)
+
+    def _forget_locked(self, canonical_key: str) -> None:
+        remaining = self._bodies_per_key.get(canonical_key, 0) - 1
+        if remaining > 0:
+            self._bodies_per_key[canonical_key] = remaining
+        else:
+            self._bodies_per_key.pop(canonical_key, None)
+
+    def raw_body_count(self, canonical_key: str) -> int:
+        with self._lock:
+            return self._bodies_per_key.get(canonical_key, 0)
+
+    def stats(self) -> dict:
+        with self._lock:
+            raw_bodies = len(self._aliases)
+            canonical_keys = len(self._bodies_per_key)
+            return {
+                "raw_bodies": raw_bodies,
+                "canonical_keys": canonical_keys,
+                "collapsed_bodies": raw_bodies - canonical_keys,
+                "max_bodies_per_key": max(self._bodies_per_key.values(), default=0),
+            }
+
+
+@dataclass(frozen=True)
+class _RuntimeSnapshot:
+    """
+    One published generation of runtime state.
+
+    The dataset, the prereq graph derived from it, and the response caches
+    filled from it are swapped together by rebinding `_snapshot`. Handlers
+    read `_snapshot` once at entry and use only that object, so a reload
+    finishing mid-request never mixes old and new state.
+    """
+
+    data: dict
+    reverse_map: dict
+    chain_depths: dict
+    # Bitset unlock reachability built from reverse_map; shared with it on reload.
+    unlock_index: UnlockIndex
+    # Content digest of the loaded sheets; identical data yields the same
+    # version in every worker and every deploy, so cache keys stay comparable.
+    data_version: str | None
+    recommend_cache: _TieredResponseCache
+    # Raw /recommend and /replan body keys -> canonical recommend_cache keys.
+    recommend_key_index: _CanonicalKeyIndex
+    can_take_cache: _TieredResponseCache
+    program_data_cache: _LruResponseCache
+
+
+def _new_runtime_snapshot(
+    data: dict,
+    reverse_map: dict,
+    chain_depths: dict,
+    data_version,
+    unlock_index: UnlockIndex | None = None,
+) -> _RuntimeSnapshot:
+    if unlock_index is None or unlock_index.reverse_map is not reverse_map:
+        unlock_index = build_unlock_index(reverse_map)
+    return _RuntimeSnapshot(
+        data=data,
+        reverse_map=reverse_map,
+        chain_depths=chain_depths,
+        unlock_index=unlock_index,
+        data_version=data_version,
+        recommend_cache=_TieredResponseCache(
+            _LruResponseCache(
+                _RECOMMEND_CACHE_SIZE,
+                ttl_seconds=_RECOMMEND_CACHE_TTL_SECONDS,
+                max_bytes=_RECOMMEND_CACHE_MAX_BYTES,
+                size_estimator=_encoded_response_bytes,
+            ),
+            _shared_response_cache,
+            key_prefix=_SHARED_CACHE_KEY_PREFIX,
+        ),
+        recommend_key_index=_CanonicalKeyIndex(4 * _RECOMMEND_CACHE_SIZE),
+        can_take_cache=_TieredResponseCache(
+            _LruResponseCache(
+                _CAN_TAKE_CACHE_SIZE,
+                ttl_seconds=_CAN_TAKE_CACHE_TTL_SECONDS,
+                max_bytes=_CAN_TAKE_CACHE_MAX_BYTES,
+                size_estimator=_encoded_response_bytes,
+            ),
+            _shared_response_cache,
+            key_prefix=_SHARED_CACHE_KEY_PREFIX,
+        ),
+        program_data_cache=_LruResponseCache(
+            _PROGRAM_DATA_CACHE_SIZE,
+            ttl_seconds=_PROGRAM_DATA_CACHE_TTL_SECONDS,
+        ),
+    )
 
 
 def _cache_enabled() -> bool:
     return not app.config.get("TESTING", False)
 
 
+def _cached_json_response(cache: _TieredResponseCache, key: str, payload):
+    """Encode `payload` once, store it under `key`, and serve the stored bytes."""
+    if not _cache_enabled():
+        return jsonify(payload)
+    entry = _encode_json_response(payload)
+    cache.set(key, entry)
+    return _send_encoded_response(entry)
+
+
 def _stable_payload_hash(payload) -> str:
     normalized = payload if payload is not None else {}
     encoded = json.dumps(
@@ -242,22 +734,21 @@ def _stable_payload_hash(payload) -> str:
     return hashlib.sha256(encoded).hexdigest()
 
 
-def _data_version_tag() -> str:
-    return "none" if _data_mtime is None else str(_data_mtime)
+def _data_version_tag(snapshot: _RuntimeSnapshot | None = None) -> str:
+    snapshot = snapshot or _snapshot
+    return "none" if snapshot.data_version is None else str(snapshot.data_version)
 
 
-def _request_cache_key(prefix: str, payload) -> str:
-    return f"{prefix}:{_data_version_tag()}:{_stable_payload_hash(payload)}"
+def _request_cache_key(prefix: str, payload, snapshot: _RuntimeSnapshot) -> str:
+    return f"{prefix}:{_data_version_tag(snapshot)}:{_stable_payload_hash(payload)}"
 
 
-def _program_data_cache_key(prefix: str, payload) -> str:
-    return _request_cache_key(prefix, payload)
-
-
-def _clear_request_caches() -> None:
-    _recommend_response_cache.clear()
-    _can_take_response_cache.clear()
-    _program_data_cache.clear()
+def _program_data_cache_key(prefix: str, payload, data: dict) -> str:
+    # Keyed by the version of the dataset being sliced, not the live snapshot,
+    # so a request that started before a swap cannot publish old slices under
+    # the new version.
+    version = data.get("data_version") or "none"
+    return f"{prefix}:{version}:{_stable_payload_hash(payload)}"
 
 
 def _check_window_rate_limit(
@@ -308,16 +799,25 @@ def _client_ip() -> str:
     return request.headers.get("X-Forwarded-For", request.remote_addr or "").split(",")[0].strip()
 
 
-def _data_file_mtime(path: str):
+def _data_file_stat_signature(path: str):
     try:
         if os.path.isdir(path):
-            mtimes = [
-                os.path.getmtime(os.path.join(path, f))
-                for f in os.listdir(path)
-                if f.endswith(".csv")
-            ]
-            return max(mtimes) if mtimes else None
-        return os.path.getmtime(path)
+            signature = []
+            for f in sorted(os.listdir(path)):
+                if not f.endswith(".csv"):
+                    continue
+                stat = os.stat(os.path.join(path, f))
+                signature.append((f, stat.st_mtime_ns, stat.st_size))
+            return tuple(signature) if signature else None
+        stat = os.stat(path)
+        return ((os.path.basename(path), stat.st_mtime_ns, stat.st_size),)
+    except OSError:
+        return None
+
+
+def _data_content_version(path: str):
+    try:
+        return compute_data_version(compute_sheet_digests(path))
     except OSError:
         return None
 
@@ -340,7 +840,25 @@ def _feedback_storage_configured() -> bool:
     return bool(str(os.environ.get("FEEDBACK_PATH", "")).strip())
 
 
+def _load_profile_summary(data: dict, top: int = 3) -> dict | None:
+    profile = data.get("load_profile") if data else None
+    if not profile:
+        return None
+    stages = sorted(profile.get("stages") or [], key=lambda stage: stage["wall_ms"], reverse=True)
+    prereq_cache = data.get("prereq_cache")
+    return {
+        "mode": profile.get("mode"),
+        "total_ms": profile.get("total_ms"),
+        "slowest_stages": [
+            {"stage": stage["stage"], "wall_ms": stage["wall_ms"], "rows_out": stage["rows_out"]}
+            for stage in stages[:top]
+        ],
+        "prereq_cache": prereq_cache.stats() if prereq_cache is not None else None,
+    }
+
+
 def _health_payload() -> dict:
+    snapshot = _snapshot
     frontend_ready = _frontend_ready()
     return {
         "status": "ok" if frontend_ready else "degraded",
@@ -354,15 +872,41 @@ def _health_payload() -> dict:
             "data_path": DATA_PATH,
             "feedback_path": _feedback_path(),
         },
-        "courses_loaded": len(_data.get("catalog_codes", [])),
+        "courses_loaded": len(snapshot.data.get("catalog_codes", [])),
+        "data_version": _data_version_tag(snapshot),
+        "data_load": _load_profile_summary(snapshot.data),
+        "allocation_memo": get_allocation_memo().stats(),
+        "response_cache": {
+            "recommend": snapshot.recommend_cache.stats(),
+            "recommend_keys": snapshot.recommend_key_index.stats(),
+            "can_take": snapshot.can_take_cache.stats(),
+            "program_data": snapshot.program_data_cache.stats(),
+            "shared": _shared_response_cache.stats() if _shared_response_cache is not None else None,
+        },
+        "recommend_single_flight": _recommend_single_flight.stats(),
         "version": os.environ.get("RENDER_GIT_COMMIT", "dev")[:7],
     }
 
+def _load_runtime_dataset(path: str) -> dict:
+    """Load runtime data, preferring a precompiled bundle when one matches."""
+    bundled = load_runtime_bundle(path)
+    if bundled is not None:
+        print(f"[OK] Using precompiled runtime bundle for {path}")
+        return bundled
+    return load_data(path)
+
+
+def _reload_runtime_dataset(path: str, previous: dict) -> dict:
+    """Reload runtime data, rebuilding only the load stages whose sheets changed."""
+    bundled = load_runtime_bundle(path)
+    if bundled is not None:
+        print(f"[OK] Using precompiled runtime bundle for {path}")
+        return bundled
+    return reload_data(path, previous)
+
 # ── Startup data load ──────────────────────────────────────────────────────────
 try:
-    _data = load_data(DATA_PATH)
-    _data_mtime = _data_file_mtime(DATA_PATH)
-    print(f"[OK] Loaded {len(_data['catalog_codes'])} courses from {DATA_PATH}")
+    _startup_data = _load_runtime_dataset(DATA_PATH)
 except FileNotFoundError:
     # Render safety: if DATA_PATH env var is stale, fall back to repo workbook.
     if DATA_PATH != _DEFAULT_DATA_PATH and os.path.exists(_DEFAULT_DATA_PATH):
@@ -372,79 +916,215 @@ except FileNotFoundError:
             file=sys.stderr,
         )
         DATA_PATH = _DEFAULT_DATA_PATH
-        _data = load_data(DATA_PATH)
-        _data_mtime = _data_file_mtime(DATA_PATH)
-        print(f"[OK] Loaded {len(_data['catalog_codes'])} courses from {DATA_PATH}")
+        _startup_data = _load_runtime_dataset(DATA_PATH)
     else:
         print(f"[FATAL] Data file not found: {DATA_PATH}", file=sys.stderr)
         sys.exit(1)
 except Exception as exc:
     print(f"[FATAL] Failed to load data: {exc}", file=sys.stderr)
     sys.exit(1)
+_data_file_signature = _data_file_stat_signature(DATA_PATH)
+print(f"[OK] Loaded {len(_startup_data['catalog_codes'])} courses from {DATA_PATH}")
+
+_startup_reverse_map = build_reverse_prereq_map(_startup_data["courses_df"], _startup_data["prereq_map"])
+# The live runtime generation. Only _publish_snapshot() rebinds it.
+_snapshot = _new_runtime_snapshot(
+    _startup_data,
+    _startup_reverse_map,
+    compute_chain_depths(_startup_reverse_map),
+    _startup_data.get("data_version") or _data_content_version(DATA_PATH),
+)
+del _startup_data, _startup_reverse_map
+# Module-level aliases of the live snapshot for scripts and tests. Request
+# handlers read `_snapshot` instead so they see one consistent generation.
+_data = _snapshot.data
+_reverse_map = _snapshot.reverse_map
+_chain_depths = _snapshot.chain_depths
+_data_version = _snapshot.data_version
 
-_reverse_map = build_reverse_prereq_map(_data["courses_df"], _data["prereq_map"])
-_chain_depths = compute_chain_depths(_reverse_map)
+
+def _publish_snapshot(snapshot: _RuntimeSnapshot) -> None:
+    global _snapshot, _data, _reverse_map, _chain_depths, _data_version
+    _snapshot = snapshot
+    _data = snapshot.data
+    _reverse_map = snapshot.reverse_map
+    _chain_depths = snapshot.chain_depths
+    _data_version = snapshot.data_version
 
 
 def _reload_data_if_changed(force: bool = False) -> bool:
     """
-    Hot-reload workbook-backed runtime data when DATA_PATH changes on disk.
+    Hot-reload workbook-backed runtime data when DATA_PATH content changes.
+
+    File stats are only a cheap pre-check; a reload happens when the sheet
+    content digest differs from the loaded dataset version, so touching files
+    without editing them keeps the current data and caches. The new dataset
+    is built next to the live one and published as a fresh snapshot.
 
     Returns True when a reload occurred, else False.
     """
-    global _data, _reverse_map, _chain_depths, _data_mtime
+    global _data_file_signature
 
-    candidate_mtime = _data_file_mtime(DATA_PATH)
+    candidate_signature = _data_file_stat_signature(DATA_PATH)
     if not force:
-        if candidate_mtime is None:
+        if candidate_signature is None:
             return False
-        if _data_mtime is not None and candidate_mtime <= _data_mtime:
+        if candidate_signature == _data_file_signature:
             return False
 
     with _data_lock:
-        latest_mtime = _data_file_mtime(DATA_PATH)
+        current = _snapshot
+        latest_signature = _data_file_stat_signature(DATA_PATH)
+        latest_version = _data_content_version(DATA_PATH)
         if not force:
-            if latest_mtime is None:
+            if latest_signature is None or latest_version is None:
                 return False
-            if _data_mtime is not None and latest_mtime <= _data_mtime:
+            if latest_signature == _data_file_signature:
+                return False
+            if current.data_version is not None and latest_version == current.data_version:
+                _data_file_signature = latest_signature
                 return False
 
         try:
-            new_data = load_data(DATA_PATH)
-            new_reverse_map = build_reverse_prereq_map(
-                new_data["courses_df"],
-                new_data["prereq_map"],
-            )
-            new_chain_depths = compute_chain_depths(new_reverse_map)
+            new_data = _reload_runtime_dataset(DATA_PATH, current.data)
+            if (
+                new_data.get("catalog_codes") is current.data.get("catalog_codes")
+                and new_data.get("prereq_map") is current.data.get("prereq_map")
+            ):
+                # Catalog and prereqs were reused, so the prereq graph is unchanged.
+                new_reverse_map = current.reverse_map
+                new_chain_depths = current.chain_depths
+                new_unlock_index = current.unlock_index
+            else:
+                new_reverse_map = build_reverse_prereq_map(
+                    new_data["courses_df"],
+                    new_data["prereq_map"],
+                )
+                new_chain_depths = compute_chain_depths(new_reverse_map)
+                new_unlock_index = build_unlock_index(new_reverse_map)
         except Exception as exc:
             print(f"[WARN] Data reload failed; keeping previous dataset: {exc}", file=sys.stderr)
             return False
 
-        _data = new_data
-        _reverse_map = new_reverse_map
-        _chain_depths = new_chain_depths
-        _data_mtime = latest_mtime if latest_mtime is not None else candidate_mtime
-        _clear_request_caches()
+        _publish_snapshot(
+            _new_runtime_snapshot(
+                new_data,
+                new_reverse_map,
+                new_chain_depths,
+                new_data.get("data_version") or latest_version,
+                new_unlock_index,
+            )
+        )
+        _data_file_signature = latest_signature
         print(f"[OK] Reloaded {len(new_data['catalog_codes'])} courses from {DATA_PATH}")
+        _warm_runtime_snapshot(_snapshot)
         return True
 
 
-_last_mtime_check: float = 0.0
-_MTIME_CHECK_INTERVAL = 30.0  # seconds — data is baked into the Docker image on Render
-_mtime_check_lock = threading.Lock()
+def _warm_program_ids() -> list[str]:
+    raw = str(os.environ.get("RUNTIME_INDEX_WARM_PROGRAMS", "")).strip()
+    return [pid.strip().upper() for pid in raw.split(",") if pid.strip()]
 
 
-def _refresh_data_if_needed() -> None:
-    global _last_mtime_check
-    now = time.monotonic()
-    with _mtime_check_lock:
-        if now - _last_mtime_check < _MTIME_CHECK_INTERVAL:
-            return
-        _last_mtime_check = now
+def _warm_runtime_snapshot(snapshot: _RuntimeSnapshot) -> None:
+    """
+    Eagerly build runtime indexes for RUNTIME_INDEX_WARM_PROGRAMS.
+
+    Track indexes are otherwise built on first use. Each listed program gets
+    its base track index and its single-major slice (cached in the snapshot's
+    program-data cache) built now, so the first request for a high-traffic
+    program skips that work. In preload mode this runs in the master, and
+    workers share the result.
+    """
+    program_ids = _warm_program_ids()
+    if not program_ids:
+        return
+    started = time.perf_counter()
+    data = snapshot.data
+    warmed = 0
     try:
-        _reload_data_if_changed()
+        tracks = data.get("runtime_indexes", {}).get("tracks")
+        if hasattr(tracks, "warm"):
+            warmed += tracks.warm(program_ids)
+        if _is_v2_program_model_enabled(data):
+            for program_id in program_ids:
+                program_data = _build_single_major_data_v2(data, program_id, None)
+                program_tracks = program_data.get("runtime_indexes", {}).get("tracks")
+                if hasattr(program_tracks, "warm"):
+                    warmed += program_tracks.warm()
     except Exception as exc:
-        print(f"[WARN] Data reload check failed: {exc}", file=sys.stderr)
+        print(f"[WARN] Runtime index warm-up failed: {exc}", file=sys.stderr)
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000.0
+    print(f"[OK] Warmed {warmed} track indexes for {len(program_ids)} programs ({elapsed_ms:.0f} ms)")
+
+
+_DATA_RELOAD_INTERVAL_SECONDS = _env_float("DATA_RELOAD_INTERVAL_SECONDS", 30.0, minimum=0.0)
+_reloader_lock = threading.Lock()
+_reloader_thread: threading.Thread | None = None
+_reloader_pid: int | None = None
+_reloader_stop = threading.Event()
+# Cleared by backend/gunicorn.conf.py in preload mode: the master owns reloads
+# (SIGHUP) so forked workers keep sharing one copy-on-write dataset.
+_worker_reload_enabled = True
+
+
+def _background_reload_loop(stop: threading.Event, interval: float) -> None:
+    while not stop.wait(interval):
+        try:
+            _reload_data_if_changed()
+        except Exception as exc:
+            print(f"[WARN] Data reload check failed: {exc}", file=sys.stderr)
+
+
+def _ensure_background_reloader() -> None:
+    """
+    Start the per-process data reloader thread on first use.
+
+    Started lazily rather than at import so each forked worker owns its own
+    thread. Disabled in preload mode, in tests, and when
+    DATA_RELOAD_INTERVAL_SECONDS=0.
+    """
+    global _reloader_thread, _reloader_pid
+    if (
+        not _worker_reload_enabled
+        or _DATA_RELOAD_INTERVAL_SECONDS <= 0
+        or app.config.get("TESTING", False)
+    ):
+        return
+    pid = os.getpid()
+    if _reloader_pid == pid and _reloader_thread is not None and _reloader_thread.is_alive():
+        return
+    with _reloader_lock:
+        if _reloader_pid == pid and _reloader_thread is not None and _reloader_thread.is_alive():
+            return
+        _reloader_stop.clear()
+        thread = threading.Thread(
+            target=_background_reload_loop,
+            args=(_reloader_stop, _DATA_RELOAD_INTERVAL_SECONDS),
+            name="marqbot-data-reloader",
+            daemon=True,
+        )
+        thread.start()
+        _reloader_thread = thread
+        _reloader_pid = pid
+
+
+def _stop_background_reloader(timeout: float | None = None) -> None:
+    global _reloader_thread, _reloader_pid
+    with _reloader_lock:
+        thread = _reloader_thread
+        _reloader_stop.set()
+        _reloader_thread = None
+        _reloader_pid = None
+    if thread is not None and thread is not threading.current_thread():
+        thread.join(timeout)
+
+
+def _request_snapshot() -> _RuntimeSnapshot:
+    """Return the runtime snapshot a request should use from start to finish."""
+    _ensure_background_reloader()
+    return _snapshot
 
 
 # ── Input validation ───────────────────────────────────────────────────────────
@@ -565,7 +1245,7 @@ def _normalize_feedback_context(raw_context):
             return None, f"context.session_snapshot.{key} must be an array."
     normalized_session["student_stage"] = normalized_student_stage or infer_student_stage_from_courses(
         normalized_session["completed"] + normalized_session["in_progress"],
-        _data.get("courses_df") if _data else None,
+        _snapshot.data.get("courses_df") if _snapshot.data else None,
     )
 
     normalized_context = {
@@ -1034,8 +1714,10 @@ def _build_single_major_data_v2(data: dict, major_id: str, selected_track_id: st
             "major_id": major_id,
             "selected_track_id": selected_track,
         },
+        data,
     )
-    cached = _program_data_cache.get(cache_key)
+    program_data_cache = _snapshot.program_data_cache
+    cached = program_data_cache.get(cache_key)
     if cached is not None:
         return cached
 
@@ -1047,7 +1729,7 @@ def _build_single_major_data_v2(data: dict, major_id: str, selected_track_id: st
 
     if len(v2_buckets) == 0 or len(v2_sub) == 0:
         merged = ensure_runtime_indexes(dict(data))
-        _program_data_cache.set(cache_key, merged)
+        program_data_cache.set(cache_key, merged)
         return merged
 
     buckets = v2_buckets.copy()
@@ -1308,7 +1990,7 @@ def _build_single_major_data_v2(data: dict, major_id: str, selected_track_id: st
     merged["buckets_df"] = runtime_buckets
     merged["course_bucket_map_df"] = runtime_map
     merged = ensure_runtime_indexes(merged, force=True)
-    _program_data_cache.set(cache_key, merged)
+    program_data_cache.set(cache_key, merged)
     return merged
 
 def _apply_discovery_theme_filter(
@@ -1440,8 +2122,10 @@ def _build_declared_plan_data_v2(
             "declared_minors": list(declared_minors),
             "discovery_theme": discovery_theme,
         },
+        data,
     )
-    cached = _program_data_cache.get(cache_key)
+    program_data_cache = _snapshot.program_data_cache
+    cached = program_data_cache.get(cache_key)
     if cached is not None:
         return cached
 
@@ -1580,7 +2264,7 @@ def _build_declared_plan_data_v2(
         data.get("courses_df", pd.DataFrame()),
     )
     merged = ensure_runtime_indexes(merged, force=True)
-    _program_data_cache.set(cache_key, merged)
+    program_data_cache.set(cache_key, merged)
     return merged
 
 
@@ -2059,8 +2743,10 @@ def _build_declared_plan_data(data: dict, selected_program_ids: list[str], catal
         {
             "selected_program_ids": list(selected_program_ids),
         },
+        data,
     )
-    cached = _program_data_cache.get(cache_key)
+    program_data_cache = _snapshot.program_data_cache
+    cached = program_data_cache.get(cache_key)
     if cached is not None:
         return cached
 
@@ -2104,7 +2790,7 @@ def _build_declared_plan_data(data: dict, selected_program_ids: list[str], catal
     merged["buckets_df"] = buckets
     merged["course_bucket_map_df"] = course_map
     merged = ensure_runtime_indexes(merged, force=True)
-    _program_data_cache.set(cache_key, merged)
+    program_data_cache.set(cache_key, merged)
     return merged
 
 
@@ -2126,52 +2812,30 @@ def _build_current_progress(
       - completed-only counts
       - completed+in-progress assumed counts
     """
-    completed_only_alloc = allocate_courses(
-        completed,
-        in_progress,
-        data["buckets_df"],
-        data["course_bucket_map_df"],
-        data["courses_df"],
-        data["equivalencies_df"],
-        track_id=track_id,
-        double_count_policy_df=data.get("v2_double_count_policy_df"),
-        runtime_indexes=data.get("runtime_indexes"),
-    )
-    assumed_alloc = allocate_courses(
-        _dedupe_codes(completed + in_progress),
-        [],
-        data["buckets_df"],
-        data["course_bucket_map_df"],
-        data["courses_df"],
-        data["equivalencies_df"],
-        track_id=track_id,
-        double_count_policy_df=data.get("v2_double_count_policy_df"),
-        runtime_indexes=data.get("runtime_indexes"),
-    )
+    def _start(codes):
+        return start_allocation(
+            codes,
+            data["buckets_df"],
+            data["course_bucket_map_df"],
+            data["courses_df"],
+            data["equivalencies_df"],
+            track_id=track_id,
+            double_count_policy_df=data.get("v2_double_count_policy_df"),
+            runtime_indexes=data.get("runtime_indexes"),
+        )
+
+    # The assumed snapshots only add in-progress courses on top of completed,
+    # so each is an extension of its completed-only state, not a rebuild.
+    completed_state = _start(completed)
+    completed_only_alloc = completed_state.result(in_progress)
+    assumed_alloc = completed_state.extended_to(_dedupe_codes(completed + in_progress)).result([])
     raw_completed = _dedupe_codes(input_completed if input_completed is not None else completed)
     raw_in_progress = _dedupe_codes(input_in_progress if input_in_progress is not None else in_progress)
-    raw_completed_alloc = allocate_courses(
-        raw_completed,
-        raw_in_progress,
-        data["buckets_df"],
-        data["course_bucket_map_df"],
-        data["courses_df"],
-        data["equivalencies_df"],
-        track_id=track_id,
-        double_count_policy_df=data.get("v2_double_count_policy_df"),
-        runtime_indexes=data.get("runtime_indexes"),
-    )
-    raw_assumed_alloc = allocate_courses(
-        _dedupe_codes(raw_completed + raw_in_progress),
-        [],
-        data["buckets_df"],
-        data["course_bucket_map_df"],
-        data["courses_df"],
-        data["equivalencies_df"],
-        track_id=track_id,
-        double_count_policy_df=data.get("v2_double_count_policy_df"),
-        runtime_indexes=data.get("runtime_indexes"),
-    )
+    raw_completed_state = completed_state if raw_completed == completed else _start(raw_completed)
+    raw_completed_alloc = raw_completed_state.result(raw_in_progress)
+    raw_assumed_alloc = raw_completed_state.extended_to(
+        _dedupe_codes(raw_completed + raw_in_progress)
+    ).result([])
 
     bucket_order = list(dict.fromkeys(
         completed_only_alloc.get("bucket_order", [])
@@ -2375,11 +3039,12 @@ def index():
 
 
 def get_courses():
-    _refresh_data_if_needed()
-    if not _data:
+    snapshot = _request_snapshot()
+    data = snapshot.data
+    if not data:
         return jsonify({"error": "Data not loaded"}), 500
     cols = ["course_code", "course_name", "credits", "level", "prereq_level", "description", "catalog_prereq_raw"]
-    df = _data["courses_df"].copy()
+    df = data["courses_df"].copy()
     for col in cols:
         if col not in df.columns:
             df[col] = None
@@ -2406,13 +3071,14 @@ def get_courses():
 @app.route("/programs", methods=["GET"])
 def get_programs():
     """Return published program catalog for the major/track selector."""
-    _refresh_data_if_needed()
-    if not _data:
+    snapshot = _request_snapshot()
+    data = snapshot.data
+    if not data:
         return jsonify({"error": "Data not loaded"}), 500
 
-    catalog_df, _, _ = _get_program_catalog(_data)
-    parent_buckets_df = _data.get("parent_buckets_df", pd.DataFrame())
-    child_buckets_df = _data.get("child_buckets_df", pd.DataFrame())
+    catalog_df, _, _ = _get_program_catalog(data)
+    parent_buckets_df = data.get("parent_buckets_df", pd.DataFrame())
+    child_buckets_df = data.get("child_buckets_df", pd.DataFrame())
     default_program_id = _default_program_id_from_catalog(catalog_df)
     if len(catalog_df) == 0:
         return jsonify({
@@ -2491,8 +3157,9 @@ def get_programs():
 @app.route("/program-buckets", methods=["GET"])
 def get_program_buckets():
     """Return bucket tree structure for given program IDs."""
-    _refresh_data_if_needed()
-    if not _data:
+    snapshot = _request_snapshot()
+    data = snapshot.data
+    if not data:
         return jsonify({"error": "Data not loaded"}), 500
 
     raw_ids = request.args.get("programs", "")
@@ -2500,9 +3167,9 @@ def get_program_buckets():
     if not program_ids:
         return jsonify({"programs": []})
 
-    parent_buckets_df = _data.get("parent_buckets_df", pd.DataFrame())
-    child_buckets_df = _data.get("child_buckets_df", pd.DataFrame())
-    master_bucket_courses_df = _data.get("master_bucket_courses_df", pd.DataFrame())
+    parent_buckets_df = data.get("parent_buckets_df", pd.DataFrame())
+    child_buckets_df = data.get("child_buckets_df", pd.DataFrame())
+    master_bucket_courses_df = data.get("master_bucket_courses_df", pd.DataFrame())
 
     # Build course-count and sample-courses lookup per child bucket
     child_course_counts = {}
@@ -2616,144 +3283,96 @@ def feedback_endpoint():
     }), 201
 
 
-def _recommend_endpoint(*, include_current_state: bool, cache_scope: str):
-    client_ip = _client_ip()
-    if not app.config.get("TESTING") and not _check_rate_limit(client_ip):
-        return jsonify({
-            "mode": "error",
-            "error": {"error_code": "RATE_LIMITED", "message": "Too many requests. Please wait before submitting again."},
-        }), 429
-    _refresh_data_if_needed()
-    if not _data:
-        return jsonify({"mode": "error", "error": {"error_code": "SERVER_ERROR", "message": "Data not loaded."}}), 500
-
-    body = request.get_json(force=True, silent=True)
-    err_code, err_msg = _validate_recommend_body(body)
-    if err_code:
-        return jsonify({
-            "mode": "error",
-            "error": {"error_code": err_code, "message": err_msg},
-        }), 400
-
-    cache_key = _request_cache_key(cache_scope, body)
-    if _cache_enabled():
-        cached = _recommend_response_cache.get(cache_key)
-        if cached is not None:
-            return jsonify(cached)
+def _canonical_plan_request(
+    selection: dict,
+    *,
+    completed: list[str],
+    in_progress: list[str],
+    selected_courses: list[str],
+    not_in_catalog: list[str],
+    target_semesters: list[str | None],
+    target_semester_count: int,
+    requested_course_raw,
+    max_recs: int,
+    include_summer: bool,
+    is_honors_student: bool,
+    debug_mode: bool,
+    debug_limit: int,
+    student_stage: str | None,
+    scheduling_style: str | None,
+) -> dict:
+    """
+    Canonical form of a /recommend or /replan body, used as its cache key.
+
+    Built from already-normalized inputs, so course-code casing and spacing,
+    list order and duplicates in completed/in-progress/not-in-catalog codes,
+    legacy field names
+    (`target_semester`, `track_id`), and explicit defaults all collapse to
+    one key. _build_recommend_payload() reads its inputs from this dict, so
+    the key covers everything the response depends on.
+    """
+    requested_course = None
+    if requested_course_raw:
+        raw = str(requested_course_raw).strip()
+        requested_course = normalize_code(raw) or raw
+    return {
+        "selection": {key: value for key, value in selection.items() if key != "effective_data"},
+        "completed": completed,
+        "in_progress": in_progress,
+        "selected": selected_courses,
+        "not_in_catalog": not_in_catalog,
+        "target_semesters": target_semesters,
+        "target_semester_count": target_semester_count,
+        "requested_course": requested_course,
+        "max_recommendations": max_recs,
+        "include_summer": include_summer,
+        "is_honors_student": is_honors_student,
+        "debug": debug_mode,
+        "debug_limit": debug_limit,
+        "student_stage": student_stage,
+        "scheduling_style": scheduling_style,
+    }
 
-    # Recommendations require at least one declared program from the UI.
-    declared_majors_raw = body.get("declared_majors", None)
-    track_ids_raw = body.get("track_ids", None)
-    track_raw = body.get("track_id", None)
-    has_track_context = False
-    if isinstance(track_ids_raw, list):
-        has_track_context = any(str(t).strip().upper() not in {"", "__NONE__", "NONE"} for t in track_ids_raw)
-    if not has_track_context:
-        has_track_context = str(track_raw).strip().upper() not in {"", "__NONE__", "NONE"}
-    if declared_majors_raw is None and not has_track_context:
-        return jsonify({
-            "mode": "error",
-            "error": {
-                "error_code": "INVALID_INPUT",
-                "message": "Select at least one major or track before requesting recommendations.",
-            },
-        }), 400
 
-    selection, selection_error = _resolve_program_selection(body, _data)
-    if selection_error:
-        payload, status = selection_error
-        return jsonify(payload), status
+def _build_recommend_payload(
+    snapshot: _RuntimeSnapshot,
+    selection: dict,
+    plan: dict,
+    *,
+    include_current_state: bool,
+) -> tuple[dict, int]:
+    """
+    Run the recommendation pipeline for a canonical plan request.
 
+    Returns (payload, status). Inputs come only from the snapshot, the
+    resolved program selection, and `plan` (see _canonical_plan_request()),
+    so every request with the same cache key gets the same payload.
+    """
     effective_data = selection["effective_data"]
     effective_track_id = selection["effective_track_id"]
     track_warning = selection["track_warning"]
-
-    completed_raw = _coerce_course_list(body.get("completed_courses"))
-    in_progress_raw = _coerce_course_list(body.get("in_progress_courses"))
-    selected_courses_raw = _coerce_course_list(body.get("selected_courses"))
-    target_semester_primary = str(
-        body.get("target_semester_primary")
-        or body.get("target_semester")
-        or "Spring 2026"
-    )
-    target_semester_primary = normalize_semester_label(target_semester_primary)
-
-    def _parse_optional_semester(raw_value):
-        if raw_value is None:
-            return None
-        raw = str(raw_value).strip()
-        if raw == "__NONE__":
-            return "__NONE__"
-        return normalize_semester_label(raw) if raw else None
-
-    target_semester_secondary = _parse_optional_semester(body.get("target_semester_secondary"))
-    target_semester_tertiary = _parse_optional_semester(body.get("target_semester_tertiary"))
-    target_semester_quaternary = _parse_optional_semester(body.get("target_semester_quaternary"))
-
-    target_semester_count_raw = body.get("target_semester_count")
-    if target_semester_count_raw in (None, ""):
-        # Backward compatibility for legacy second/third-term controls.
-        if target_semester_secondary == "__NONE__":
-            target_semester_count = 1
-        elif target_semester_tertiary == "__NONE__":
-            target_semester_count = 2
-        elif target_semester_quaternary == "__NONE__":
-            target_semester_count = 3
-        else:
-            target_semester_count = 3
-    else:
-        target_semester_count = max(1, min(8, int(target_semester_count_raw)))
-
-    requested_course_raw = body.get("requested_course") or None
-    max_recs = max(1, min(15, int(body.get("max_recommendations", 3) or 3)))
-    include_summer = bool(body.get("include_summer", False))
-    is_honors_student = bool(body.get("is_honors_student", False))
-    debug_mode = bool(body.get("debug", False))
-    debug_limit = max(1, min(100, int(body.get("debug_limit", 30) or 30)))
-
     catalog_codes = effective_data["catalog_codes"]
-
-    comp_result = normalize_input(completed_raw, catalog_codes)
-    ip_result = normalize_input(in_progress_raw, catalog_codes)
-    selected_result = normalize_input(selected_courses_raw, catalog_codes)
-
-    if comp_result["invalid"] or ip_result["invalid"] or selected_result["invalid"]:
-        return jsonify({
-            "mode": "error",
-            "recommendations": None,
-            "error": {
-                "error_code": "INVALID_INPUT",
-                "message": "Some course codes could not be recognized.",
-                "invalid_courses": (
-                    comp_result["invalid"]
-                    + ip_result["invalid"]
-                    + selected_result["invalid"]
-                ),
-                "not_in_catalog": (
-                    comp_result["not_in_catalog"]
-                    + ip_result["not_in_catalog"]
-                    + selected_result["not_in_catalog"]
-                ),
-            },
-        }), 400
-
-    completed = comp_result["valid"]
-    in_progress = ip_result["valid"]
-    selected_courses = selected_result["valid"]
+    completed = list(plan["completed"])
+    in_progress = list(plan["in_progress"])
     completed_input = list(completed)
     in_progress_input = list(in_progress)
-    not_in_catalog_warn = (
-        comp_result["not_in_catalog"]
-        + ip_result["not_in_catalog"]
-        + selected_result["not_in_catalog"]
-    )
-    student_stage = normalize_student_stage(body.get("student_stage")) or infer_student_stage_from_courses(
-        completed_input + in_progress_input,
-        effective_data.get("courses_df"),
-    )
-    scheduling_style = body.get("scheduling_style") or None
-    if scheduling_style and scheduling_style not in VALID_SCHEDULING_STYLES:
-        scheduling_style = None
+    selected_courses = plan["selected"]
+    not_in_catalog_warn = plan["not_in_catalog"]
+    requested_course_raw = plan["requested_course"]
+    (
+        target_semester_primary,
+        target_semester_secondary,
+        target_semester_tertiary,
+        target_semester_quaternary,
+    ) = plan["target_semesters"]
+    target_semester_count = plan["target_semester_count"]
+    max_recs = plan["max_recommendations"]
+    include_summer = plan["include_summer"]
+    is_honors_student = plan["is_honors_student"]
+    debug_mode = plan["debug"]
+    debug_limit = plan["debug_limit"]
+    student_stage = plan["student_stage"]
+    scheduling_style = plan["scheduling_style"]
 
     # Build a course→credits lookup for standing projection.
     _credits_lookup = _course_credit_lookup(effective_data)
@@ -2761,11 +3380,15 @@ def _recommend_endpoint(*, include_current_state: bool, cache_scope: str):
     # finishing by the time semester 1 recommendations apply).
     running_credits: int = sum(_credits_lookup.get(c, 3) for c in completed_input) + sum(_credits_lookup.get(c, 3) for c in in_progress_input)
 
+    prereq_closure = get_runtime_required_prereq_closure(
+        effective_data.get("runtime_indexes"),
+        effective_data["prereq_map"],
+    )
     inconsistencies = find_inconsistent_completed_courses(
-        completed, in_progress, effective_data["prereq_map"]
+        completed, in_progress, effective_data["prereq_map"], prereq_closure
     )
     if inconsistencies:
-        return jsonify({
+        return {
             "mode": "error",
             "error": {
                 "error_code": "INCONSISTENT_INPUT",
@@ -2775,16 +3398,18 @@ def _recommend_endpoint(*, include_current_state: bool, cache_scope: str):
                 ),
                 "inconsistent_courses": inconsistencies,
             },
-        }), 400
+        }, 400
 
     completed, completed_assumption_rows = expand_completed_with_prereqs_with_provenance(
         completed,
         effective_data["prereq_map"],
+        prereq_closure,
     )
     in_progress, assumption_rows = expand_in_progress_with_prereqs(
         in_progress,
         completed,
         effective_data["prereq_map"],
+        prereq_closure,
     )
     completed, in_progress = _promote_inferred_in_progress_prereqs_to_completed(
         completed,
@@ -2808,7 +3433,7 @@ def _recommend_endpoint(*, include_current_state: bool, cache_scope: str):
     if requested_course_raw:
         requested_course = normalize_code(str(requested_course_raw).strip())
         if not requested_course:
-            return jsonify({
+            return {
                 "mode": "error",
                 "error": {
                     "error_code": "INVALID_INPUT",
@@ -2816,9 +3441,9 @@ def _recommend_endpoint(*, include_current_state: bool, cache_scope: str):
                     "invalid_courses": [str(requested_course_raw).strip()],
                     "not_in_catalog": [],
                 },
-            }), 400
+            }, 400
         if requested_course not in catalog_codes:
-            return jsonify({
+            return {
                 "mode": "error",
                 "error": {
                     "error_code": "INVALID_INPUT",
@@ -2826,7 +3451,7 @@ def _recommend_endpoint(*, include_current_state: bool, cache_scope: str):
                     "invalid_courses": [],
                     "not_in_catalog": [requested_course],
                 },
-            }), 400
+            }, 400
 
     explicit_labels = [
         target_semester_secondary,
@@ -2858,6 +3483,18 @@ def _recommend_endpoint(*, include_current_state: bool, cache_scope: str):
     semesters_payload = []
     completed_for_sem1 = list(dict.fromkeys(completed + in_progress))
     completed_cursor = list(completed_for_sem1)
+    # One allocation state follows the cursor across semesters; each semester
+    # only places the courses recommended by the one before it.
+    allocation_state = start_allocation(
+        completed_for_sem1,
+        effective_data["buckets_df"],
+        effective_data["course_bucket_map_df"],
+        effective_data["courses_df"],
+        effective_data["equivalencies_df"],
+        track_id=effective_track_id,
+        double_count_policy_df=effective_data.get("v2_double_count_policy_df"),
+        runtime_indexes=effective_data.get("runtime_indexes"),
+    )
     for idx, semester_label in enumerate(semester_labels):
         current_standing = _credits_to_standing(running_credits)
         if idx == 0:
@@ -2870,19 +3507,21 @@ def _recommend_endpoint(*, include_current_state: bool, cache_scope: str):
                 semester_label,
                 effective_data,
                 max_recs,
-                _reverse_map,
+                snapshot.reverse_map,
                 track_id=effective_track_id,
                 debug=debug_mode,
                 debug_limit=debug_limit,
                 current_standing=current_standing,
                 completed_only_standing=completed_only_standing,
                 assumes_in_progress_completion=bool(in_progress_input),
-                chain_depths=_chain_depths,
+                chain_depths=snapshot.chain_depths,
                 is_honors_student=is_honors_student,
                 selected_program_ids=selection.get("restriction_program_ids"),
                 student_stage=student_stage,
                 scheduling_style=scheduling_style,
                 manual_selected_codes=selected_courses if selected_courses else None,
+                allocation_state=allocation_state,
+                unlock_index=snapshot.unlock_index,
             )
         else:
             completed_only_standing = _credits_to_standing(
@@ -2894,17 +3533,19 @@ def _recommend_endpoint(*, include_current_state: bool, cache_scope: str):
                 semester_label,
                 effective_data,
                 max_recs,
-                _reverse_map,
+                snapshot.reverse_map,
                 track_id=effective_track_id,
                 debug=debug_mode,
                 debug_limit=debug_limit,
                 current_standing=current_standing,
                 completed_only_standing=completed_only_standing,
-                chain_depths=_chain_depths,
+                chain_depths=snapshot.chain_depths,
                 is_honors_student=is_honors_student,
                 selected_program_ids=selection.get("restriction_program_ids"),
                 student_stage=student_stage,
                 scheduling_style=scheduling_style,
+                allocation_state=allocation_state,
+                unlock_index=snapshot.unlock_index,
             )
         semesters_payload.append(semester_payload)
         # Accumulate recommended course credits for the next semester's standing projection.
@@ -2917,6 +3558,7 @@ def _recommend_endpoint(*, include_current_state: bool, cache_scope: str):
                 if r.get("course_code")
             ]
         ))
+        allocation_state = allocation_state.extended_to(completed_cursor)
 
     sem1 = semesters_payload[0]
 
@@ -2949,9 +3591,215 @@ def _recommend_endpoint(*, include_current_state: bool, cache_scope: str):
             response["program_warnings"] = selection["program_warnings"]
     if track_warning:
         response["track_warning"] = track_warning
+    return response, 200
+
+
+def _recommend_endpoint(*, include_current_state: bool, cache_scope: str):
+    client_ip = _client_ip()
+    if not app.config.get("TESTING") and not _check_rate_limit(client_ip):
+        return jsonify({
+            "mode": "error",
+            "error": {"error_code": "RATE_LIMITED", "message": "Too many requests. Please wait before submitting again."},
+        }), 429
+    snapshot = _request_snapshot()
+    data = snapshot.data
+    if not data:
+        return jsonify({"mode": "error", "error": {"error_code": "SERVER_ERROR", "message": "Data not loaded."}}), 500
+
+    body = request.get_json(force=True, silent=True)
+    err_code, err_msg = _validate_recommend_body(body)
+    if err_code:
+        return jsonify({
+            "mode": "error",
+            "error": {"error_code": err_code, "message": err_msg},
+        }), 400
+
+    # Exact repeats of a body resolve to their canonical key without
+    # re-running program resolution and normalization.
+    raw_cache_key = _request_cache_key(cache_scope, body, snapshot)
+    checked_cache_key = None
     if _cache_enabled():
-        _recommend_response_cache.set(cache_key, response)
-    return jsonify(response)
+        checked_cache_key = snapshot.recommend_key_index.get(raw_cache_key)
+        if checked_cache_key is not None:
+            cached = snapshot.recommend_cache.get(checked_cache_key)
+            if cached is not None:
+                return _send_encoded_response(cached)
+
+    # Recommendations require at least one declared program from the UI.
+    declared_majors_raw = body.get("declared_majors", None)
+    track_ids_raw = body.get("track_ids", None)
+    track_raw = body.get("track_id", None)
+    has_track_context = False
+    if isinstance(track_ids_raw, list):
+        has_track_context = any(str(t).strip().upper() not in {"", "__NONE__", "NONE"} for t in track_ids_raw)
+    if not has_track_context:
+        has_track_context = str(track_raw).strip().upper() not in {"", "__NONE__", "NONE"}
+    if declared_majors_raw is None and not has_track_context:
+        return jsonify({
+            "mode": "error",
+            "error": {
+                "error_code": "INVALID_INPUT",
+                "message": "Select at least one major or track before requesting recommendations.",
+            },
+        }), 400
+
+    selection, selection_error = _resolve_program_selection(body, data)
+    if selection_error:
+        payload, status = selection_error
+        return jsonify(payload), status
+
+    effective_data = selection["effective_data"]
+
+    completed_raw = _coerce_course_list(body.get("completed_courses"))
+    in_progress_raw = _coerce_course_list(body.get("in_progress_courses"))
+    selected_courses_raw = _coerce_course_list(body.get("selected_courses"))
+    target_semester_primary = str(
+        body.get("target_semester_primary")
+        or body.get("target_semester")
+        or "Spring 2026"
+    )
+    target_semester_primary = normalize_semester_label(target_semester_primary)
+
+    def _parse_optional_semester(raw_value):
+        if raw_value is None:
+            return None
+        raw = str(raw_value).strip()
+        if raw == "__NONE__":
+            return "__NONE__"
+        return normalize_semester_label(raw) if raw else None
+
+    target_semester_secondary = _parse_optional_semester(body.get("target_semester_secondary"))
+    target_semester_tertiary = _parse_optional_semester(body.get("target_semester_tertiary"))
+    target_semester_quaternary = _parse_optional_semester(body.get("target_semester_quaternary"))
+
+    target_semester_count_raw = body.get("target_semester_count")
+    if target_semester_count_raw in (None, ""):
+        # Backward compatibility for legacy second/third-term controls.
+        if target_semester_secondary == "__NONE__":
+            target_semester_count = 1
+        elif target_semester_tertiary == "__NONE__":
+            target_semester_count = 2
+        elif target_semester_quaternary == "__NONE__":
+            target_semester_count = 3
+        else:
+            target_semester_count = 3
+    else:
+        target_semester_count = max(1, min(8, int(target_semester_count_raw)))
+
+    requested_course_raw = body.get("requested_course") or None
+    max_recs = max(1, min(15, int(body.get("max_recommendations", 3) or 3)))
+    include_summer = bool(body.get("include_summer", False))
+    is_honors_student = bool(body.get("is_honors_student", False))
+    debug_mode = bool(body.get("debug", False))
+    debug_limit = max(1, min(100, int(body.get("debug_limit", 30) or 30)))
+
+    catalog_codes = effective_data["catalog_codes"]
+
+    comp_result = normalize_input(completed_raw, catalog_codes)
+    ip_result = normalize_input(in_progress_raw, catalog_codes)
+    selected_result = normalize_input(selected_courses_raw, catalog_codes)
+
+    if comp_result["invalid"] or ip_result["invalid"] or selected_result["invalid"]:
+        return jsonify({
+            "mode": "error",
+            "recommendations": None,
+            "error": {
+                "error_code": "INVALID_INPUT",
+                "message": "Some course codes could not be recognized.",
+                "invalid_courses": (
+                    comp_result["invalid"]
+                    + ip_result["invalid"]
+                    + selected_result["invalid"]
+                ),
+                "not_in_catalog": (
+                    comp_result["not_in_catalog"]
+                    + ip_result["not_in_catalog"]
+                    + selected_result["not_in_catalog"]
+                ),
+            },
+        }), 400
+
+    # Completed, in-progress, and unknown codes are sets: sorting them here
+    # makes the whole response a function of the canonical request below, so
+    # every list derived from them (input echoes, current_* state, assumption
+    # notes, in_progress_applied) follows sorted order rather than input
+    # order. Selected courses keep their order (it decides conflict
+    # resolution).
+    completed = sorted(comp_result["valid"])
+    in_progress = sorted(ip_result["valid"])
+    selected_courses = selected_result["valid"]
+    not_in_catalog_warn = sorted(set(
+        comp_result["not_in_catalog"]
+        + ip_result["not_in_catalog"]
+        + selected_result["not_in_catalog"]
+    ))
+    student_stage = normalize_student_stage(body.get("student_stage")) or infer_student_stage_from_courses(
+        completed + in_progress,
+        effective_data.get("courses_df"),
+    )
+    scheduling_style = body.get("scheduling_style") or None
+    if scheduling_style and scheduling_style not in VALID_SCHEDULING_STYLES:
+        scheduling_style = None
+
+    plan = _canonical_plan_request(
+        selection,
+        completed=completed,
+        in_progress=in_progress,
+        selected_courses=selected_courses,
+        not_in_catalog=not_in_catalog_warn,
+        target_semesters=[
+            target_semester_primary,
+            target_semester_secondary,
+            target_semester_tertiary,
+            target_semester_quaternary,
+        ],
+        target_semester_count=target_semester_count,
+        requested_course_raw=requested_course_raw,
+        max_recs=max_recs,
+        include_summer=include_summer,
+        is_honors_student=is_honors_student,
+        debug_mode=debug_mode,
+        debug_limit=debug_limit,
+        student_stage=student_stage,
+        scheduling_style=scheduling_style,
+    )
+    cache_key = _request_cache_key(cache_scope, plan, snapshot)
+    if _cache_enabled():
+        snapshot.recommend_key_index.record(raw_cache_key, cache_key)
+        if cache_key != checked_cache_key:
+            cached = snapshot.recommend_cache.get(cache_key)
+            if cached is not None:
+                return _send_encoded_response(cached)
+
+    def _compute():
+        payload, status = _build_recommend_payload(
+            snapshot,
+            selection,
+            plan,
+            include_current_state=include_current_state,
+        )
+        if status != 200 or not _cache_enabled():
+            return payload, status
+        entry = _encode_json_response(payload)
+        snapshot.recommend_cache.set(cache_key, entry)
+        return entry, status
+
+    # Identical requests already running in this worker wait for that run
+    # instead of starting their own.
+    try:
+        result, status = _recommend_single_flight.do(cache_key, _compute)
+    except _SingleFlightTimeout:
+        return jsonify({
+            "mode": "error",
+            "recommendations": None,
+            "error": {
+                "error_code": "PLAN_BUSY",
+                "message": "An identical plan is still being computed. Please try again shortly.",
+            },
+        }), 503
+    if isinstance(result, _EncodedResponse):
+        return _send_encoded_response(result)
+    return jsonify(result), status
 
 
 @app.route("/recommend", methods=["POST"])
@@ -2966,19 +3814,20 @@ def replan():
 @app.route("/can-take", methods=["POST"])
 def can_take_endpoint():
     """Standalone eligibility check for a single course. Does not run recommendations."""
-    _refresh_data_if_needed()
-    if not _data:
+    snapshot = _request_snapshot()
+    data = snapshot.data
+    if not data:
         return jsonify({"mode": "can_take", "error": "Data not loaded."}), 500
 
     body = request.get_json(force=True, silent=True)
     if not body:
         return jsonify({"mode": "can_take", "error": "Invalid JSON body."}), 400
 
-    cache_key = _request_cache_key("can_take", body)
+    cache_key = _request_cache_key("can_take", body, snapshot)
     if _cache_enabled():
-        cached = _can_take_response_cache.get(cache_key)
+        cached = snapshot.can_take_cache.get(cache_key)
         if cached is not None:
-            return jsonify(cached)
+            return _send_encoded_response(cached)
 
     requested_course_raw = str(body.get("requested_course") or "").strip()
     if not requested_course_raw:
@@ -2994,7 +3843,7 @@ def can_take_endpoint():
         }), 400
 
     requested_course = normalize_code(requested_course_raw)
-    if not requested_course or requested_course not in _data["catalog_codes"]:
+    if not requested_course or requested_course not in data["catalog_codes"]:
         response_payload = {
             "mode": "can_take",
             "requested_course": requested_course or requested_course_raw,
@@ -3005,12 +3854,10 @@ def can_take_endpoint():
             "unsupported_prereq_format": False,
             "next_best_alternatives": [],
         }
-        if _cache_enabled():
-            _can_take_response_cache.set(cache_key, response_payload)
-        return jsonify(response_payload)
+        return _cached_json_response(snapshot.can_take_cache, cache_key, response_payload)
 
     # Normalize completed / in-progress course lists (same logic as /recommend)
-    catalog_codes = _data["catalog_codes"]
+    catalog_codes = data["catalog_codes"]
     comp_result = normalize_input(_coerce_course_list(body.get("completed_courses")), catalog_codes)
     ip_result = normalize_input(_coerce_course_list(body.get("in_progress_courses")), catalog_codes)
     completed = comp_result["valid"]
@@ -3025,19 +3872,23 @@ def can_take_endpoint():
         target_term = "Fall"
 
     # Optional program context (ignored if malformed)
-    selection, selection_error = _resolve_program_selection(body, _data)
-    effective_data = _data if selection_error else selection["effective_data"]
+    selection, selection_error = _resolve_program_selection(body, data)
+    effective_data = data if selection_error else selection["effective_data"]
     student_stage = normalized_student_stage or infer_student_stage_from_courses(
         completed + in_progress,
         effective_data.get("courses_df"),
     )
 
     # Expand prereq chains (mirrors /recommend pipeline)
+    prereq_closure = get_runtime_required_prereq_closure(
+        effective_data.get("runtime_indexes"),
+        effective_data["prereq_map"],
+    )
     completed, _ = expand_completed_with_prereqs_with_provenance(
-        completed, effective_data["prereq_map"]
+        completed, effective_data["prereq_map"], prereq_closure
     )
     in_progress, assumption_rows = expand_in_progress_with_prereqs(
-        in_progress, completed, effective_data["prereq_map"]
+        in_progress, completed, effective_data["prereq_map"], prereq_closure
     )
     completed, in_progress = _promote_inferred_in_progress_prereqs_to_completed(
         completed,
@@ -3074,9 +3925,7 @@ def can_take_endpoint():
                 "unsupported_prereq_format": False,
                 "next_best_alternatives": [],
             }
-            if _cache_enabled():
-                _can_take_response_cache.set(cache_key, _standing_resp)
-            return jsonify(_standing_resp)
+            return _cached_json_response(snapshot.can_take_cache, cache_key, _standing_resp)
 
     result = check_can_take(
         requested_course,
@@ -3101,26 +3950,28 @@ def can_take_endpoint():
         "unsupported_prereq_format": result["unsupported_prereq_format"],
         "next_best_alternatives": [],
     }
-    if _cache_enabled():
-        _can_take_response_cache.set(cache_key, response_payload)
-    return jsonify(response_payload)
+    return _cached_json_response(snapshot.can_take_cache, cache_key, response_payload)
 
 @app.route("/validate-prereqs", methods=["POST"])
 def validate_prereqs_endpoint():
     """Lightweight prereq inconsistency check used by the onboarding CoursesStep."""
-    _refresh_data_if_needed()
-    if not _data:
+    snapshot = _request_snapshot()
+    data = snapshot.data
+    if not data:
         return jsonify({"inconsistencies": []}), 200
 
     body = request.get_json(force=True, silent=True) or {}
-    catalog_codes = _data["catalog_codes"]
+    catalog_codes = data["catalog_codes"]
     comp_result = normalize_input(_coerce_course_list(body.get("completed_courses")), catalog_codes)
     ip_result = normalize_input(_coerce_course_list(body.get("in_progress_courses")), catalog_codes)
     completed = comp_result["valid"]
     in_progress = ip_result["valid"]
 
     inconsistencies = find_inconsistent_completed_courses(
-        completed, in_progress, _data["prereq_map"]
+        completed,
+        in_progress,
+        data["prereq_map"],
+        get_runtime_required_prereq_closure(data.get("runtime_indexes"), data["prereq_map"]),
     )
     return jsonify({"inconsistencies": inconsistencies})
 
@@ -3186,6 +4037,8 @@ def frontend_files(filename):
 if _frontend_ready():
     app.wsgi_app = WhiteNoise(app.wsgi_app, root=FRONTEND_DIR, autorefresh=False)
 
+_warm_runtime_snapshot(_snapshot)
+
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5000))
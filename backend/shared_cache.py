@@ -0,0 +1,379 @@
+"""
+Second-tier response cache shared by every worker process.
+
+Each Gunicorn worker keeps its own `_LruResponseCache`, so on a 4-worker host
+an identical `/recommend` body misses in three workers out of four. A shared
+backend sits behind the per-process LRU: a local miss checks the shared tier
+before recomputing, and every fresh response is written to both.
+
+Backends store opaque bytes under the keys the local caches use
+(`_request_cache_key`, which embeds the content-addressed data version),
+prefixed by the caller with a build id of the backend code. Workers running
+the same build and data share entries; a deploy that changes code or data
+starts on fresh keys, and the old ones age out by TTL or eviction. Expiry
+uses wall clock time because entries outlive the process that wrote them.
+
+  sqlite:///abs/path.db      one file per host, shared by every worker
+  redis://[:pw@]host:port/db any Redis-protocol server (RESP2 GET/SET PX)
+
+Backends never raise to the caller: an I/O failure is counted, logged once,
+and reported as a miss, so a broken shared tier degrades to the local LRU.
+"""
+
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+from urllib.parse import unquote, urlparse
+
+
+class SharedCacheBackend:
+    """Base class: byte-valued get/set with per-entry TTL and counters."""
+
+    kind = "none"
+
+    def __init__(self):
+        self._stats_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._sets = 0
+        self._errors = 0
+        self._warned = False
+
+    def get(self, key: str) -> bytes | None:
+        try:
+            value = self._get(key)
+        except Exception as exc:
+            self._record_error("get", exc)
+            return None
+        with self._stats_lock:
+            if value is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return value
+
+    def set(self, key: str, value: bytes, ttl_seconds: float = 0.0) -> None:
+        try:
+            self._set(key, value, max(0.0, float(ttl_seconds)))
+        except Exception as exc:
+            self._record_error("set", exc)
+            return
+        with self._stats_lock:
+            self._sets += 1
+
+    def _record_error(self, op: str, exc: Exception) -> None:
+        with self._stats_lock:
+            self._errors += 1
+            first = not self._warned
+            self._warned = True
+        if first:
+            print(f"[WARN] Shared {self.kind} cache {op} failed; serving from local cache only: {exc}", file=sys.stderr)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            lookups = self._hits + self._misses
+            return {
+                "backend": self.kind,
+                "hits": self._hits,
+                "misses": self._misses,
+                "sets": self._sets,
+                "errors": self._errors,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def _get(self, key: str) -> bytes | None:
+        raise NotImplementedError
+
+    def _set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class SqliteSharedCache(SharedCacheBackend):
+    """
+    Host-local shared tier in one SQLite file (WAL mode).
+
+    Connections are opened per thread and per process, so a cache created
+    in a preloading Gunicorn master is safe to use after fork. Reads never
+    write, and a set is a single-row upsert. Every `maintenance_interval`
+    sets, this instance deletes expired rows and, when the file holds more
+    than `max_bytes` of values, drops the oldest inserts first (the
+    per-process LRU in front keeps hot keys). Between sweeps the file can
+    overshoot the budget by up to that many entries per worker.
+    """
+
+    kind = "sqlite"
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        max_bytes: int = 0,
+        timeout_seconds: float = 0.25,
+        maintenance_interval: int = 64,
+    ):
+        super().__init__()
+        self.path = path
+        self.max_bytes = max(0, int(max_bytes))
+        self.timeout_seconds = max(0.0, float(timeout_seconds))
+        self.maintenance_interval = max(1, int(maintenance_interval))
+        self._local = threading.local()
+        self._sets_since_maintenance = 0
+
+    def _get_connection(self) -> sqlite3.Connection:
+        local = self._local
+        if getattr(local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout_seconds, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY,"
+                " stored_at REAL NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " value BLOB NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_stored_at ON entries (stored_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_expires_at ON entries (expires_at)")
+            local.conn = conn
+            local.pid = os.getpid()
+        return local.conn
+
+    def _get(self, key: str) -> bytes | None:
+        row = self._get_connection().execute(
+            "SELECT value, expires_at FROM entries WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at and expires_at <= time.time():
+            return None
+        return bytes(value)
+
+    def _set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        now = time.time()
+        expires_at = now + ttl_seconds if ttl_seconds > 0 else 0.0
+        conn = self._get_connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO entries (key, stored_at, expires_at, size, value) VALUES (?, ?, ?, ?, ?)",
+            (key, now, expires_at, len(value), sqlite3.Binary(value)),
+        )
+        with self._stats_lock:
+            self._sets_since_maintenance += 1
+            due = self._sets_since_maintenance >= self.maintenance_interval
+            if due:
+                self._sets_since_maintenance = 0
+        if due:
+            # The write above already succeeded; a failed sweep (e.g. another
+            # worker holding the lock) is counted and retried next interval.
+            try:
+                self._maintain(conn, now)
+            except Exception as exc:
+                self._record_error("maintenance", exc)
+
+    def _maintain(self, conn: sqlite3.Connection, now: float) -> None:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM entries WHERE expires_at > 0 AND expires_at <= ?", (now,))
+            if self.max_bytes > 0:
+                total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+                if total > self.max_bytes:
+                    self._trim_oldest(conn, total)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _trim_oldest(self, conn: sqlite3.Connection, total: int) -> None:
+        doomed: list[str] = []
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY stored_at"):
+            if total <= self.max_bytes:
+                break
+            doomed.append(key)
+            total -= size
+        conn.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key in doomed])
+
+    def clear(self) -> None:
+        self._get_connection().execute("DELETE FROM entries")
+
+    def stats(self) -> dict:
+        out = super().stats()
+        try:
+            entries, total = self._get_connection().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        except Exception:
+            entries, total = None, None
+        out.update({"entries": entries, "bytes": total, "max_bytes": self.max_bytes})
+        return out
+
+
+class RespProtocolError(Exception):
+    pass
+
+
+class RespSharedCache(SharedCacheBackend):
+    """
+    Shared tier on a Redis-protocol server, speaking RESP2 over a plain socket.
+
+    Only AUTH, SELECT, GET, SET ... PX, SCAN and DEL are used, so any
+    compatible server (or a test stand-in) works. clear() deletes only keys
+    under `key_prefix`, never the rest of a shared database. Eviction is the server's
+    job (e.g. `maxmemory-policy allkeys-lru`); entries carry their TTL via
+    PX. One connection per thread and process; a failed call drops the
+    connection so the next call reconnects.
+    """
+
+    kind = "resp"
+
+    def __init__(
+        self,
+        host: str,
+        port: int = 6379,
+        *,
+        db: int = 0,
+        password: str | None = None,
+        key_prefix: str = "marqbot:",
+        timeout_seconds: float = 0.25,
+    ):
+        super().__init__()
+        self.host = host
+        self.port = int(port)
+        self.db = int(db)
+        self.password = password
+        self.key_prefix = key_prefix
+        self.timeout_seconds = max(0.01, float(timeout_seconds))
+        self._local = threading.local()
+
+    def _connection(self):
+        local = self._local
+        if getattr(local, "pid", None) != os.getpid() or local.sock is None:
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout_seconds)
+            local.sock = sock
+            local.reader = sock.makefile("rb")
+            local.pid = os.getpid()
+            if self.password:
+                self._roundtrip_on(local, "AUTH", self.password)
+            if self.db:
+                self._roundtrip_on(local, "SELECT", str(self.db))
+        return local
+
+    def _drop_connection(self) -> None:
+        local = self._local
+        sock = getattr(local, "sock", None)
+        local.sock = None
+        if sock is not None and getattr(local, "pid", None) == os.getpid():
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    @staticmethod
+    def _encode(*parts) -> bytes:
+        chunks = [b"*%d\r\n" % len(parts)]
+        for part in parts:
+            raw = part if isinstance(part, bytes) else str(part).encode("utf-8")
+            chunks.append(b"$%d\r\n%s\r\n" % (len(raw), raw))
+        return b"".join(chunks)
+
+    @staticmethod
+    def _read_reply(reader):
+        line = reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise RespProtocolError("connection closed")
+        prefix, body = line[:1], line[1:-2]
+        if prefix == b"+":
+            return body.decode("utf-8")
+        if prefix == b"-":
+            raise RespProtocolError(body.decode("utf-8", "replace"))
+        if prefix == b":":
+            return int(body)
+        if prefix == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            data = reader.read(length + 2)
+            if len(data) != length + 2:
+                raise RespProtocolError("short bulk reply")
+            return data[:-2]
+        if prefix == b"*":
+            length = int(body)
+            if length < 0:
+                return None
+            return [RespSharedCache._read_reply(reader) for _ in range(length)]
+        raise RespProtocolError(f"unexpected reply type {prefix!r}")
+
+    def _roundtrip_on(self, local, *parts):
+        local.sock.sendall(self._encode(*parts))
+        return self._read_reply(local.reader)
+
+    def _command(self, *parts):
+        try:
+            return self._roundtrip_on(self._connection(), *parts)
+        except (OSError, RespProtocolError):
+            self._drop_connection()
+            raise
+
+    def _get(self, key: str) -> bytes | None:
+        return self._command("GET", self.key_prefix + key)
+
+    def _set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        if ttl_seconds > 0:
+            self._command("SET", self.key_prefix + key, value, "PX", max(1, int(ttl_seconds * 1000)))
+        else:
+            self._command("SET", self.key_prefix + key, value)
+
+    def clear(self) -> None:
+        # SCAN + DEL rather than FLUSHDB: the database may hold other apps' keys.
+        pattern = "".join("\\" + ch if ch in "*?[]\\" else ch for ch in self.key_prefix) + "*"
+        cursor = b"0"
+        while True:
+            cursor, keys = self._command("SCAN", cursor, "MATCH", pattern, "COUNT", 500)
+            if keys:
+                self._command("DEL", *keys)
+            if cursor == b"0":
+                return
+
+
+def build_shared_cache(url: str, *, max_bytes: int = 0, timeout_seconds: float = 0.25):
+    """
+    Backend for a SHARED_CACHE_URL, or None when the URL is empty.
+
+    Raises ValueError for an unknown scheme; connection problems surface
+    later as counted errors, never at startup.
+    """
+    url = str(url or "").strip()
+    if not url:
+        return None
+    parsed = urlparse(url)
+    if parsed.scheme == "sqlite":
+        path = unquote(parsed.path)
+        if parsed.netloc:
+            path = unquote(parsed.netloc) + path
+        if not path:
+            raise ValueError("sqlite shared cache URL needs a file path")
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        return SqliteSharedCache(
+            path,
+            max_bytes=max_bytes,
+            timeout_seconds=timeout_seconds,
+        )
+    if parsed.scheme == "redis":
+        db_path = (parsed.path or "/").lstrip("/")
+        return RespSharedCache(
+            parsed.hostname or "localhost",
+            parsed.port or 6379,
+            db=int(db_path) if db_path else 0,
+            password=unquote(parsed.password) if parsed.password else None,
+            timeout_seconds=timeout_seconds,
+        )
+    raise ValueError(f"unsupported shared cache URL scheme: {parsed.scheme!r}")
@@ -30,6 +30,53 @@ def build_reverse_prereq_map(
     return reverse
 
 
+def _postorder_depths(
+    reverse_map: dict[str, list[str]],
+) -> dict[str, int]:
+    """
+    Iterative DFS over reverse_map returning {course: depth} in postorder.
+
+    Mirrors the original recursive walk step for step: children are visited
+    in list order, and a child already on the DFS stack counts as depth 0
+    (cycle guard). An explicit frame stack keeps arbitrarily deep catalogs
+    clear of the interpreter recursion limit.
+    """
+    memo: dict[str, int] = {}
+    in_stack: set[str] = set()
+
+    for root in reverse_map:
+        if root in memo:
+            continue
+        in_stack.add(root)
+        # Frame: [course, children, next child position, best child depth]
+        frames = [[root, reverse_map.get(root, []), 0, -1]]
+        while frames:
+            frame = frames[-1]
+            course, children, pos = frame[0], frame[1], frame[2]
+            if pos < len(children):
+                frame[2] = pos + 1
+                child = children[pos]
+                if child in memo:
+                    child_depth = memo[child]
+                elif child in in_stack:
+                    child_depth = 0  # cycle guard
+                else:
+                    in_stack.add(child)
+                    frames.append([child, reverse_map.get(child, []), 0, -1])
+                    continue
+                if child_depth > frame[3]:
+                    frame[3] = child_depth
+                continue
+            frames.pop()
+            in_stack.discard(course)
+            depth = frame[3] + 1 if children else 0
+            memo[course] = depth
+            if frames and depth > frames[-1][3]:
+                frames[-1][3] = depth
+
+    return memo
+
+
 def compute_chain_depths(
     reverse_map: dict[str, list[str]],
 ) -> dict[str, int]:
@@ -40,27 +87,80 @@ def compute_chain_depths(
     FINA 3001 -> FINA 4075 -> AIM 4410 -> AIM 4420 -> AIM 4430
     gives FINA 3001 depth 4.
 
-    Computed once at data load. O(V+E) with memoization.
+    Computed once at data load. O(V+E), iterative (no recursion limit).
     """
-    memo: dict[str, int] = {}
-    in_stack: set[str] = set()
+    return _postorder_depths(reverse_map)
 
-    def _depth(course: str) -> int:
-        if course in memo:
-            return memo[course]
-        if course in in_stack:
-            return 0  # cycle guard
-        in_stack.add(course)
-        children = reverse_map.get(course, [])
-        result = (1 + max(_depth(c) for c in children)) if children else 0
-        in_stack.discard(course)
-        memo[course] = result
-        return result
-
-    for course in reverse_map:
-        _depth(course)
 
-    return memo
+class UnlockIndex:
+    """
+    Direct unlock sets for every course in a reverse_map, stored as int
+    bitsets over a dense numbering of the unlocked courses.
+
+    One index lives on each runtime snapshot; the bitsets are built on the
+    first query and shared from then on. get_blocking_warnings() is the
+    consumer: `pool_mask()` memoizes the mask of an elective pool (the same
+    few pools recur across semesters and requests), so a call only masks
+    the student's taken courses and counts each core course with one AND
+    and a popcount. `reverse_map` is the mapping the index was built from;
+    callers holding a different mapping must not use it.
+    """
+
+    _MAX_POOL_MASKS = 256
+
+    def __init__(self, reverse_map: dict[str, list[str]]):
+        self.reverse_map = reverse_map
+        self._built: tuple[dict, dict] | None = None
+        self._pool_masks: dict[tuple, int] = {}
+
+    def _tables(self) -> tuple[dict, dict]:
+        built = self._built
+        if built is None:
+            built = self._build()
+            # Concurrent first queries build identical tables; last one wins.
+            self._built = built
+        return built
+
+    def _build(self) -> tuple[dict, dict]:
+        # Only unlocked courses can ever be counted, so only they get bits.
+        ids: dict[str, int] = {}
+        direct: dict[str, int] = {}
+        for code, children in self.reverse_map.items():
+            bits = 0
+            for child in children:
+                bits |= 1 << ids.setdefault(child, len(ids))
+            direct[code] = bits
+        return ids, direct
+
+    def mask(self, codes) -> int:
+        """Bitset of the given course codes (codes no course unlocks are skipped)."""
+        ids = self._tables()[0]
+        bits = 0
+        for code in codes:
+            idx = ids.get(code)
+            if idx is not None:
+                bits |= 1 << idx
+        return bits
+
+    def pool_mask(self, codes) -> int:
+        """mask(codes), memoized per distinct sequence of codes."""
+        key = tuple(codes)
+        bits = self._pool_masks.get(key)
+        if bits is None:
+            bits = self.mask(key)
+            if len(self._pool_masks) >= self._MAX_POOL_MASKS:
+                self._pool_masks.clear()
+            self._pool_masks[key] = bits
+        return bits
+
+    def unlock_count(self, course_code: str, mask: int) -> int:
+        """Number of courses in `mask` that `course_code` directly unlocks."""
+        return (self._tables()[1].get(course_code, 0) & mask).bit_count()
+
+
+def build_unlock_index(reverse_map: dict[str, list[str]]) -> UnlockIndex:
+    """Build the UnlockIndex for a reverse prereq map (see UnlockIndex)."""
+    return UnlockIndex(reverse_map)
 
 
 def get_direct_unlocks(
@@ -82,6 +182,7 @@ def get_blocking_warnings(
     completed: list[str],
     in_progress: list[str],
     threshold: int = 2,
+    unlock_index: UnlockIndex | None = None,
 ) -> list[str]:
     """
     For each incomplete CORE course, counts how many UNMET Finance elective courses
@@ -92,22 +193,36 @@ def get_blocking_warnings(
     Returns warning strings for CORE courses blocking >= threshold unmet electives.
 
     Example: "Completing FINA 3001 would unlock 5 Finance electives you can't yet take."
+
+    When `unlock_index` was built from this same reverse_map, counts come from
+    its direct bitsets and memoized pool mask instead of building the unmet
+    set and scanning each course's unlock list.
     """
-    completed_set = set(completed)
-    in_progress_set = set(in_progress)
-    unmet_electives = set(
-        c for c in finance_elective_courses
-        if c not in completed_set and c not in in_progress_set
-    )
+    if unlock_index is not None and unlock_index.reverse_map is not reverse_map:
+        unlock_index = None
+    if unlock_index is not None:
+        unmet_mask = unlock_index.pool_mask(finance_elective_courses) & ~unlock_index.mask(
+            list(completed) + list(in_progress)
+        )
+    else:
+        completed_set = set(completed)
+        in_progress_set = set(in_progress)
+        unmet_electives = set(
+            c for c in finance_elective_courses
+            if c not in completed_set and c not in in_progress_set
+        )
 
     warnings: list[str] = []
     for core_course in core_remaining:
-        directly_unlocked = reverse_map.get(core_course, [])
-        blocked_unmet = [c for c in directly_unlocked if c in unmet_electives]
-        if len(blocked_unmet) >= threshold:
+        if unlock_index is not None:
+            blocked_count = unlock_index.unlock_count(core_course, unmet_mask)
+        else:
+            directly_unlocked = reverse_map.get(core_course, [])
+            blocked_count = sum(1 for c in directly_unlocked if c in unmet_electives)
+        if blocked_count >= threshold:
             warnings.append(
                 f"Completing {core_course} would unlock "
-                f"{len(blocked_unmet)} Finance electives you can't yet take."
+                f"{blocked_count} Finance electives you can't yet take."
             )
 
     return warnings
@@ -3,7 +3,104 @@ Pure input-validation helpers for the /recommend endpoint.
 No Flask or data-loader imports.
 """
 
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+
+def _direct_required_prereqs(parsed: dict) -> List[str]:
+    """Required (single/and) prereq codes of one parsed prereq; [] otherwise."""
+    prereq_type = parsed.get("type", "none")
+    if prereq_type == "single":
+        course = parsed.get("course")
+        return [course] if isinstance(course, str) and course.strip() else []
+    if prereq_type == "and":
+        courses = parsed.get("courses", [])
+        return [c for c in courses if isinstance(c, str) and c.strip()]
+    return []
+
+
+class RequiredPrereqClosure:
+    """
+    _get_all_required_prereqs() for every course in a prereq_map, computed
+    once.
+
+    Closures are built over strongly connected components in one iterative
+    pass, so deep or cyclic catalogs cost O(courses + edges) and never hit
+    the recursion limit. As with the recursive walk, a course is in its own
+    closure only when it sits on a required-prereq cycle. `prereq_map` is
+    the mapping the closure was built from; callers holding a different
+    mapping must not use it.
+    """
+
+    _EMPTY: FrozenSet[str] = frozenset()
+
+    def __init__(self, prereq_map: Dict[str, dict]):
+        self.prereq_map = prereq_map
+        edges = {code: _direct_required_prereqs(parsed or {}) for code, parsed in prereq_map.items()}
+        self._closure: Dict[str, FrozenSet[str]] = {}
+
+        # Iterative Tarjan: components come off the stack in reverse
+        # topological order, so every prereq component is closed first.
+        index: Dict[str, int] = {}
+        lowlink: Dict[str, int] = {}
+        on_stack: Set[str] = set()
+        stack: List[str] = []
+        for root in edges:
+            if root in index:
+                continue
+            work = [(root, 0)]
+            while work:
+                node, child_pos = work[-1]
+                if child_pos == 0:
+                    index[node] = lowlink[node] = len(index)
+                    stack.append(node)
+                    on_stack.add(node)
+                children = edges.get(node, [])
+                if child_pos < len(children):
+                    work[-1] = (node, child_pos + 1)
+                    child = children[child_pos]
+                    if child not in index:
+                        work.append((child, 0))
+                    elif child in on_stack:
+                        lowlink[node] = min(lowlink[node], index[child])
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] != index[node]:
+                    continue
+                members: List[str] = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    members.append(member)
+                    if member == node:
+                        break
+                reach: Set[str] = set()
+                for member in members:
+                    for prereq in edges.get(member, []):
+                        reach.add(prereq)
+                        reach |= self._closure.get(prereq, self._EMPTY)
+                closed = frozenset(reach)
+                for member in members:
+                    self._closure[member] = closed
+
+    def required(self, course_code: str) -> FrozenSet[str]:
+        """All transitively required prereqs of course_code."""
+        return self._closure.get(course_code, self._EMPTY)
+
+    def __len__(self) -> int:
+        return len(self._closure)
+
+
+def _required_prereqs(
+    course_code: str,
+    prereq_map: Dict[str, dict],
+    closure: Optional[RequiredPrereqClosure],
+) -> Set[str]:
+    if closure is not None and closure.prereq_map is prereq_map:
+        return set(closure.required(course_code))
+    return _get_all_required_prereqs(course_code, prereq_map)
 
 
 def _get_all_required_prereqs(
@@ -53,6 +150,7 @@ def find_inconsistent_completed_courses(
     completed: List[str],
     in_progress: List[str],
     prereq_map: Dict[str, dict],
+    closure: Optional[RequiredPrereqClosure] = None,
 ) -> List[dict]:
     """
     Return detailed inconsistency objects for completed courses that still have
@@ -65,7 +163,7 @@ def find_inconsistent_completed_courses(
     issues: List[dict] = []
 
     for course_code in completed:
-        required = _get_all_required_prereqs(course_code, prereq_map)
+        required = _required_prereqs(course_code, prereq_map, closure)
         in_prog = sorted(p for p in required if p in in_progress_set)
         if in_prog:
             issues.append(
@@ -80,18 +178,20 @@ def find_inconsistent_completed_courses(
 def expand_completed_with_prereqs(
     completed: List[str],
     prereq_map: Dict[str, dict],
+    closure: Optional[RequiredPrereqClosure] = None,
 ) -> List[str]:
     """
     Expand completed with transitively required prereqs and return a
     deterministic deduplicated list.
     """
-    expanded_completed, _ = expand_completed_with_prereqs_with_provenance(completed, prereq_map)
+    expanded_completed, _ = expand_completed_with_prereqs_with_provenance(completed, prereq_map, closure)
     return expanded_completed
 
 
 def expand_completed_with_prereqs_with_provenance(
     completed: List[str],
     prereq_map: Dict[str, dict],
+    closure: Optional[RequiredPrereqClosure] = None,
 ) -> Tuple[List[str], List[dict]]:
     """
     Expand completed with transitively required prereqs and return deterministic
@@ -113,7 +213,7 @@ def expand_completed_with_prereqs_with_provenance(
     assumption_rows: List[dict] = []
 
     for source_course in ordered_completed:
-        required = _get_all_required_prereqs(source_course, prereq_map)
+        required = _required_prereqs(source_course, prereq_map, closure)
         already_completed = sorted([c for c in required if c in completed_set])
         assumed = sorted([c for c in required if c not in completed_set])
 
@@ -133,6 +233,7 @@ def expand_in_progress_with_prereqs(
     in_progress: List[str],
     completed: List[str],
     prereq_map: Dict[str, dict],
+    closure: Optional[RequiredPrereqClosure] = None,
 ) -> Tuple[List[str], List[dict]]:
     """
     Expand in-progress with transitively required prereqs while preserving
@@ -155,7 +256,7 @@ def expand_in_progress_with_prereqs(
     assumption_rows: List[dict] = []
 
     for source_course in ordered_in_progress:
-        required = _get_all_required_prereqs(source_course, prereq_map)
+        required = _required_prereqs(source_course, prereq_map, closure)
         already_completed = sorted([c for c in required if c in completed_set])
         assumed = sorted([
             c for c in required
@@ -0,0 +1,158 @@
+"""
+Benchmark get_eligible_courses() on deep same-semester prerequisite chains.
+
+Builds synthetic MATH/ECON-style sequences where every course may be taken
+concurrently with its predecessor (half via the may_be_concurrent soft tag,
+half via an explicit prereq_concurrent), lists them deepest-first, and times
+eligibility for a student who has completed none of them. All of a chain
+is admitted in one semester, so this stresses same-semester concurrency
+resolution; per-call time should grow roughly linearly with chain depth.
+
+Usage:
+    python scripts/benchmark_eligibility.py
+    python scripts/benchmark_eligibility.py --depths 50 100 200 400 --repeat 5
+    python scripts/benchmark_eligibility.py --catalog   # also time the real catalog
+"""
+
+import argparse
+import os
+import sys
+import time
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(_ROOT, "backend"))
+
+import pandas as pd  # noqa: E402
+
+from allocator import ensure_runtime_indexes  # noqa: E402
+from eligibility import get_eligible_courses  # noqa: E402
+from prereq_parser import parse_prereqs  # noqa: E402
+from unlocks import build_reverse_prereq_map  # noqa: E402
+
+_TRACK_ID = "BENCH_MAJOR"
+_SEQUENCES = ("MATH", "ECON")
+
+
+def _chain_data(depth: int) -> dict:
+    """Two concurrent chains of `depth` courses each, deepest course first."""
+    course_rows = []
+    for dept in _SEQUENCES:
+        for step in range(depth):
+            code = f"{dept} {1000 + step}"
+            previous = f"{dept} {1000 + step - 1}" if step else "none"
+            explicit = step % 2 == 0
+            course_rows.append({
+                "course_code": code,
+                "course_name": f"{dept} sequence {step}",
+                "credits": 3,
+                "level": 1000,
+                "offered_fall": True,
+                "offered_spring": True,
+                "offered_summer": False,
+                "prereq_hard": "none" if explicit else previous,
+                "prereq_concurrent": previous if explicit else "none",
+                "prereq_soft": "" if explicit else "may_be_concurrent",
+                "offering_confidence": "high",
+            })
+    courses_df = pd.DataFrame(list(reversed(course_rows)))
+    codes = courses_df["course_code"].tolist()
+    buckets_df = pd.DataFrame([{
+        "track_id": _TRACK_ID,
+        "bucket_id": "SEQUENCE",
+        "bucket_label": "Sequence",
+        "priority": 1,
+        "needed_count": len(codes),
+        "needed_credits": None,
+        "min_level": None,
+        "allow_double_count": False,
+    }])
+    course_bucket_map_df = pd.DataFrame([
+        {"track_id": _TRACK_ID, "bucket_id": "SEQUENCE", "course_code": code} for code in codes
+    ])
+    prereq_map = {code: parse_prereqs(raw) for code, raw in zip(codes, courses_df["prereq_hard"])}
+    data = ensure_runtime_indexes({
+        "courses_df": courses_df,
+        "buckets_df": buckets_df,
+        "course_bucket_map_df": course_bucket_map_df,
+        "prereq_map": prereq_map,
+    })
+    # Track indexes build lazily; build this one up front so it is not timed.
+    data["runtime_indexes"]["tracks"].warm()
+    data["reverse_map"] = build_reverse_prereq_map(courses_df, prereq_map)
+    data["remaining"] = {"SEQUENCE": {"slots_remaining": len(codes), "remaining_courses": codes}}
+    return data
+
+
+def _time_call(data: dict, repeat: int, **kwargs) -> tuple[float, list[dict]]:
+    result: list[dict] = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = get_eligible_courses(
+            data["courses_df"],
+            kwargs.get("completed", []),
+            kwargs.get("in_progress", []),
+            "Fall",
+            data["prereq_map"],
+            data["remaining"],
+            data["course_bucket_map_df"],
+            data["buckets_df"],
+            data.get("equivalencies_df"),
+            track_id=kwargs.get("track_id", _TRACK_ID),
+            reverse_map=data["reverse_map"],
+            runtime_indexes=data.get("runtime_indexes"),
+            equiv_map=data.get("equiv_prereq_map"),
+            cross_listed_map=data.get("cross_listed_map"),
+        )
+    return (time.perf_counter() - start) * 1000 / repeat, result
+
+
+def _bench_chains(depths: list[int], repeat: int) -> None:
+    print(f"{'chain depth':>11}  {'courses':>7}  {'admitted':>8}  {'ms/call':>9}")
+    for depth in depths:
+        data = _chain_data(depth)
+        elapsed_ms, result = _time_call(data, repeat)
+        print(f"{depth:>11}  {len(data['courses_df']):>7}  {len(result):>8}  {elapsed_ms:>9.1f}")
+
+
+def _bench_catalog(repeat: int) -> None:
+    from allocator import allocate_courses
+    from data_loader import load_data
+
+    data = load_data(os.path.join(_ROOT, "data"))
+    data["reverse_map"] = build_reverse_prereq_map(data["courses_df"], data["prereq_map"])
+    completed = ["ECON 1103", "ECON 1104", "MATH 1400", "ACCO 1030", "ACCO 1031", "BUAD 1560"]
+    in_progress = ["FINA 3001", "MATH 1450"]
+    alloc = allocate_courses(
+        completed,
+        in_progress,
+        data["buckets_df"],
+        data["course_bucket_map_df"],
+        data["courses_df"],
+        data["equivalencies_df"],
+        track_id="FIN_MAJOR",
+        double_count_policy_df=data.get("v2_double_count_policy_df"),
+        runtime_indexes=data.get("runtime_indexes"),
+    )
+    data["remaining"] = alloc["remaining"]
+    data["runtime_indexes"]["tracks"].warm(["FIN_MAJOR"])
+    elapsed_ms, result = _time_call(
+        data, repeat, completed=completed, in_progress=in_progress, track_id="FIN_MAJOR"
+    )
+    print(f"catalog FIN_MAJOR: {len(result)} eligible, {elapsed_ms:.1f} ms/call")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark same-semester eligibility resolution.")
+    parser.add_argument("--depths", type=int, nargs="+", default=[25, 50, 100, 200, 400])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--catalog", action="store_true", help="Also time the real catalog from data/.")
+    args = parser.parse_args(argv)
+
+    _bench_chains(args.depths, args.repeat)
+    if args.catalog:
+        _bench_catalog(args.repeat)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,6 +1,6 @@
 import pytest
 import pandas as pd
-from allocator import allocate_courses, ensure_runtime_indexes
+from allocator import AllocationMemo, allocate_courses, ensure_runtime_indexes, start_allocation
 
 
 # ── Fixtures ──────────────────────────────────────────────────────────────────
@@ -105,6 +105,42 @@ def test_runtime_course_index_uses_prereq_level_for_min_standing():
     assert course["min_standing"] == 3.0
 
 
+def test_track_indexes_are_built_on_first_lookup(simple_buckets, simple_map, simple_courses):
+    import pickle
+
+    data = {
+        "courses_df": simple_courses,
+        "buckets_df": simple_buckets,
+        "course_bucket_map_df": simple_map,
+        "equivalencies_df": pd.DataFrame(),
+    }
+
+    tracks = ensure_runtime_indexes(data, force=True)["runtime_indexes"]["tracks"]
+
+    assert list(tracks) == ["FIN_MAJOR"]
+    assert "FIN_MAJOR" in tracks
+    assert tracks.built() == {}
+    fin_index = tracks["FIN_MAJOR"]
+    assert tracks.get("FIN_MAJOR") is fin_index
+    assert tracks.get("UNKNOWN") is None
+    assert fin_index["bucket_order"][0] == "CORE"
+    restored = pickle.loads(pickle.dumps(tracks))
+    assert restored.built()["FIN_MAJOR"] == fin_index
+
+
+def test_warm_tracks_builds_listed_tracks_eagerly(simple_buckets, simple_map, simple_courses):
+    data = {
+        "courses_df": simple_courses,
+        "buckets_df": simple_buckets,
+        "course_bucket_map_df": simple_map,
+        "equivalencies_df": pd.DataFrame(),
+    }
+
+    tracks = ensure_runtime_indexes(data, force=True, warm_tracks=["fin_major"])["runtime_indexes"]["tracks"]
+
+    assert set(tracks.built()) == {"FIN_MAJOR"}
+
+
 class TestBasicAllocation:
     def test_core_course_goes_to_core(self, simple_buckets, simple_map, simple_courses):
         result = run(["FINA 3001"], [], simple_buckets, simple_map, simple_courses)
@@ -691,3 +727,162 @@ class TestInProgressPolicyRespect:
             if "X100" in data["in_progress_applied"]
         ]
         assert len(ip_buckets) == 2, f"Expected in 2 buckets with explicit allow, found in {ip_buckets}"
+
+
+def test_track_index_precomputes_allocation_order_per_course(simple_buckets, simple_map, simple_courses):
+    data = ensure_runtime_indexes(
+        {
+            "courses_df": simple_courses,
+            "buckets_df": simple_buckets,
+            "course_bucket_map_df": simple_map,
+            "equivalencies_df": pd.DataFrame(),
+        },
+        force=True,
+    )
+    order = data["runtime_indexes"]["tracks"]["FIN_MAJOR"]["course_allocation_order"]
+
+    assert set(order) == set(simple_map["course_code"])
+    sort_key, ordered_buckets, primary_buckets = order["FINA 4020"]
+    assert [b["bucket_id"] for b in ordered_buckets] == ["FIN_CHOOSE_2", "FIN_CHOOSE_1"]
+    assert primary_buckets == ordered_buckets
+    assert sort_key[:2] == (2, "FIN_CHOOSE_2")
+    # Same track and course always hash to the same tiebreak.
+    rebuilt = ensure_runtime_indexes(dict(data), force=True)["runtime_indexes"]["tracks"]["FIN_MAJOR"]
+    assert rebuilt["course_allocation_order"]["FINA 4020"][0] == sort_key
+
+
+def test_compiled_double_count_policy_matches_pair_set(simple_buckets, simple_policy):
+    from requirements import compile_double_count_policy, get_allowed_double_count_pairs
+
+    policy = compile_double_count_policy(simple_buckets, "FIN_MAJOR", simple_policy)
+    pairs = get_allowed_double_count_pairs(simple_buckets, "FIN_MAJOR", simple_policy)
+
+    assert policy.pairs() == pairs
+    for a in policy.bucket_ids:
+        for b in policy.bucket_ids:
+            assert policy.allows(a, b) == (frozenset([a, b]) in pairs)
+    # Same family, but the policy row allows it; same family without a row is denied.
+    assert policy.allows("FIN_CHOOSE_1", "FIN_CHOOSE_2")
+    assert not policy.allows("CORE", "FIN_CHOOSE_1")
+    assert policy.allows_all(["FIN_CHOOSE_2", "BUS_ELEC_4"], "FIN_CHOOSE_1")
+    assert not policy.allows_all(["CORE"], "FIN_CHOOSE_1")
+    assert policy.allows_all([], "UNKNOWN")
+    assert not policy.allows_all(["CORE"], "UNKNOWN")
+
+
+def test_incremental_allocation_state_matches_batch_allocation(
+    simple_buckets, simple_map, simple_courses, simple_policy
+):
+    """Growing an AllocationState course by course gives the batch result."""
+    def start(codes):
+        return start_allocation(
+            codes,
+            simple_buckets,
+            simple_map,
+            simple_courses,
+            track_id="FIN_MAJOR",
+            double_count_policy_df=simple_policy,
+        )
+
+    # Deliberately out of bucket-priority order so later placements land
+    # ahead of earlier ones.
+    sequence = ["BUAD 1001", "FINA 4050", "ACCO 1030", "FINA 3001", "FINA 4020", "FINA 4001"]
+    state = start([])
+    for end in range(1, len(sequence) + 1):
+        completed = sequence[:end]
+        expected = run_with_policy(
+            completed, ["FINA 4011"], simple_buckets, simple_map, simple_courses, simple_policy
+        )
+        forked = state.fork()
+        forked.apply([sequence[end - 1]])
+        state = state.extended_to(completed)
+
+        assert forked.result(["FINA 4011"]) == expected
+        assert state.result(["FINA 4011"]) == expected
+
+    # Dropping a course falls back to a fresh build.
+    assert state.extended_to(sequence[1:]).result([]) == run_with_policy(
+        sequence[1:], [], simple_buckets, simple_map, simple_courses, simple_policy
+    )
+
+
+def test_allocation_memo_hands_out_private_copies(simple_buckets, simple_map, simple_courses, monkeypatch):
+    import allocator
+
+    memo = AllocationMemo(max_entries=8)
+    monkeypatch.setattr(allocator, "_ALLOCATION_MEMO", memo)
+    data = ensure_runtime_indexes(
+        {
+            "courses_df": simple_courses,
+            "buckets_df": simple_buckets,
+            "course_bucket_map_df": simple_map,
+            "equivalencies_df": pd.DataFrame(),
+        },
+        force=True,
+    )
+
+    def run_indexed(completed, in_progress):
+        return allocate_courses(
+            completed,
+            in_progress,
+            simple_buckets,
+            simple_map,
+            simple_courses,
+            track_id="FIN_MAJOR",
+            runtime_indexes=data["runtime_indexes"],
+        )
+
+    first = run_indexed(["FINA 3001", "ACCO 1030"], ["FINA 4001"])
+    first["applied_by_bucket"]["CORE"]["completed_applied"].append("CORRUPTED")
+    # Completed order does not matter; the second call is a hit.
+    second = run_indexed(["ACCO 1030", "FINA 3001"], ["FINA 4001"])
+
+    assert second == run(["FINA 3001", "ACCO 1030"], ["FINA 4001"], simple_buckets, simple_map, simple_courses)
+    assert "CORRUPTED" not in second["applied_by_bucket"]["CORE"]["completed_applied"]
+    stats = memo.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+    assert stats["bytes"] > 0
+
+
+def test_allocation_memo_evicts_by_bytes():
+    memo = AllocationMemo(max_entries=8, max_bytes=0)
+    memo.put(("a",), {"notes": ["x" * 100]})
+    entry_bytes = memo.stats()["bytes"]
+    memo.configure(max_bytes=entry_bytes * 2)
+    memo.put(("b",), {"notes": ["y" * 100]})
+    memo.put(("c",), {"notes": ["z" * 100]})
+
+    assert memo.get(("a",)) is None
+    assert memo.get(("c",)) == {"notes": ["z" * 100]}
+    assert memo.stats()["evictions"] == 1
+
+
+def test_allocation_memo_does_not_keep_track_indexes_alive(simple_buckets, simple_map, simple_courses, monkeypatch):
+    import gc
+    import weakref
+
+    import allocator
+
+    memo = AllocationMemo(max_entries=8)
+    monkeypatch.setattr(allocator, "_ALLOCATION_MEMO", memo)
+
+    class _TrackIndex(dict):
+        pass
+
+    data = ensure_runtime_indexes(
+        {
+            "courses_df": simple_courses,
+            "buckets_df": simple_buckets,
+            "course_bucket_map_df": simple_map,
+            "equivalencies_df": pd.DataFrame(),
+        },
+        force=True,
+    )
+    track = _TrackIndex(data["runtime_indexes"]["tracks"]["FIN_MAJOR"])
+    allocator.AllocationState(track, "FIN_MAJOR", memo=memo).apply(["FINA 3001"]).result([])
+    assert memo.stats()["entries"] == 1
+
+    track_ref = weakref.ref(track)
+    del track, data
+    gc.collect()
+    assert track_ref() is None
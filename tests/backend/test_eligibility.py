@@ -1,6 +1,12 @@
 import pytest
 import pandas as pd
-from eligibility import _evaluate_major_restriction, get_eligible_courses, check_can_take, parse_term
+from eligibility import (
+    _evaluate_major_restriction,
+    check_can_take,
+    get_eligible_course_views,
+    get_eligible_courses,
+    parse_term,
+)
 from prereq_parser import parse_prereqs
 from backend import server
 
@@ -1136,6 +1142,139 @@ class TestGetEligibleCourses:
         assert row["fills_buckets"][:2] == ["FIN_MAJOR::REQ", "FIN_MAJOR::CHOOSE"]
 
 
+
+class TestEligibleCourseViews:
+    def test_views_match_both_get_eligible_courses_modes(self, courses_df, prereq_map, course_bucket_map, buckets_df):
+        # CORE is filled, so its courses only belong to the swap pool.
+        remaining = {"FIN_CHOOSE_2": {"slots_remaining": 2, "needed": 2}}
+        args = (courses_df, ["FINA 3001"], [], "Fall", prereq_map, remaining, course_bucket_map, buckets_df)
+
+        recommendable, swap_pool = get_eligible_course_views(*args)
+
+        assert recommendable == get_eligible_courses(*args)
+        assert swap_pool == get_eligible_courses(*args, restrict_to_unmet_buckets=False)
+        assert "FINA 4001" in {c["course_code"] for c in swap_pool}
+        assert "FINA 4001" not in {c["course_code"] for c in recommendable}
+
+    def test_views_do_not_share_rows(self, courses_df, prereq_map, allocator_remaining, course_bucket_map, buckets_df):
+        recommendable, swap_pool = get_eligible_course_views(
+            courses_df, [], [], "Fall", prereq_map, allocator_remaining, course_bucket_map, buckets_df,
+        )
+
+        swap_ids = {id(row) for row in swap_pool}
+        assert recommendable
+        assert not any(id(row) in swap_ids for row in recommendable)
+
+
+class TestCandidatePruning:
+    @pytest.mark.parametrize("track_id,completed,in_progress", [
+        ("FIN_MAJOR", [], []),
+        ("FIN_MAJOR", ["ECON 1103", "ECON 1104", "MATH 1400", "ACCO 1030", "ACCO 1031", "BUAD 1560"], ["FINA 3001"]),
+        ("ACCO_MAJOR", ["ECON 1103", "ACCO 1030", "ACCO 1031", "MATH 1400"], ["ACCO 3001"]),
+    ])
+    def test_pruned_scan_matches_full_catalog_scan(self, track_id, completed, in_progress):
+        from allocator import allocate_courses
+
+        data = server._data
+        runtime_indexes = data["runtime_indexes"]
+        track_index = runtime_indexes["tracks"][track_id]
+        assert track_index["candidate_universe"]
+        assert len(track_index["candidate_universe"]) < len(runtime_indexes["courses"]["rows"])
+        unpruned_indexes = dict(runtime_indexes, tracks={track_id: dict(track_index, candidate_universe=None)})
+        remaining = allocate_courses(
+            completed, in_progress, data["buckets_df"], data["course_bucket_map_df"], data["courses_df"],
+            data["equivalencies_df"], track_id=track_id,
+            double_count_policy_df=data.get("v2_double_count_policy_df"), runtime_indexes=runtime_indexes,
+        )["remaining"]
+
+        for restrict in (True, False):
+            pruned, full = (
+                get_eligible_courses(
+                    data["courses_df"], completed, in_progress, "Fall", data["prereq_map"], remaining,
+                    data["course_bucket_map_df"], data["buckets_df"], data["equivalencies_df"],
+                    track_id=track_id, runtime_indexes=indexes, restrict_to_unmet_buckets=restrict,
+                    equiv_map=data.get("equiv_prereq_map"), cross_listed_map=data.get("cross_listed_map"),
+                )
+                for indexes in (runtime_indexes, unpruned_indexes)
+            )
+            assert pruned == full
+
+
+def _concurrent_chain(depth: int, *, equivalent_link: bool = False):
+    """MATH 1000 <- MATH 1001 <- ..., each concurrent with its predecessor, deepest row first."""
+    rows = []
+    for step in range(depth):
+        previous = f"MATH {1000 + step - 1}" if step else "none"
+        if equivalent_link and step == depth // 2:
+            # Concurrent prereq names an alias of the previous course.
+            previous = f"MATH {1000 + step - 1}H"
+        explicit = step % 2 == 0
+        rows.append({
+            "course_code": f"MATH {1000 + step}",
+            "course_name": f"Sequence {step}",
+            "credits": 3,
+            "level": 1000,
+            "offered_fall": True,
+            "offered_spring": True,
+            "offered_summer": False,
+            "prereq_hard": "none" if explicit else previous,
+            "prereq_concurrent": previous if explicit else "none",
+            "prereq_soft": "" if explicit else "may_be_concurrent",
+            "offering_confidence": "high",
+        })
+    courses = pd.DataFrame(list(reversed(rows)))
+    codes = courses["course_code"].tolist()
+    buckets = pd.DataFrame([{
+        "track_id": "FIN_MAJOR", "bucket_id": "SEQ", "bucket_label": "Sequence", "priority": 1,
+        "needed_count": depth, "needed_credits": None, "min_level": None, "allow_double_count": False,
+    }])
+    course_map = pd.DataFrame([{"track_id": "FIN_MAJOR", "bucket_id": "SEQ", "course_code": code} for code in codes])
+    prereq_map = {code: parse_prereqs(raw) for code, raw in zip(codes, courses["prereq_hard"])}
+    remaining = {"SEQ": {"slots_remaining": depth, "remaining_courses": codes}}
+    return courses, buckets, course_map, prereq_map, remaining
+
+
+class TestSameSemesterChains:
+    @pytest.mark.parametrize("use_runtime_indexes", [False, True])
+    def test_deep_chain_is_admitted_in_one_semester(self, use_runtime_indexes):
+        from allocator import ensure_runtime_indexes
+
+        courses, buckets, course_map, prereq_map, remaining = _concurrent_chain(60)
+        runtime_indexes = None
+        if use_runtime_indexes:
+            runtime_indexes = ensure_runtime_indexes({
+                "courses_df": courses,
+                "buckets_df": buckets,
+                "course_bucket_map_df": course_map,
+                "prereq_map": prereq_map,
+            })["runtime_indexes"]
+
+        eligible = get_eligible_courses(
+            courses, [], [], "Fall", prereq_map, remaining, course_map, buckets,
+            runtime_indexes=runtime_indexes,
+        )
+
+        by_code = {c["course_code"]: c for c in eligible}
+        assert len(by_code) == 60
+        assert by_code["MATH 1000"]["same_semester_prereqs"] == []
+        assert by_code["MATH 1059"]["same_semester_prereqs"] == ["MATH 1058"]
+
+    def test_chain_through_equivalent_alias(self):
+        courses, buckets, course_map, prereq_map, remaining = _concurrent_chain(10, equivalent_link=True)
+        equiv_map = {"MATH 1004": {"MATH 1004H"}}
+
+        without_alias = get_eligible_courses(
+            courses, [], [], "Fall", prereq_map, remaining, course_map, buckets,
+        )
+        with_alias = get_eligible_courses(
+            courses, [], [], "Fall", prereq_map, remaining, course_map, buckets,
+            equiv_map=equiv_map,
+        )
+
+        assert sorted(c["course_code"] for c in without_alias) == [f"MATH {1000 + step}" for step in range(5)]
+        assert len(with_alias) == 10
+
+
 class TestCheckCanTake:
     def test_major_restriction_parses_external_subject_codes(self):
         blocked, reason, satisfied = _evaluate_major_restriction(
@@ -0,0 +1,122 @@
+"""Incremental per-sheet reload must match a full load_data() of the same files."""
+
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from data_loader import changed_load_stages, load_data, reload_data
+
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "data")
+
+
+@pytest.fixture(scope="module")
+def data_copy(tmp_path_factory):
+    root = tmp_path_factory.mktemp("incremental_reload") / "data"
+    shutil.copytree(DATA_DIR, root)
+    return root
+
+
+@pytest.fixture(scope="module")
+def initial_data(data_copy):
+    return load_data(str(data_copy))
+
+
+def _without_memo_token(track_index: dict) -> dict:
+    # memo_token identifies one build, so separately built indexes differ in it.
+    return {key: value for key, value in track_index.items() if key != "memo_token"}
+
+
+def _drop_last_row(path) -> None:
+    lines = path.read_text(encoding="utf-8").splitlines(keepends=True)
+    path.write_text("".join(lines[:-1]), encoding="utf-8")
+
+
+def test_changed_load_stages_maps_sheets_to_stages():
+    before = {"courses": "a", "master_bucket_courses": "b", "quips": "c", "course_equivalencies": "d"}
+
+    assert changed_load_stages(before, dict(before, quips="x")) == set()
+    assert changed_load_stages(before, dict(before, master_bucket_courses="x")) == {"buckets"}
+    assert changed_load_stages(before, dict(before, course_equivalencies="x")) == {"equivalencies"}
+    assert changed_load_stages(before, dict(before, course_offerings="x")) == {"offerings"}
+    assert changed_load_stages(before, {k: v for k, v in before.items() if k != "courses"}) == {"courses"}
+
+
+def test_unconsumed_sheet_edit_keeps_runtime_data(data_copy, initial_data):
+    quips = data_copy / "quips.csv"
+    original = quips.read_text(encoding="utf-8")
+    try:
+        quips.write_text(original + "\n", encoding="utf-8")
+        reloaded = reload_data(str(data_copy), initial_data)
+    finally:
+        quips.write_text(original, encoding="utf-8")
+
+    assert reloaded["data_version"] == initial_data["data_version"]
+    assert reloaded["runtime_indexes"] is initial_data["runtime_indexes"]
+    assert reloaded["sheet_digests"]["quips"] != initial_data["sheet_digests"]["quips"]
+
+
+def test_bucket_map_edit_rebuilds_only_bucket_dependent_state(data_copy, initial_data):
+    # Only already-built track indexes can be carried over.
+    initial_data["runtime_indexes"]["tracks"].warm()
+    _drop_last_row(data_copy / "master_bucket_courses.csv")
+
+    reloaded = reload_data(str(data_copy), initial_data)
+    expected = load_data(str(data_copy))
+
+    assert reloaded["data_version"] == expected["data_version"] != initial_data["data_version"]
+    # Catalog stage is reused as-is.
+    assert reloaded["courses_df"] is initial_data["courses_df"]
+    assert reloaded["prereq_map"] is initial_data["prereq_map"]
+    assert reloaded["runtime_indexes"]["courses"] is initial_data["runtime_indexes"]["courses"]
+    # Bucket-derived state matches a full reload.
+    pd.testing.assert_frame_equal(
+        reloaded["master_bucket_courses_df"].reset_index(drop=True),
+        expected["master_bucket_courses_df"].reset_index(drop=True),
+    )
+    pd.testing.assert_frame_equal(
+        reloaded["course_bucket_map_df"].reset_index(drop=True),
+        expected["course_bucket_map_df"].reset_index(drop=True),
+    )
+    assert set(reloaded["runtime_indexes"]["tracks"]) == set(expected["runtime_indexes"]["tracks"])
+    for track_key, track_index in expected["runtime_indexes"]["tracks"].items():
+        rebuilt = reloaded["runtime_indexes"]["tracks"][track_key]
+        assert _without_memo_token(rebuilt) == _without_memo_token(track_index)
+    reused = [
+        track_key
+        for track_key, track_index in reloaded["runtime_indexes"]["tracks"].items()
+        if track_index is initial_data["runtime_indexes"]["tracks"].get(track_key)
+    ]
+    assert 0 < len(reused) < len(reloaded["runtime_indexes"]["tracks"])
+
+
+def test_offering_edit_reuses_catalog_and_prereqs(data_copy, initial_data):
+    offerings = data_copy / "course_offerings.csv"
+    offerings.write_text(offerings.read_text(encoding="utf-8") + "\n", encoding="utf-8")
+
+    reloaded = reload_data(str(data_copy), initial_data)
+
+    assert reloaded["prereq_map"] is initial_data["prereq_map"]
+    assert reloaded["catalog_codes"] is initial_data["catalog_codes"]
+    assert reloaded["courses_df"] is not initial_data["courses_df"]
+    pd.testing.assert_frame_equal(reloaded["courses_df"], initial_data["courses_df"])
+    assert reloaded["runtime_indexes"]["courses"]["rows"] == initial_data["runtime_indexes"]["courses"]["rows"]
+    stages = [stage["stage"] for stage in reloaded["load_profile"]["stages"]]
+    assert reloaded["load_profile"]["mode"] == "incremental"
+    assert "overlay_course_offerings" in stages
+    assert "parse_prereqs" not in stages
+
+
+def test_prereq_cache_parses_each_distinct_string_once(initial_data):
+    stats = initial_data["prereq_cache"].stats()
+    courses_df = initial_data["courses_df"]
+
+    assert stats["misses"] == stats["distinct"] == len(initial_data["prereq_cache"])
+    # Hard and concurrent prereqs share one cache.
+    assert stats["lookups"] >= 2 * len(courses_df)
+    assert stats["distinct"] < len(courses_df)
+    assert initial_data["runtime_indexes"]["courses"]["rows"][0]["parsed_concurrent"] is (
+        initial_data["prereq_cache"].compile(courses_df["prereq_concurrent"].iloc[0])
+    )
@@ -16,6 +16,7 @@ from validators import (
     expand_completed_with_prereqs,
     expand_completed_with_prereqs_with_provenance,
     expand_in_progress_with_prereqs,
+    RequiredPrereqClosure,
     _get_all_required_prereqs,
 )
 
@@ -105,6 +106,42 @@ class TestGetAllRequiredPrereqs:
         assert _get_all_required_prereqs("ZZZZ 9999", {}) == set()
 
 
+# ── RequiredPrereqClosure ─────────────────────────────────────────────────────
+
+class TestRequiredPrereqClosure:
+    def test_matches_recursive_walk_including_cycles(self):
+        m = _pmap(
+            ("E", ["D", "X"]),
+            ("D", "C"),
+            ("C", "B"),
+            ("B", "C"),          # B <-> C cycle
+            ("X", ("Y", "Z")),   # OR branch is not traversed
+            ("S", "S"),          # self-loop
+            ("Y", None),
+        )
+        closure = RequiredPrereqClosure(m)
+        for course in list(m) + ["UNKNOWN"]:
+            assert set(closure.required(course)) == _get_all_required_prereqs(course, m), course
+        assert closure.required("B") == {"B", "C"}
+        assert closure.required("S") == {"S"}
+
+    def test_deep_chain_does_not_recurse(self):
+        depth = 5000
+        m = _pmap(*[(f"C{i}", f"C{i - 1}" if i else None) for i in range(depth)])
+        closure = RequiredPrereqClosure(m)
+        assert len(closure.required(f"C{depth - 1}")) == depth - 1
+
+    def test_validators_use_closure_only_for_its_prereq_map(self):
+        m = _pmap(("B", "A"), ("A", None))
+        closure = RequiredPrereqClosure(m)
+        assert find_inconsistent_completed_courses(["B"], ["A"], m, closure) == [
+            {"course_code": "B", "prereqs_in_progress": ["A"]}
+        ]
+        other = _pmap(("B", None))
+        assert find_inconsistent_completed_courses(["B"], ["A"], other, closure) == []
+        assert expand_completed_with_prereqs(["B"], m, closure) == ["B", "A"]
+
+
 # ── find_inconsistent_completed_courses ───────────────────────────────────────
 
 class TestFindInconsistentCompletedCourses:
@@ -0,0 +1,47 @@
+"""Tests for the per-stage load profiler in data_loader."""
+
+import tracemalloc
+
+import pandas as pd
+
+from data_loader import LoadProfiler, format_load_profile
+
+
+def test_profiler_records_wall_time_and_row_counts():
+    profiler = LoadProfiler()
+    frame = pd.DataFrame({"course_code": ["FINA 3001", "FINA 4001", "ACCO 1030"]})
+
+    result = profiler.run("keep_finance", lambda df: df[df["course_code"].str.startswith("FINA")], frame)
+
+    assert len(result) == 2
+    (record,) = profiler.stages
+    assert record["stage"] == "keep_finance"
+    assert record["rows_in"] == 3
+    assert record["rows_out"] == 2
+    assert record["wall_ms"] >= 0
+    assert "peak_alloc_kb" not in record
+
+
+def test_profiler_traces_peak_allocation_when_enabled():
+    profiler = LoadProfiler(trace_memory=True)
+    tracemalloc.start()
+    try:
+        profiler.run("allocate", lambda: [bytes(1024) for _ in range(256)], rows_out=len)
+    finally:
+        tracemalloc.stop()
+
+    (record,) = profiler.stages
+    assert record["rows_out"] == 256
+    assert record["peak_alloc_kb"] >= 256
+
+
+def test_format_load_profile_lists_every_stage():
+    profiler = LoadProfiler()
+    profiler.run("first", lambda: {"a": 1})
+    profiler.run("second", lambda: (pd.DataFrame({"x": [1, 2]}), 0))
+
+    table = format_load_profile(profiler.summary("full"))
+
+    assert "first" in table
+    assert "second" in table
+    assert "total (full)" in table
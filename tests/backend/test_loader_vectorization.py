@@ -0,0 +1,625 @@
+"""
+Golden-equivalence tests for the vectorized data_loader transforms.
+
+The `_reference_*` functions below are frozen copies of the row-by-row
+(iterrows) implementations they replaced. Each vectorized transform must
+produce identical output on the shipped catalog and on edge-case frames.
+"""
+
+import os
+
+import pandas as pd
+import pytest
+
+import data_loader
+from data_loader import (
+    _VALID_RELATION_TYPES,
+    _build_equivalency_group_metadata,
+    _count_canonical_mapped_courses,
+    _dynamic_elective_bucket_mask,
+    _map_requirement_mode_to_role,
+    _normalize_child_buckets_df,
+    _normalize_count_strategy,
+    _normalize_master_bucket_courses_df,
+    _normalize_parent_buckets_df,
+    _normalize_programs_df,
+    _normalize_v2_buckets_df,
+    _normalize_v2_courses_all_buckets_df,
+    _normalize_v2_sub_buckets_df,
+    _safe_bool_col,
+    _semester_sort_key,
+    _term_code_to_label,
+)
+
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "data")
+
+
+# ── Reference (pre-vectorization) implementations ─────────────────────────────
+
+def _reference_normalize_offering_rows(
+    offerings_df: pd.DataFrame,
+) -> tuple[dict[str, dict[str, bool]], list[str]]:
+    """
+    Return:
+      course_term_map[course_code][semester_label] = offered_bool
+      ordered_semesters (chronological ascending)
+
+    Supports both:
+      - legacy rows: course_code, term_code, offered
+      - wide rows:  course_code, Fall 2025, Spring 2026, ...
+    """
+    if len(offerings_df) == 0 or "course_code" not in offerings_df.columns:
+        return {}, []
+
+    src = offerings_df.copy()
+    src["course_code"] = src["course_code"].fillna("").astype(str).str.strip()
+    src = src[src["course_code"] != ""]
+    if len(src) == 0:
+        return {}, []
+
+    course_terms: dict[str, dict[str, bool]] = {}
+    ordered_semesters: list[str] = []
+
+    legacy_cols = {c.strip().lower() for c in src.columns}
+    if {"term_code", "offered"}.issubset(legacy_cols):
+        src["term_code"] = src["term_code"].fillna("").astype(str).str.strip().str.upper()
+        src = _safe_bool_col(src, "offered")
+        src = src[src["term_code"] != ""]
+        src["semester_label"] = src["term_code"].apply(_term_code_to_label)
+
+        for _, row in src.iterrows():
+            code = str(row.get("course_code", "")).strip()
+            label = str(row.get("semester_label", "")).strip()
+            if not code or not label:
+                continue
+            offered = bool(row.get("offered", False))
+            course_terms.setdefault(code, {})
+            course_terms[code][label] = course_terms[code].get(label, False) or offered
+        ordered_semesters = sorted(
+            {str(v).strip() for v in src["semester_label"].tolist() if str(v).strip()},
+            key=_semester_sort_key,
+        )
+        return course_terms, ordered_semesters
+
+    semester_cols = [
+        c for c in src.columns
+        if _semester_sort_key(c) != (-1, -1) and c != "course_code"
+    ]
+    semester_cols = sorted(semester_cols, key=_semester_sort_key)
+    if not semester_cols:
+        return {}, []
+
+    for col in semester_cols:
+        src[col] = src[col].apply(
+            lambda v: False if pd.isna(v) else (
+                v if isinstance(v, bool) else str(v).strip().lower() in {"1", "true", "yes", "y"}
+            )
+        )
+
+    for _, row in src.iterrows():
+        code = str(row.get("course_code", "")).strip()
+        if not code:
+            continue
+        course_terms.setdefault(code, {})
+        for sem_col in semester_cols:
+            course_terms[code][sem_col] = bool(row.get(sem_col, False))
+    return course_terms, semester_cols
+
+
+def _reference_resolve_runtime_needed_counts(
+    merged_sub: pd.DataFrame,
+    v2_courses_all_buckets_df: pd.DataFrame,
+    equivalencies_df: pd.DataFrame | None,
+) -> tuple[pd.Series, pd.Series]:
+    configured_needed_count = pd.to_numeric(
+        merged_sub.get("courses_required"),
+        errors="coerce",
+    )
+    count_strategy = (
+        merged_sub.get("count_strategy", "manual")
+        .fillna("manual")
+        .astype(str)
+        .str.strip()
+        .str.lower()
+        .map(_normalize_count_strategy)
+    )
+    effective_needed_count = configured_needed_count.copy()
+
+    if not (count_strategy == "canonical_mapped").any():
+        return effective_needed_count, count_strategy
+
+    group_metadata = _build_equivalency_group_metadata(equivalencies_df)
+    mapped_counts: dict[tuple[str, str], int] = {}
+    if v2_courses_all_buckets_df is not None and len(v2_courses_all_buckets_df) > 0:
+        map_df = v2_courses_all_buckets_df.copy()
+        map_df["program_id"] = map_df["program_id"].fillna("").astype(str).str.strip().str.upper()
+        map_df["sub_bucket_id"] = map_df["sub_bucket_id"].fillna("").astype(str).str.strip()
+        map_df["course_code"] = map_df["course_code"].fillna("").astype(str).str.strip()
+        map_df = map_df[map_df["course_code"] != ""]
+        for (program_id, sub_bucket_id), grp in map_df.groupby(["program_id", "sub_bucket_id"]):
+            mapped_counts[(program_id, sub_bucket_id)] = _count_canonical_mapped_courses(
+                program_id,
+                grp["course_code"].tolist(),
+                group_metadata,
+            )
+
+    for idx, row in merged_sub.iterrows():
+        if count_strategy.loc[idx] != "canonical_mapped":
+            continue
+        key = (
+            str(row.get("program_id", "") or "").strip().upper(),
+            str(row.get("sub_bucket_id", "") or "").strip(),
+        )
+        derived_count = mapped_counts.get(key)
+        if derived_count:
+            effective_needed_count.loc[idx] = derived_count
+
+    return effective_needed_count, count_strategy
+
+
+def _reference_convert_parent_child_model_to_v2(
+    parent_buckets_df: pd.DataFrame,
+    child_buckets_df: pd.DataFrame,
+    master_bucket_courses_df: pd.DataFrame,
+) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Convert parent/child schema into V2-compatible frames consumed by runtime.
+    """
+    pb = _normalize_parent_buckets_df(parent_buckets_df)
+    cb = _normalize_child_buckets_df(child_buckets_df)
+    mbc = _normalize_master_bucket_courses_df(master_bucket_courses_df)
+
+    # Build V2 programs from parent buckets.
+    programs_rows = []
+    parent_meta: dict[str, dict] = {}
+    for _, row in pb.iterrows():
+        pid = str(row["parent_bucket_id"]).strip().upper()
+        ptype = str(row.get("type", "major") or "major").strip().lower()
+        parent_major = str(row.get("parent_major", "") or "").strip().upper()
+        family = str(row.get("double_count_family_id", "") or "").strip().upper()
+        active = bool(row.get("active", True))
+        req_primary = bool(row.get("requires_primary_major", False))
+        is_universal = ptype == "universal"
+        required_major_id = str(row.get("required_major", "") or "").strip().upper()
+        is_default = bool(row.get("is_default", False))
+
+        kind = "minor" if ptype == "minor" else ("track" if ptype == "track" else "major")
+        program_parent = parent_major if kind == "track" else ""
+        programs_rows.append(
+            {
+                "program_id": pid,
+                "program_label": str(row.get("parent_bucket_label", pid) or pid).strip(),
+                "kind": kind,
+                "parent_major_id": program_parent,
+                "active": active,
+                "requires_primary_major": req_primary,
+                "applies_to_all": is_universal,
+                "required_major_id": required_major_id,
+                "is_default": is_default,
+                "college_alias": str(row.get("college_alias", "") or "").strip().lower(),
+            }
+        )
+        parent_meta[pid] = {
+            "type": ptype,
+            "parent_major": parent_major,
+            "double_count_family_id": family or pid,
+            "label": str(row.get("parent_bucket_label", pid) or pid).strip(),
+            "active": active,
+            "display_parent_alias": str(row.get("display_parent_alias", "") or "").strip().upper(),
+            "planner_parent_priority": int(row.get("planner_parent_priority", 2) or 2),
+        }
+    programs_df = _normalize_programs_df(pd.DataFrame(programs_rows))
+
+    # Build V2 buckets with majors/tracks/minors as standalone programs.
+    bucket_rows: list[dict] = []
+    child_rows: list[dict] = []
+    map_rows: list[dict] = []
+    parent_owner: dict[str, tuple[str, str]] = {}
+
+    for parent_id, meta in parent_meta.items():
+        ptype = meta["type"]
+        parent_major = meta["parent_major"]
+        family = str(meta.get("double_count_family_id", "") or "").strip().upper() or parent_id
+        active = bool(meta["active"])
+        label = str(meta["label"] or parent_id)
+        display_parent_alias = str(meta.get("display_parent_alias", "") or "").strip().upper()
+        planner_parent_priority = int(meta.get("planner_parent_priority", 2) or 2)
+
+        if ptype == "track":
+            owner_program = parent_id
+            track_required = ""
+        elif ptype == "minor":
+            owner_program = parent_id   # minor owns its own bucket scope
+            track_required = ""          # no track_required linkage
+        else:
+            owner_program = parent_id
+            track_required = ""
+
+        parent_owner[parent_id] = (owner_program, track_required)
+        bucket_rows.append(
+            {
+                "program_id": owner_program,
+                "bucket_id": parent_id,
+                "bucket_label": label,
+                "priority": planner_parent_priority,
+                "track_required": track_required,
+                "double_count_family_id": family,
+                "active": active,
+                "display_parent_alias": display_parent_alias,
+                "planner_parent_priority": planner_parent_priority,
+            }
+        )
+
+    child_lookup: dict[tuple[str, str], tuple[str, str]] = {}
+    for _, row in cb.iterrows():
+        parent_id = str(row.get("parent_bucket_id", "") or "").strip().upper()
+        if not parent_id:
+            continue
+        owner_program, track_required = parent_owner.get(parent_id, (parent_id, ""))
+        child_id = str(row.get("child_bucket_id", "") or "").strip().upper()
+        if not child_id:
+            continue
+        mode = str(row.get("requirement_mode", "required") or "required").strip().lower()
+        courses_required = row.get("courses_required")
+        credits_required = row.get("credits_required")
+        child_rows.append(
+            {
+                "program_id": owner_program,
+                "bucket_id": parent_id,
+                "sub_bucket_id": child_id,
+                "sub_bucket_label": str(row.get("child_bucket_label", child_id) or child_id).strip(),
+                "courses_required": courses_required,
+                "credits_required": credits_required,
+                "count_strategy": str(row.get("count_strategy", "manual") or "manual").strip().lower(),
+                "min_level": row.get("min_level"),
+                "role": _map_requirement_mode_to_role(mode),
+                "requirement_mode": mode,
+                # Priority intentionally omitted (NaN) so runtime derives deterministic order.
+                "priority": None,
+                "notes": str(row.get("notes", "") or "").strip(),
+                "planner_tier": row.get("planner_tier"),
+                "planner_bucket_rank": row.get("planner_bucket_rank"),
+                "bucket_flags": str(row.get("bucket_flags", "") or "").strip().lower(),
+                "dynamic_pool_tag": str(row.get("dynamic_pool_tag", "") or "").strip().lower(),
+                "dynamic_pool_exclusive": bool(row.get("dynamic_pool_exclusive", False)),
+            }
+        )
+        child_lookup[(parent_id, child_id)] = (owner_program, track_required)
+
+    for _, row in mbc.iterrows():
+        parent_id = str(row.get("parent_bucket_id", "") or "").strip().upper()
+        child_id = str(row.get("child_bucket_id", "") or "").strip().upper()
+        if not parent_id or not child_id:
+            continue
+        owner_program, _ = child_lookup.get((parent_id, child_id), parent_owner.get(parent_id, (parent_id, "")))
+        map_rows.append(
+            {
+                "program_id": owner_program,
+                "sub_bucket_id": child_id,
+                "course_code": str(row.get("course_code", "") or "").strip(),
+                "notes": str(row.get("notes", "") or "").strip(),
+            }
+        )
+
+    v2_buckets_df = _normalize_v2_buckets_df(pd.DataFrame(bucket_rows))
+    v2_sub_buckets_df = _normalize_v2_sub_buckets_df(pd.DataFrame(child_rows))
+    v2_courses_all_buckets_df = _normalize_v2_courses_all_buckets_df(pd.DataFrame(map_rows))
+
+    return programs_df, v2_buckets_df, v2_sub_buckets_df, v2_courses_all_buckets_df
+
+
+def _reference_synthesize_dynamic_elective_pool_mappings(
+    courses_df: pd.DataFrame,
+    buckets_df: pd.DataFrame,
+    course_bucket_map_df: pd.DataFrame,
+) -> tuple[pd.DataFrame, int]:
+    """
+    Build dynamic mappings for credits_pool elective buckets from tagged courses.
+
+    Scope:
+      - runtime bucket requirement_mode == credits_pool
+      - bucket.dynamic_pool_tag is configured
+      - courses.elective_pool_tag matches bucket.dynamic_pool_tag
+      - bucket min_level filter is respected
+    """
+    if len(buckets_df) == 0:
+        return course_bucket_map_df, 0
+    if "elective_pool_tag" not in courses_df.columns:
+        return course_bucket_map_df, 0
+    if "course_code" not in courses_df.columns:
+        return course_bucket_map_df, 0
+
+    dynamic_buckets = buckets_df[_dynamic_elective_bucket_mask(buckets_df)].copy()
+    if len(dynamic_buckets) == 0:
+        return course_bucket_map_df, 0
+
+    tagged = courses_df.copy()
+    tagged["course_code"] = tagged["course_code"].fillna("").astype(str).str.strip()
+    tagged["elective_pool_tag"] = (
+        tagged["elective_pool_tag"]
+        .fillna("")
+        .astype(str)
+        .str.strip()
+        .str.lower()
+    )
+    tagged["level"] = pd.to_numeric(tagged.get("level"), errors="coerce")
+    tagged = tagged[
+        (tagged["course_code"] != "")
+        & (tagged["elective_pool_tag"] != "")
+    ][["course_code", "level", "elective_pool_tag"]].drop_duplicates()
+    if len(tagged) == 0:
+        return course_bucket_map_df, 0
+
+    new_rows: list[dict] = []
+    for _, bucket in dynamic_buckets.iterrows():
+        track_id = str(bucket.get("track_id", "") or "").strip().upper()
+        bucket_id = str(bucket.get("bucket_id", "") or "").strip()
+        if not track_id or not bucket_id:
+            continue
+
+        dynamic_pool_tag = str(bucket.get("dynamic_pool_tag", "") or "").strip().lower()
+        if not dynamic_pool_tag:
+            continue
+
+        min_level = pd.to_numeric(bucket.get("min_level"), errors="coerce")
+        eligible = tagged[tagged["elective_pool_tag"] == dynamic_pool_tag]
+        if pd.notna(min_level):
+            eligible = eligible[eligible["level"].fillna(-1) >= float(min_level)]
+        if len(eligible) == 0:
+            continue
+
+        for course_code in eligible["course_code"].tolist():
+            new_rows.append(
+                {
+                    "track_id": track_id,
+                    "course_code": str(course_code).strip(),
+                    "bucket_id": bucket_id,
+                    "notes": f"dynamic:elective_pool_tag={dynamic_pool_tag}",
+                }
+            )
+
+    if not new_rows:
+        return course_bucket_map_df, 0
+
+    synthesized_df = pd.DataFrame(new_rows)
+    merged = pd.concat([course_bucket_map_df.copy(), synthesized_df], ignore_index=True)
+    merged = merged.drop_duplicates(subset=["track_id", "bucket_id", "course_code"], keep="first")
+    return merged, len(synthesized_df)
+
+
+def _reference_unpivot_wide_equivalencies(eq: pd.DataFrame) -> pd.DataFrame:
+    """Unpivot wide-format equivalencies (one row per group) into internal long format."""
+    rows = []
+    for _, r in eq.iterrows():
+        raw_id = r.get("id", "")
+        gid = "" if pd.isna(raw_id) else str(raw_id).strip()
+        if not gid:
+            continue
+        raw_type = r.get("type", "equivalent")
+        rtype = ("equivalent" if pd.isna(raw_type) else str(raw_type).strip().lower()) or "equivalent"
+        raw_scope = r.get("parent_bucket", "")
+        scope = "" if pd.isna(raw_scope) else str(raw_scope).strip()
+        for col in ("course_1", "course_2", "course_3"):
+            raw = r.get(col, "")
+            code = "" if pd.isna(raw) else str(raw).strip()
+            if code:
+                rows.append({
+                    "equiv_group_id": gid,
+                    "course_code": code,
+                    "relation_type": rtype,
+                    "label": "",
+                    "scope_program_id": scope,
+                })
+
+    out = pd.DataFrame(rows, columns=["equiv_group_id", "course_code", "relation_type", "label", "scope_program_id"])
+    if len(out) > 0:
+        invalid_mask = ~out["relation_type"].isin(_VALID_RELATION_TYPES)
+        if invalid_mask.any():
+            bad = sorted(out.loc[invalid_mask, "relation_type"].unique())
+            print(f"[WARN] Invalid relation_type values in course_equivalencies: {bad}; defaulting to 'equivalent'.")
+            out.loc[invalid_mask, "relation_type"] = "equivalent"
+    return out
+
+
+# ── Fixtures ──────────────────────────────────────────────────────────────────
+
+@pytest.fixture(scope="module")
+def sheets():
+    source = data_loader._CsvDirSource(DATA_DIR)
+    names = ("parent_buckets", "child_buckets", "master_bucket_courses", "course_equivalencies")
+    return {name: source.parse(name) for name in names}
+
+
+@pytest.fixture(scope="module")
+def loaded():
+    return data_loader.load_data(DATA_DIR)
+
+
+def _assert_frames_equal(actual: pd.DataFrame, expected: pd.DataFrame) -> None:
+    pd.testing.assert_frame_equal(
+        actual.reset_index(drop=True),
+        expected.reset_index(drop=True),
+        check_dtype=True,
+    )
+
+
+def _assert_frame_tuples_equal(actual: tuple, expected: tuple) -> None:
+    assert len(actual) == len(expected)
+    for actual_item, expected_item in zip(actual, expected):
+        if isinstance(expected_item, pd.DataFrame):
+            _assert_frames_equal(actual_item, expected_item)
+        else:
+            assert actual_item == expected_item
+
+
+# ── Catalog equivalence ───────────────────────────────────────────────────────
+
+def test_convert_parent_child_model_matches_reference(sheets):
+    args = (
+        _normalize_parent_buckets_df(sheets["parent_buckets"]),
+        _normalize_child_buckets_df(sheets["child_buckets"]),
+        _normalize_master_bucket_courses_df(sheets["master_bucket_courses"]),
+    )
+
+    _assert_frame_tuples_equal(
+        data_loader._convert_parent_child_model_to_v2(*args),
+        _reference_convert_parent_child_model_to_v2(*args),
+    )
+
+
+def test_synthesize_dynamic_elective_pool_mappings_matches_reference(loaded):
+    course_bucket_map_df = loaded["course_bucket_map_df"]
+    base_map = course_bucket_map_df[
+        ~course_bucket_map_df["notes"].astype(str).str.startswith("dynamic:")
+    ].reset_index(drop=True)
+    args = (loaded["courses_df"], loaded["buckets_df"], base_map)
+
+    actual = data_loader._synthesize_dynamic_elective_pool_mappings(*args)
+    expected = _reference_synthesize_dynamic_elective_pool_mappings(*args)
+
+    assert actual[1] == expected[1] > 0
+    _assert_frames_equal(actual[0], expected[0])
+
+
+def test_resolve_runtime_needed_counts_matches_reference(loaded):
+    merged_sub = loaded["v2_sub_buckets_df"].copy()
+    # Force the canonical_mapped path for every sub-bucket.
+    merged_sub["count_strategy"] = "canonical_mapped"
+    args = (merged_sub, loaded["v2_courses_all_buckets_df"], loaded["equivalencies_df"])
+
+    actual_counts, actual_strategy = data_loader._resolve_runtime_needed_counts(*args)
+    expected_counts, expected_strategy = _reference_resolve_runtime_needed_counts(*args)
+
+    pd.testing.assert_series_equal(actual_counts, expected_counts)
+    pd.testing.assert_series_equal(actual_strategy, expected_strategy)
+
+
+def test_unpivot_wide_equivalencies_matches_reference(sheets):
+    eq = sheets["course_equivalencies"]
+
+    _assert_frames_equal(
+        data_loader._unpivot_wide_equivalencies(eq),
+        _reference_unpivot_wide_equivalencies(eq),
+    )
+
+
+def test_prereq_map_matches_row_by_row_parse(loaded):
+    from prereq_parser import PrereqCache, parse_prereqs
+
+    courses_df = loaded["courses_df"]
+    expected = {}
+    for _, row in courses_df.iterrows():
+        expected[row["course_code"]] = parse_prereqs(row.get("prereq_hard", "none"))
+
+    assert data_loader._parse_prereq_map(courses_df, PrereqCache()) == expected
+    assert loaded["prereq_map"] == expected
+
+
+# ── Edge cases ────────────────────────────────────────────────────────────────
+
+def test_convert_parent_child_model_edge_cases_match_reference():
+    parent = pd.DataFrame(
+        [
+            {"parent_bucket_id": "fin_major", "parent_bucket_label": "", "type": "major", "planner_parent_priority": "0"},
+            {"parent_bucket_id": "FIN_TRACK", "parent_bucket_label": "Track", "type": "track", "parent_major": "fin_major"},
+            {"parent_bucket_id": "FIN_MAJOR", "parent_bucket_label": "Finance (dup)", "type": "major", "active": "no"},
+            {"parent_bucket_id": "BCC", "type": "universal", "double_count_family_id": ""},
+            {"parent_bucket_id": "", "type": "minor"},
+        ]
+    )
+    child = pd.DataFrame(
+        [
+            {"parent_bucket_id": "FIN_MAJOR", "child_bucket_id": "core", "child_bucket_label": "", "courses_required": "2"},
+            {"parent_bucket_id": "FIN_TRACK", "child_bucket_id": "ELEC", "requirement_mode": "credits_pool", "notes": "  x  "},
+            {"parent_bucket_id": "", "child_bucket_id": "ORPHAN"},
+            {"parent_bucket_id": "UNKNOWN", "child_bucket_id": "LOST", "count_strategy": "canonical_mapped"},
+        ]
+    )
+    master = pd.DataFrame(
+        [
+            {"parent_bucket_id": "FIN_MAJOR", "child_bucket_id": "CORE", "course_code": " FINA 3001 ", "notes": " n "},
+            {"parent_bucket_id": "UNKNOWN", "child_bucket_id": "LOST", "course_code": "FINA 4001"},
+            {"parent_bucket_id": "FIN_MAJOR", "child_bucket_id": "", "course_code": "FINA 4011"},
+        ]
+    )
+
+    for args in (
+        (parent, child, master),
+        (parent, child.iloc[0:0], master.iloc[0:0]),
+    ):
+        _assert_frame_tuples_equal(
+            data_loader._convert_parent_child_model_to_v2(*args),
+            _reference_convert_parent_child_model_to_v2(*args),
+        )
+
+
+def test_unpivot_wide_equivalencies_edge_cases_match_reference():
+    eq = pd.DataFrame(
+        [
+            {"id": " G1 ", "course_1": "ACCO 1030", "course_2": None, "course_3": "ACCO 1031", "type": "", "parent_bucket": None},
+            {"id": None, "course_1": "ECON 1103", "course_2": "ECON 1104", "course_3": None, "type": "equivalent"},
+            {"id": "G3", "course_1": " ", "course_2": "MATH 1400", "course_3": "MATH 1450", "type": "Cross_Listed", "parent_bucket": "FIN"},
+            {"id": "G4", "course_1": "X 1", "course_2": "X 2", "course_3": "", "type": "bogus"},
+        ]
+    )
+
+    for frame in (eq, eq.drop(columns=["type", "parent_bucket", "course_3"]), eq.iloc[0:0]):
+        _assert_frames_equal(
+            data_loader._unpivot_wide_equivalencies(frame),
+            _reference_unpivot_wide_equivalencies(frame),
+        )
+
+
+def test_normalize_offering_rows_matches_reference():
+    legacy = pd.DataFrame(
+        [
+            {"course_code": "FINA 3001", "term_code": "2025fa", "offered": "yes"},
+            {"course_code": "FINA 3001", "term_code": "2025FA", "offered": "no"},
+            {"course_code": "FINA 3001", "term_code": "2026SP", "offered": "0"},
+            {"course_code": " ACCO 1030 ", "term_code": "2026SU", "offered": True},
+            {"course_code": "", "term_code": "2026SP", "offered": "1"},
+            {"course_code": "ACCO 1030", "term_code": "", "offered": "1"},
+        ]
+    )
+    wide = pd.DataFrame(
+        [
+            {"course_code": "FINA 3001", "Fall 2025": "Y", "Spring 2026": None, "notes": "x"},
+            {"course_code": "ACCO 1030", "Fall 2025": True, "Spring 2026": "false"},
+            {"course_code": "FINA 3001", "Fall 2025": "0", "Spring 2026": "1"},
+            {"course_code": None, "Fall 2025": "1", "Spring 2026": "1"},
+        ]
+    )
+
+    for frame in (legacy, wide, wide.drop(columns=["Fall 2025", "Spring 2026"]), legacy.iloc[0:0]):
+        assert data_loader._normalize_offering_rows(frame.copy()) == _reference_normalize_offering_rows(frame.copy())
+
+
+def test_synthesize_dynamic_elective_pool_mappings_edge_cases_match_reference():
+    courses = pd.DataFrame(
+        [
+            {"course_code": "FINA 3001", "level": "3000", "elective_pool_tag": "Biz_Elective"},
+            {"course_code": "FINA 1001", "level": "1000", "elective_pool_tag": "biz_elective"},
+            {"course_code": "MATH 9999", "level": None, "elective_pool_tag": "biz_elective"},
+            {"course_code": "HIST 1001", "level": "1000", "elective_pool_tag": "humanities"},
+            {"course_code": "NONE 1", "level": "1000", "elective_pool_tag": ""},
+        ]
+    )
+    buckets = pd.DataFrame(
+        [
+            {"track_id": "fin_major", "bucket_id": "BUS_ELEC", "requirement_mode": "credits_pool", "dynamic_pool_tag": "biz_elective", "min_level": 2000},
+            {"track_id": "FIN_MAJOR", "bucket_id": "ANY_ELEC", "requirement_mode": "credits_pool", "dynamic_pool_tag": " BIZ_ELECTIVE ", "min_level": None},
+            {"track_id": "FIN_MAJOR", "bucket_id": "HUM", "requirement_mode": "credits_pool", "dynamic_pool_tag": "humanities", "min_level": None},
+            {"track_id": "FIN_MAJOR", "bucket_id": "CORE", "requirement_mode": "required", "dynamic_pool_tag": "biz_elective", "min_level": None},
+            {"track_id": "", "bucket_id": "BLANK", "requirement_mode": "credits_pool", "dynamic_pool_tag": "biz_elective", "min_level": None},
+        ]
+    )
+    course_map = pd.DataFrame(
+        [{"track_id": "FIN_MAJOR", "course_code": "FINA 3001", "bucket_id": "ANY_ELEC", "notes": ""}]
+    )
+
+    actual = data_loader._synthesize_dynamic_elective_pool_mappings(courses, buckets, course_map)
+    expected = _reference_synthesize_dynamic_elective_pool_mappings(courses, buckets, course_map)
+
+    assert actual[1] == expected[1]
+    _assert_frames_equal(actual[0], expected[0])
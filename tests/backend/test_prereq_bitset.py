@@ -0,0 +1,115 @@
+"""PrereqBitsets must agree with prereqs_satisfied() on every course."""
+
+import os
+import random
+
+import pytest
+
+from allocator import ensure_runtime_indexes, get_runtime_prereq_cache
+from data_loader import load_data
+from prereq_bitset import PrereqBitsets
+from prereq_parser import parse_prereqs, prereqs_satisfied
+
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "data")
+
+
+@pytest.fixture(scope="module")
+def data():
+    return load_data(DATA_DIR)
+
+
+def _assert_matches_reference(bitsets, rows, prereq_map, satisfied, equiv_map=None):
+    bits = bitsets.bitset(satisfied, equiv_map)
+    hard = bitsets.hard.evaluate(bits)
+    concurrent = bitsets.concurrent.evaluate(bits)
+    for row in rows:
+        code = row["course_code"]
+        pos = bitsets.owner_pos[code]
+        parsed = prereq_map.get(code, {"type": "none"})
+        parsed_concurrent = row.get("parsed_concurrent") or {"type": "none"}
+        assert hard[pos] == prereqs_satisfied(parsed, satisfied, equiv_map=equiv_map), code
+        assert concurrent[pos] == prereqs_satisfied(parsed_concurrent, satisfied, equiv_map=equiv_map), code
+
+
+def test_grammar_shapes_match_prereqs_satisfied():
+    prereq_map = {
+        "NONE 1000": parse_prereqs("none"),
+        "ONE 1000": parse_prereqs("ECON 1103"),
+        "AND 1000": parse_prereqs("ECON 1103; MATH 1400 or MATH 1450"),
+        "OR 1000": parse_prereqs("ACCO 1030 or ACCO 1031"),
+        "PICK 1000": {"type": "choose_n", "count": 2, "courses": ["A 1", "B 1", "A 1"]},
+        "NEST 1000": {"type": "and", "courses": [{"type": "none"}, {"type": "choose_n", "count": 1, "courses": ["B 1"]}]},
+        "BAD 1000": parse_prereqs("Instructor consent"),
+    }
+    rows = [{"course_code": code} for code in prereq_map]
+    rows[0]["parsed_concurrent"] = parse_prereqs("ECON 1104")
+    bitsets = PrereqBitsets(rows, prereq_map)
+
+    for satisfied in (
+        set(),
+        {"ECON 1103"},
+        {"ECON 1103", "MATH 1450"},
+        {"ACCO 1031", "A 1"},
+        {"B 1", "ECON 1104"},
+        {"A 1", "B 1", "UNKNOWN 9999"},
+    ):
+        _assert_matches_reference(bitsets, rows, prereq_map, satisfied)
+
+    bits = bitsets.bitset(set())
+    assert not bitsets.hard.evaluate(bits)[bitsets.owner_pos["BAD 1000"]]
+
+
+def test_equivalencies_fold_into_the_bitset():
+    prereq_map = {"FINA 3001": parse_prereqs("ECON 1103"), "FINA 3002": parse_prereqs("ECON 1103H")}
+    rows = [{"course_code": code} for code in prereq_map]
+    bitsets = PrereqBitsets(rows, prereq_map)
+    equiv_map = {"ECON 1103H": {"ECON 1103"}}
+
+    _assert_matches_reference(bitsets, rows, prereq_map, {"ECON 1103H"}, equiv_map)
+    hard = bitsets.hard.evaluate(bitsets.bitset({"ECON 1103H"}, equiv_map))
+    assert hard[bitsets.owner_pos["FINA 3001"]]
+
+
+def test_ancestors_follow_hard_concurrent_and_equivalent_edges():
+    prereq_map = {
+        "FINA 4001": parse_prereqs("FINA 3001"),
+        "FINA 3001": parse_prereqs("ECON 1103 or ECON 1104"),
+        "ECON 1103": parse_prereqs("FINA 4001"),
+        "ACCO 4050": parse_prereqs("none"),
+    }
+    rows = [{"course_code": code} for code in prereq_map]
+    rows[3]["parsed_concurrent"] = parse_prereqs("ACCO 1031")
+    bitsets = PrereqBitsets(rows, prereq_map)
+
+    assert bitsets.ancestors({"FINA 4001"}) == {"FINA 4001", "FINA 3001", "ECON 1103", "ECON 1104"}
+    assert bitsets.ancestors({"ACCO 4050"}) == {"ACCO 4050", "ACCO 1031"}
+    assert bitsets.ancestors({"ACCO 4050"}, {"ACCO 1031": {"ACCO 1031H"}}) == {"ACCO 4050", "ACCO 1031", "ACCO 1031H"}
+
+
+def test_catalog_matches_prereqs_satisfied_for_random_students(data):
+    rows = data["runtime_indexes"]["courses"]["rows"]
+    prereq_map = data["prereq_map"]
+    equiv_map = data["equiv_prereq_map"]
+    bitsets = data["runtime_indexes"]["prereq_bitsets"]
+    assert bitsets.prereq_map is prereq_map
+    assert len(bitsets) == len(rows)
+
+    codes = sorted(bitsets.code_ids)
+    rng = random.Random(20260417)
+    for size in (0, 5, 25, 80, 400):
+        satisfied = set(rng.sample(codes, size))
+        _assert_matches_reference(bitsets, rows, prereq_map, satisfied, equiv_map)
+
+
+def test_forced_rebuild_reuses_course_index_and_bitsets(data):
+    original = data["runtime_indexes"]
+    merged = ensure_runtime_indexes(dict(data), force=True)
+    assert merged["runtime_indexes"]["courses"] is original["courses"]
+    assert merged["runtime_indexes"]["prereq_bitsets"] is original["prereq_bitsets"]
+
+    assert get_runtime_prereq_cache(merged["runtime_indexes"]) is data["prereq_cache"]
+
+    remapped = ensure_runtime_indexes(dict(data, prereq_map=dict(data["prereq_map"])), force=True)
+    assert remapped["runtime_indexes"]["courses"] is original["courses"]
+    assert remapped["runtime_indexes"]["prereq_bitsets"] is not original["prereq_bitsets"]
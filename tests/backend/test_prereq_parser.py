@@ -1,5 +1,7 @@
+import pickle
+
 import pytest
-from prereq_parser import parse_prereqs, prereqs_satisfied, build_prereq_check_string
+from prereq_parser import PrereqCache, compile_prereqs, parse_prereqs, prereqs_satisfied, build_prereq_check_string
 
 
 class TestParsePrereqs:
@@ -178,3 +180,43 @@ class TestBuildPrereqCheckString:
         result = build_prereq_check_string(parsed, {"INSY 4051"}, {"INSY 4052"})
         assert "2/2 required" in result
         assert "INSY 4052 (in progress)" in result
+
+
+class TestPrereqCache:
+    def test_parses_each_distinct_string_once(self):
+        cache = PrereqCache()
+        first = cache.compile("ECON 1103; BUAD 1560")
+        second = cache.compile("  ECON 1103; BUAD 1560 ")
+
+        assert first is second
+        assert first == parse_prereqs("ECON 1103; BUAD 1560")
+        assert cache.stats() == {"distinct": 1, "lookups": 2, "hits": 1, "misses": 1, "hit_rate": 0.5}
+
+    def test_none_spellings_share_one_entry(self):
+        cache = PrereqCache()
+        results = [cache.compile(raw) for raw in ("none", "None listed", "", None, float("nan"), "n/a")]
+
+        assert all(result is results[0] for result in results)
+        assert results[0] == {"type": "none"}
+        assert len(cache) == 1
+
+    def test_survives_pickle(self):
+        cache = PrereqCache()
+        cache.compile("FINA 3001")
+        restored = pickle.loads(pickle.dumps(cache))
+
+        assert restored.compile("FINA 3001") == {"type": "single", "course": "FINA 3001"}
+        assert restored.stats()["hits"] == 1
+
+    def test_compile_without_a_cache_keeps_no_process_state(self):
+        import prereq_parser
+
+        assert compile_prereqs(" None listed ") == {"type": "none"}
+        assert compile_prereqs("FINA 3001") is not compile_prereqs("FINA 3001")
+        assert not any(isinstance(value, PrereqCache) for value in vars(prereq_parser).values())
+
+    def test_compile_with_a_cache_counts_lookups(self):
+        cache = PrereqCache()
+        compile_prereqs("FINA 3001", cache)
+        compile_prereqs("FINA 3001", cache)
+        assert cache.stats()["hits"] == 1
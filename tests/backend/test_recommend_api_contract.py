@@ -395,3 +395,201 @@ def test_target_semester_count_controls_number_of_returned_semesters(client, sem
     assert response.status_code == 200
     data = response.get_json()
     assert len(data["semesters"]) == semester_count
+
+
+@pytest.fixture
+def live_cache_snapshot(monkeypatch):
+    """Fresh response caches with caching (and rate limiting) switched on."""
+    snapshot = server._new_runtime_snapshot(
+        server._snapshot.data,
+        server._snapshot.reverse_map,
+        server._snapshot.chain_depths,
+        server._snapshot.data_version,
+        server._snapshot.unlock_index,
+    )
+    monkeypatch.setattr(server, "_snapshot", snapshot)
+    monkeypatch.setitem(server.app.config, "TESTING", False)
+    with server._rate_limit_lock:
+        server._rate_limit_tracker["10.42.0.22"] = []
+    return snapshot
+
+
+def test_equivalent_bodies_share_one_canonical_cache_entry(live_cache_snapshot):
+    snapshot = live_cache_snapshot
+    environ = {"REMOTE_ADDR": "10.42.0.22"}
+
+    canonical_body = _payload(
+        completed_courses="ECON 1103, ACCO 1030",
+        in_progress_courses="BUAD 1560",
+        target_semester_count=1,
+    )
+    legacy_body = {
+        "declared_majors": ["FIN_MAJOR"],
+        "completed_courses": ["acco1030", "econ 1103", "ECON 1103"],
+        "in_progress_courses": ["buad 1560"],
+        "target_semester": "Fall 2026",
+        "target_semester_count": 1,
+        "max_recommendations": 4,
+        "include_summer": False,
+    }
+    with server.app.test_client() as c:
+        first = c.post("/recommend", json=canonical_body, environ_base=environ)
+        second = c.post("/recommend", json=legacy_body, environ_base=environ)
+        repeat = c.post("/recommend", json=legacy_body, environ_base=environ)
+
+    assert first.status_code == second.status_code == repeat.status_code == 200
+    assert second.get_json() == first.get_json() == repeat.get_json()
+    assert first.get_json()["input_completed_courses"] == ["ACCO 1030", "ECON 1103"]
+    assert snapshot.recommend_cache.stats()["local_hits"] == 2
+    assert snapshot.recommend_key_index.stats() == {
+        "raw_bodies": 2,
+        "canonical_keys": 1,
+        "collapsed_bodies": 1,
+        "max_bodies_per_key": 2,
+    }
+
+
+def test_reordered_unknown_codes_share_one_canonical_key(live_cache_snapshot):
+    environ = {"REMOTE_ADDR": "10.42.0.22"}
+    first_body = _payload(completed_courses="FINA 9998, ECON 1103, FINA 9999", target_semester_count=1)
+    second_body = _payload(completed_courses="FINA 9999, ECON 1103, fina 9998, FINA 9998", target_semester_count=1)
+    with server.app.test_client() as c:
+        first = c.post("/recommend", json=first_body, environ_base=environ)
+        second = c.post("/recommend", json=second_body, environ_base=environ)
+
+    assert first.status_code == second.status_code == 200
+    assert second.get_json() == first.get_json()
+    assert first.get_json()["not_in_catalog_warning"] == ["FINA 9998", "FINA 9999"]
+    assert live_cache_snapshot.recommend_key_index.stats()["canonical_keys"] == 1
+
+
+def test_cache_hits_serve_precompressed_bytes(live_cache_snapshot):
+    import gzip
+
+    environ = {"REMOTE_ADDR": "10.42.0.22"}
+    body = _payload(completed_courses="ECON 1103", target_semester_count=1)
+    with server.app.test_client() as c:
+        first = c.post("/recommend", json=body, environ_base=environ, headers={"Accept-Encoding": "gzip"})
+        hit = c.post("/recommend", json=body, environ_base=environ, headers={"Accept-Encoding": "gzip"})
+        plain = c.post("/recommend", json=body, environ_base=environ, headers={"Accept-Encoding": "identity"})
+
+    assert first.headers["Content-Encoding"] == hit.headers["Content-Encoding"] == "gzip"
+    assert "Content-Encoding" not in plain.headers
+    assert "Accept-Encoding" in hit.headers["Vary"]
+    assert hit.get_data() == first.get_data()
+    assert gzip.decompress(hit.get_data()) == plain.get_data()
+
+    local = live_cache_snapshot.recommend_cache.local
+    stats = local.stats()
+    assert stats["entries"] == 1
+    assert stats["bytes"] == server._encode_json_response(plain.get_json()).nbytes
+
+
+def _post_concurrently(body, environ, count):
+    import threading
+
+    responses = [None] * count
+
+    def _send(slot):
+        with server.app.test_client() as c:
+            responses[slot] = c.post("/recommend", json=body, environ_base=environ)
+
+    threads = [threading.Thread(target=_send, args=(slot,)) for slot in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, responses
+
+
+def _wait_for(predicate, timeout=10.0):
+    import time
+
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out waiting for concurrent requests"
+        time.sleep(0.01)
+
+
+def test_identical_in_flight_requests_share_one_pipeline_run(live_cache_snapshot, monkeypatch):
+    import threading
+
+    flight = server._SingleFlight()
+    monkeypatch.setattr(server, "_recommend_single_flight", flight)
+    release = threading.Event()
+    calls = []
+    real_build = server._build_recommend_payload
+
+    def _slow_build(*args, **kwargs):
+        calls.append(1)
+        release.wait(10)
+        return real_build(*args, **kwargs)
+
+    monkeypatch.setattr(server, "_build_recommend_payload", _slow_build)
+    body = _payload(completed_courses="ECON 1103, BUAD 1560", target_semester_count=1)
+    threads, responses = _post_concurrently(body, {"REMOTE_ADDR": "10.42.0.22"}, 3)
+    _wait_for(lambda: flight.stats()["coalesced"] == 2)
+    release.set()
+    for thread in threads:
+        thread.join(10)
+
+    assert len(calls) == 1
+    assert [r.status_code for r in responses] == [200, 200, 200]
+    assert responses[0].get_json() == responses[1].get_json() == responses[2].get_json()
+    assert flight.stats() == {"runs": 1, "coalesced": 2, "wait_timeouts": 0, "in_flight": 0}
+
+
+def test_failed_in_flight_run_reaches_every_waiter_and_is_not_cached(live_cache_snapshot, monkeypatch):
+    import threading
+
+    flight = server._SingleFlight()
+    monkeypatch.setattr(server, "_recommend_single_flight", flight)
+    release = threading.Event()
+    real_build = server._build_recommend_payload
+    failures = []
+
+    def _failing_build(*args, **kwargs):
+        if not failures:
+            failures.append(1)
+            release.wait(10)
+            raise RuntimeError("pipeline failed")
+        return real_build(*args, **kwargs)
+
+    monkeypatch.setattr(server, "_build_recommend_payload", _failing_build)
+    body = _payload(completed_courses="ECON 1103, MATH 1400", target_semester_count=1)
+    environ = {"REMOTE_ADDR": "10.42.0.22"}
+    threads, responses = _post_concurrently(body, environ, 2)
+    _wait_for(lambda: flight.stats()["coalesced"] == 1)
+    release.set()
+    for thread in threads:
+        thread.join(10)
+
+    assert [r.status_code for r in responses] == [500, 500]
+    with server.app.test_client() as c:
+        retry = c.post("/recommend", json=body, environ_base=environ)
+    assert retry.status_code == 200
+    assert retry.get_json()["mode"] == "recommendations"
+    assert flight.stats()["runs"] == 2
+
+
+def test_waiter_gives_up_on_a_stuck_run(live_cache_snapshot, monkeypatch):
+    import threading
+
+    flight = server._SingleFlight(wait_timeout=0.05)
+    monkeypatch.setattr(server, "_recommend_single_flight", flight)
+    release = threading.Event()
+    real_build = server._build_recommend_payload
+
+    def _stuck_build(*args, **kwargs):
+        release.wait(10)
+        return real_build(*args, **kwargs)
+
+    monkeypatch.setattr(server, "_build_recommend_payload", _stuck_build)
+    body = _payload(completed_courses="ECON 1103, ACCO 1030", target_semester_count=1)
+    threads, responses = _post_concurrently(body, {"REMOTE_ADDR": "10.42.0.22"}, 2)
+    _wait_for(lambda: flight.stats()["wait_timeouts"] == 1)
+    release.set()
+    for thread in threads:
+        thread.join(10)
+
+    assert sorted(r.status_code for r in responses) == [200, 503]
+    busy = next(r for r in responses if r.status_code == 503)
+    assert busy.get_json()["error"]["error_code"] == "PLAN_BUSY"
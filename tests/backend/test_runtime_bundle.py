@@ -0,0 +1,106 @@
+"""Tests for the precompiled runtime bundle used at server boot."""
+
+import ast
+import os
+
+import data_loader
+import runtime_bundle
+
+
+def _write_sheets(data_dir, courses_body: str) -> None:
+    os.makedirs(data_dir, exist_ok=True)
+    with open(os.path.join(data_dir, "courses.csv"), "w", encoding="utf-8") as f:
+        f.write(courses_body)
+    with open(os.path.join(data_dir, "notes.txt"), "w", encoding="utf-8") as f:
+        f.write("not a sheet")
+
+
+def _fake_load_data(calls: list):
+    def _load(path):
+        calls.append(path)
+        return {"catalog_codes": {"FINA 3001"}, "prereq_map": {"FINA 3001": {"type": "none"}}}
+    return _load
+
+
+def test_bundle_round_trips_when_sources_unchanged(tmp_path, monkeypatch):
+    data_dir = tmp_path / "data"
+    bundle_path = str(tmp_path / "build" / "runtime_bundle.pkl")
+    _write_sheets(str(data_dir), "course_code\nFINA 3001\n")
+    calls = []
+    monkeypatch.setattr(data_loader, "load_data", _fake_load_data(calls))
+
+    compiled = runtime_bundle.compile_runtime_bundle(str(data_dir), bundle_path)
+    loaded = runtime_bundle.load_runtime_bundle(str(data_dir), bundle_path)
+
+    assert calls == [str(data_dir)]
+    assert loaded == compiled
+
+
+def test_bundle_is_rejected_after_sheet_content_changes(tmp_path, monkeypatch):
+    data_dir = tmp_path / "data"
+    bundle_path = str(tmp_path / "runtime_bundle.pkl")
+    _write_sheets(str(data_dir), "course_code\nFINA 3001\n")
+    monkeypatch.setattr(data_loader, "load_data", _fake_load_data([]))
+    runtime_bundle.compile_runtime_bundle(str(data_dir), bundle_path)
+
+    _write_sheets(str(data_dir), "course_code\nFINA 3001\nFINA 4001\n")
+
+    assert runtime_bundle.load_runtime_bundle(str(data_dir), bundle_path) is None
+
+
+def test_non_sheet_files_do_not_affect_digest(tmp_path):
+    data_dir = tmp_path / "data"
+    _write_sheets(str(data_dir), "course_code\nFINA 3001\n")
+    before = runtime_bundle.compute_source_digest(str(data_dir))
+
+    with open(os.path.join(data_dir, "notes.txt"), "w", encoding="utf-8") as f:
+        f.write("edited")
+
+    assert runtime_bundle.compute_source_digest(str(data_dir)) == before
+
+
+def test_missing_or_unconfigured_bundle_returns_none(tmp_path, monkeypatch):
+    data_dir = tmp_path / "data"
+    _write_sheets(str(data_dir), "course_code\nFINA 3001\n")
+    monkeypatch.delenv(runtime_bundle.BUNDLE_PATH_ENV, raising=False)
+
+    assert runtime_bundle.load_runtime_bundle(str(data_dir)) is None
+    assert runtime_bundle.load_runtime_bundle(str(data_dir), str(tmp_path / "missing.pkl")) is None
+
+
+def test_corrupt_bundle_falls_back(tmp_path):
+    data_dir = tmp_path / "data"
+    bundle_path = tmp_path / "runtime_bundle.pkl"
+    _write_sheets(str(data_dir), "course_code\nFINA 3001\n")
+    bundle_path.write_bytes(b"not a pickle")
+
+    assert runtime_bundle.load_runtime_bundle(str(data_dir), str(bundle_path)) is None
+
+
+def _sibling_imports(module_path: str, siblings: set[str]) -> set[str]:
+    with open(module_path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    found = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [alias.name.split(".")[0] for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names = [node.module.split(".")[0]]
+        else:
+            continue
+        found.update(name for name in names if name in siblings)
+    return found
+
+
+def test_loader_module_list_covers_every_module_the_loader_imports():
+    backend_dir = runtime_bundle._BACKEND_DIR
+    siblings = {name[:-3] for name in os.listdir(backend_dir) if name.endswith(".py")}
+    reached, pending = set(), ["data_loader"]
+    while pending:
+        module = pending.pop()
+        if module in reached:
+            continue
+        reached.add(module)
+        pending.extend(_sibling_imports(os.path.join(backend_dir, f"{module}.py"), siblings))
+
+    assert {f"{module}.py" for module in reached} <= set(runtime_bundle._LOADER_MODULES)
@@ -4398,3 +4398,39 @@ def test_all_styles_respect_max_recs():
     for style_name in ["grinder", "explorer", "mixer"]:
         codes = _get_codes(_recommend_with_style(data, style_name, max_recs=4))
         assert len(codes) <= 4, f"{style_name} exceeded max_recs=4: {codes}"
+
+
+def test_track_scoring_context_is_built_once_per_runtime_index():
+    data = _mk_data(
+        [
+            {"course_code": "FINA 3001", "course_name": "Finance", "credits": 3, "level": 3000},
+            {"course_code": "ENGL 3250", "course_name": "Writing", "credits": 3, "level": 3000},
+        ],
+        [
+            {"track_id": "FIN_MAJOR", "bucket_id": "FIN_MAJOR::CORE", "course_code": "FINA 3001"},
+            {"track_id": "FIN_MAJOR", "bucket_id": "MCC::MCC_WRIT", "course_code": "ENGL 3250"},
+        ],
+        [
+            {"track_id": "FIN_MAJOR", "bucket_id": "FIN_MAJOR::CORE", "bucket_label": "Core", "priority": 1,
+             "needed_count": 1, "parent_bucket_id": "FIN_MAJOR", "role": "core", "bucket_flags": ""},
+            {"track_id": "FIN_MAJOR", "bucket_id": "MCC::MCC_WRIT", "bucket_label": "Writing", "priority": 2,
+             "needed_count": 1, "parent_bucket_id": "MCC", "role": "core", "bucket_flags": "writ_bucket"},
+        ],
+    )
+    data["cross_listed_map"] = {"FINA 3001": {"BUAD 3001"}}
+    data["parent_buckets_df"] = pd.DataFrame([
+        {"parent_bucket_id": "FIN_MAJOR", "type": "major"},
+        {"parent_bucket_id": "MCC", "type": "universal"},
+    ])
+    data = ensure_runtime_indexes(data, force=True)
+
+    context = semester_recommender._track_scoring_context(data, "fin_major")
+
+    assert semester_recommender._track_scoring_context(data, "FIN_MAJOR") is context
+    assert context["writ_course_codes"] == {"ENGL 3250"}
+    assert context["declared_dept_set"] == {"FINA"}
+    assert context["course_conflict_map"] == {"FINA 3001": {"BUAD 3001"}, "BUAD 3001": {"FINA 3001"}}
+    assert context["bucket_parent_map"] == semester_recommender._build_bucket_parent_map(data, "FIN_MAJOR")
+
+    data = ensure_runtime_indexes(data, force=True)
+    assert semester_recommender._track_scoring_context(data, "FIN_MAJOR") is not context
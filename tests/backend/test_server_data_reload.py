@@ -8,59 +8,269 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "backend"
 import server
 
 
-def test_reload_skips_when_mtime_unchanged(monkeypatch):
-    monkeypatch.setattr(server, "_data_mtime", 100.0, raising=False)
-    monkeypatch.setattr(server, "_data_file_mtime", lambda _path: 100.0)
+_OLD_SIGNATURE = (("courses.csv", 100, 10),)
+_NEW_SIGNATURE = (("courses.csv", 200, 12),)
+
+
+def _install_snapshot(monkeypatch, data=None, reverse_map=None, chain_depths=None, version="v-old"):
+    snapshot = server._new_runtime_snapshot(
+        data if data is not None else {"catalog_codes": ["OLD 1000"], "prereq_map": {}},
+        reverse_map if reverse_map is not None else {},
+        chain_depths if chain_depths is not None else {},
+        version,
+    )
+    # Register the live globals so monkeypatch restores them, then publish.
+    for name in ("_snapshot", "_data", "_reverse_map", "_chain_depths", "_data_version"):
+        monkeypatch.setattr(server, name, getattr(server, name))
+    server._publish_snapshot(snapshot)
+    return snapshot
+
+
+def test_reload_skips_when_file_stats_unchanged(monkeypatch):
+    monkeypatch.setattr(server, "_data_file_signature", _OLD_SIGNATURE, raising=False)
+    monkeypatch.setattr(server, "_data_file_stat_signature", lambda _path: _OLD_SIGNATURE)
 
     called = {"count": 0}
 
-    def fake_load_data(_path):
+    def fake_reload_data(_path, _previous):
         called["count"] += 1
         return {}
 
-    monkeypatch.setattr(server, "load_data", fake_load_data)
+    def fail_hash(_path):
+        raise AssertionError("unchanged stats must not re-hash sheet content")
+
+    monkeypatch.setattr(server, "reload_data", fake_reload_data)
+    monkeypatch.setattr(server, "_data_content_version", fail_hash)
 
     changed = server._reload_data_if_changed()
     assert changed is False
     assert called["count"] == 0
 
 
-def test_reload_swaps_runtime_data_when_mtime_advances(monkeypatch):
+def test_reload_skips_when_touched_without_content_change(monkeypatch):
+    snapshot = _install_snapshot(monkeypatch)
+    monkeypatch.setattr(server, "_data_file_signature", _OLD_SIGNATURE, raising=False)
+    monkeypatch.setattr(server, "_data_file_stat_signature", lambda _path: _NEW_SIGNATURE)
+    monkeypatch.setattr(server, "_data_content_version", lambda _path: "v-old")
+    monkeypatch.setattr(server, "reload_data", lambda _path, _prev: pytest.fail("touch must not reload"))
+
+    changed = server._reload_data_if_changed()
+    assert changed is False
+    assert server._snapshot is snapshot
+    assert server._data_file_signature == _NEW_SIGNATURE
+
+
+def test_reload_swaps_runtime_data_when_content_changes(monkeypatch):
     old_data = {"catalog_codes": ["OLD 1000"], "courses_df": "old_courses", "prereq_map": {"OLD": []}}
-    new_data = {"catalog_codes": ["NEW 2000"], "courses_df": "new_courses", "prereq_map": {"NEW": []}}
+    new_data = {
+        "catalog_codes": ["NEW 2000"],
+        "courses_df": "new_courses",
+        "prereq_map": {"NEW": []},
+        "data_version": "v-new",
+    }
 
-    monkeypatch.setattr(server, "_data", old_data, raising=False)
-    monkeypatch.setattr(server, "_reverse_map", {"old": True}, raising=False)
-    monkeypatch.setattr(server, "_data_mtime", 100.0, raising=False)
-    monkeypatch.setattr(server, "_data_file_mtime", lambda _path: 200.0)
-    monkeypatch.setattr(server, "load_data", lambda _path: new_data)
+    old_snapshot = _install_snapshot(monkeypatch, old_data, {"old": True})
+    monkeypatch.setattr(server, "_data_file_signature", _OLD_SIGNATURE, raising=False)
+    monkeypatch.setattr(server, "_data_file_stat_signature", lambda _path: _NEW_SIGNATURE)
+    monkeypatch.setattr(server, "_data_content_version", lambda _path: "v-new")
+    monkeypatch.setattr(server, "reload_data", lambda _path, _prev: new_data)
     monkeypatch.setattr(server, "build_reverse_prereq_map", lambda _df, _map: {"new": True})
     monkeypatch.setattr(server, "compute_chain_depths", lambda _rm: {"new_chain": 1})
 
     changed = server._reload_data_if_changed()
     assert changed is True
+    assert server._snapshot is not old_snapshot
+    assert server._snapshot.data is new_data
+    assert server._snapshot.reverse_map == {"new": True}
+    assert server._snapshot.recommend_cache is not old_snapshot.recommend_cache
     assert server._data is new_data
     assert server._reverse_map == {"new": True}
     assert server._chain_depths == {"new_chain": 1}
-    assert server._data_mtime == 200.0
+    assert server._data_version == "v-new"
+    assert server._data_version_tag() == "v-new"
+    assert server._data_file_signature == _NEW_SIGNATURE
 
 
 def test_reload_failure_keeps_previous_data(monkeypatch):
     old_data = {"catalog_codes": ["OLD 1000"], "courses_df": "old_courses", "prereq_map": {"OLD": []}}
     old_reverse_map = {"old": True}
 
-    monkeypatch.setattr(server, "_data", old_data, raising=False)
-    monkeypatch.setattr(server, "_reverse_map", old_reverse_map, raising=False)
-    monkeypatch.setattr(server, "_data_mtime", 100.0, raising=False)
-    monkeypatch.setattr(server, "_data_file_mtime", lambda _path: 200.0)
+    old_snapshot = _install_snapshot(monkeypatch, old_data, old_reverse_map)
+    monkeypatch.setattr(server, "_data_file_signature", _OLD_SIGNATURE, raising=False)
+    monkeypatch.setattr(server, "_data_file_stat_signature", lambda _path: _NEW_SIGNATURE)
+    monkeypatch.setattr(server, "_data_content_version", lambda _path: "v-new")
 
-    def boom(_path):
+    def boom(_path, _previous):
         raise RuntimeError("reload failed")
 
-    monkeypatch.setattr(server, "load_data", boom)
+    monkeypatch.setattr(server, "reload_data", boom)
 
     changed = server._reload_data_if_changed()
     assert changed is False
+    assert server._snapshot is old_snapshot
     assert server._data is old_data
     assert server._reverse_map is old_reverse_map
-    assert server._data_mtime == 100.0
+    assert server._data_version == "v-old"
+    assert server._data_file_signature == _OLD_SIGNATURE
+
+
+def test_reload_reuses_prereq_graph_when_catalog_stage_is_unchanged(monkeypatch):
+    catalog_codes = {"FINA 3001"}
+    prereq_map = {"FINA 3001": {"type": "none"}}
+    old_data = {"catalog_codes": catalog_codes, "courses_df": "old_courses", "prereq_map": prereq_map}
+    new_data = dict(old_data, courses_df="offerings_refreshed", data_version="v-new")
+    old_reverse_map = {"kept": True}
+
+    old_snapshot = _install_snapshot(monkeypatch, old_data, old_reverse_map, {"kept": 1})
+    monkeypatch.setattr(server, "_data_file_signature", _OLD_SIGNATURE, raising=False)
+    monkeypatch.setattr(server, "_data_file_stat_signature", lambda _path: _NEW_SIGNATURE)
+    monkeypatch.setattr(server, "_data_content_version", lambda _path: "v-new")
+    monkeypatch.setattr(server, "reload_data", lambda _path, _prev: new_data)
+    monkeypatch.setattr(
+        server,
+        "build_reverse_prereq_map",
+        lambda _df, _map: pytest.fail("reverse map must be reused"),
+    )
+
+    assert server._reload_data_if_changed() is True
+    assert server._data is new_data
+    assert server._reverse_map is old_reverse_map
+    assert server._chain_depths == {"kept": 1}
+    assert server._snapshot.unlock_index is old_snapshot.unlock_index
+
+
+def test_data_version_is_content_addressed(tmp_path):
+    from data_loader import compute_data_version, compute_sheet_digests
+
+    first = tmp_path / "a"
+    second = tmp_path / "b"
+    for root in (first, second):
+        root.mkdir()
+        (root / "courses.csv").write_text("course_code\nFINA 3001\n", encoding="utf-8")
+    (second / "courses.csv").touch()
+
+    first_digests = compute_sheet_digests(str(first))
+    assert list(first_digests) == ["courses"]
+    assert compute_data_version(first_digests) == compute_data_version(compute_sheet_digests(str(second)))
+
+    (second / "quips.csv").write_text("quip_id\nq1\n", encoding="utf-8")
+    assert compute_data_version(first_digests) == compute_data_version(compute_sheet_digests(str(second)))
+
+    (second / "courses.csv").write_text("course_code\nFINA 4001\n", encoding="utf-8")
+    assert compute_data_version(first_digests) != compute_data_version(compute_sheet_digests(str(second)))
+
+
+def test_background_reloader_is_not_started_when_master_owns_reloads(monkeypatch):
+    monkeypatch.setattr(server, "_worker_reload_enabled", False, raising=False)
+    monkeypatch.setattr(server, "_reloader_thread", None, raising=False)
+    monkeypatch.setattr(server, "_reloader_pid", None, raising=False)
+
+    snapshot = server._request_snapshot()
+
+    assert snapshot is server._snapshot
+    assert server._reloader_thread is None
+
+
+def test_background_reloader_publishes_new_snapshot_off_request_path(monkeypatch):
+    import threading
+
+    old_snapshot = _install_snapshot(monkeypatch)
+    reloaded = threading.Event()
+
+    def fake_reload(force=False):
+        server._publish_snapshot(server._new_runtime_snapshot({"catalog_codes": ["NEW 2000"]}, {}, {}, "v-new"))
+        reloaded.set()
+        return True
+
+    monkeypatch.setattr(server, "_reload_data_if_changed", fake_reload)
+    monkeypatch.setattr(server, "_worker_reload_enabled", True, raising=False)
+    monkeypatch.setattr(server, "_DATA_RELOAD_INTERVAL_SECONDS", 0.01)
+    monkeypatch.setattr(server, "_reloader_thread", None, raising=False)
+    monkeypatch.setattr(server, "_reloader_pid", None, raising=False)
+    monkeypatch.setitem(server.app.config, "TESTING", False)
+
+    # A request that grabbed the snapshot before the swap keeps seeing it.
+    in_flight = server._request_snapshot()
+    try:
+        assert reloaded.wait(5.0)
+        assert server._reloader_thread.name == "marqbot-data-reloader"
+    finally:
+        server._stop_background_reloader(timeout=5.0)
+
+    assert in_flight is old_snapshot
+    assert in_flight.data_version == "v-old"
+    assert server._snapshot.data_version == "v-new"
+    assert server._data_version_tag() == "v-new"
+    assert server._data_version_tag(in_flight) == "v-old"
+
+
+def test_program_data_cache_keys_follow_the_sliced_dataset():
+    payload = {"major_id": "FIN_MAJOR"}
+
+    old_key = server._program_data_cache_key("single-major-v2", payload, {"data_version": "v-old"})
+    new_key = server._program_data_cache_key("single-major-v2", payload, {"data_version": "v-new"})
+
+    assert old_key != new_key
+
+
+def _load_gunicorn_conf():
+    import importlib.util
+
+    conf_path = os.path.join(os.path.dirname(__file__), "..", "..", "backend", "gunicorn.conf.py")
+    spec = importlib.util.spec_from_file_location("marqbot_gunicorn_conf", conf_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class _FakeLog:
+    def info(self, *_args):
+        pass
+
+
+class _FakeArbiter:
+    log = _FakeLog()
+
+
+def test_gunicorn_preload_hooks_hand_reloads_to_master(monkeypatch):
+    import gc
+
+    monkeypatch.setenv("GUNICORN_PRELOAD", "1")
+    conf = _load_gunicorn_conf()
+    monkeypatch.setattr(server, "_worker_reload_enabled", True, raising=False)
+    calls = {"reload": 0}
+
+    def fake_reload(force=False):
+        calls["reload"] += 1
+        return False
+
+    monkeypatch.setattr(server, "_reload_data_if_changed", fake_reload)
+    try:
+        conf.when_ready(_FakeArbiter())
+        assert server._worker_reload_enabled is False
+        assert gc.get_freeze_count() > 0
+
+        conf.on_reload(_FakeArbiter())
+        assert calls["reload"] == 1
+    finally:
+        gc.unfreeze()
+
+
+def test_gunicorn_preload_can_be_disabled(monkeypatch):
+    monkeypatch.setenv("GUNICORN_PRELOAD", "0")
+    conf = _load_gunicorn_conf()
+    monkeypatch.setattr(server, "_worker_reload_enabled", True, raising=False)
+
+    conf.when_ready(_FakeArbiter())
+
+    assert conf.preload_app is False
+    assert server._worker_reload_enabled is True
+
+
+def test_gunicorn_workers_are_threaded_so_duplicates_can_coalesce(monkeypatch):
+    monkeypatch.delenv("GUNICORN_WORKER_CLASS", raising=False)
+    monkeypatch.setenv("GUNICORN_THREADS", "6")
+    conf = _load_gunicorn_conf()
+
+    assert conf.worker_class == "gthread"
+    assert conf.threads == 6
@@ -32,6 +32,32 @@ class TestHealthEndpoint:
         assert "frontend_ready" in data
         assert isinstance(data["frontend_ready"], bool)
 
+    def test_health_reports_content_data_version(self, client):
+        data = client.get("/health").get_json()
+        assert data["data_version"] == server._data["data_version"]
+        assert len(data["data_version"]) == 16
+
+    def test_health_summarizes_data_load_profile(self, client):
+        data_load = client.get("/health").get_json()["data_load"]
+        assert data_load["mode"] in {"full", "incremental"}
+        assert data_load["total_ms"] > 0
+        assert 0 < len(data_load["slowest_stages"]) <= 3
+        assert {"stage", "wall_ms", "rows_out"} <= set(data_load["slowest_stages"][0])
+        assert data_load["prereq_cache"]["distinct"] > 0
+
+    def test_health_reports_allocation_memo_stats(self, client):
+        memo = client.get("/health").get_json()["allocation_memo"]
+        assert {"entries", "bytes", "hits", "misses", "evictions", "hit_rate"} <= set(memo)
+
+    def test_health_reports_response_cache_tiers(self, client):
+        caches = client.get("/health").get_json()["response_cache"]
+        assert {"recommend", "can_take", "shared"} <= set(caches)
+        assert {"local_hits", "shared_hits", "misses", "hit_rate"} <= set(caches["recommend"])
+
+    def test_health_reports_single_flight_counters(self, client):
+        flight = client.get("/health").get_json()["recommend_single_flight"]
+        assert {"runs", "coalesced", "wait_timeouts", "in_flight"} <= set(flight)
+
 
 class TestSecurityHeaders:
     def test_security_headers_on_health(self, client):
@@ -0,0 +1,347 @@
+import socketserver
+import threading
+import time
+
+import pytest
+
+import shared_cache
+from shared_cache import RespSharedCache, SqliteSharedCache, build_shared_cache
+
+
+class _RespStandIn(socketserver.ThreadingTCPServer):
+    """Minimal Redis-protocol server: GET, SET [PX ms], SCAN MATCH prefix*, DEL, AUTH, SELECT."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _RespHandler)
+        self.store: dict[bytes, tuple[bytes, float]] = {}
+        self.commands: list[bytes] = []
+
+
+class _RespHandler(socketserver.StreamRequestHandler):
+    def _read_command(self):
+        header = self.rfile.readline()
+        if not header:
+            return None
+        parts = []
+        for _ in range(int(header[1:-2])):
+            length = int(self.rfile.readline()[1:-2])
+            parts.append(self.rfile.read(length + 2)[:-2])
+        return parts
+
+    def handle(self):
+        server = self.server
+        while True:
+            parts = self._read_command()
+            if parts is None:
+                return
+            name = parts[0].upper()
+            server.commands.append(name)
+            if name == b"GET":
+                value, expires_at = server.store.get(parts[1], (None, 0.0))
+                if value is None or (expires_at and expires_at <= time.time()):
+                    self.wfile.write(b"$-1\r\n")
+                else:
+                    self.wfile.write(b"$%d\r\n%s\r\n" % (len(value), value))
+            elif name == b"SET":
+                expires_at = 0.0
+                if len(parts) == 5 and parts[3].upper() == b"PX":
+                    expires_at = time.time() + int(parts[4]) / 1000.0
+                server.store[parts[1]] = (parts[2], expires_at)
+                self.wfile.write(b"+OK\r\n")
+            elif name == b"SCAN":
+                prefix = parts[3][:-1].replace(b"\\", b"")
+                keys = [key for key in server.store if key.startswith(prefix)]
+                self.wfile.write(b"*2\r\n$1\r\n0\r\n*%d\r\n" % len(keys))
+                for key in keys:
+                    self.wfile.write(b"$%d\r\n%s\r\n" % (len(key), key))
+            elif name == b"DEL":
+                removed = sum(server.store.pop(key, None) is not None for key in parts[1:])
+                self.wfile.write(b":%d\r\n" % removed)
+            elif name in {b"AUTH", b"SELECT"}:
+                self.wfile.write(b"+OK\r\n")
+            else:
+                self.wfile.write(b"-ERR unknown command\r\n")
+
+
+@pytest.fixture
+def resp_server():
+    server = _RespStandIn()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class TestSqliteSharedCache:
+    def test_entries_are_visible_to_other_instances(self, tmp_path):
+        path = str(tmp_path / "cache.db")
+        writer = SqliteSharedCache(path)
+        reader = SqliteSharedCache(path)
+        writer.set("recommend:v1:abc", b'{"mode":"recommendations"}', 60)
+        assert reader.get("recommend:v1:abc") == b'{"mode":"recommendations"}'
+        assert reader.get("recommend:v1:missing") is None
+        assert reader.stats()["hits"] == 1
+        assert reader.stats()["misses"] == 1
+
+    def test_expired_entries_miss(self, tmp_path, monkeypatch):
+        cache = SqliteSharedCache(str(tmp_path / "cache.db"))
+        now = [1_000.0]
+        monkeypatch.setattr(shared_cache.time, "time", lambda: now[0])
+        cache.set("k", b"v", 10)
+        assert cache.get("k") == b"v"
+        now[0] += 10
+        assert cache.get("k") is None
+
+    def test_byte_budget_drops_oldest_inserts(self, tmp_path, monkeypatch):
+        cache = SqliteSharedCache(str(tmp_path / "cache.db"), max_bytes=250, maintenance_interval=1)
+        now = [1_000.0]
+        monkeypatch.setattr(shared_cache.time, "time", lambda: now[0])
+        for key in ("a", "b", "c"):
+            cache.set(key, b"x" * 100)
+            now[0] += 1
+        assert cache.get("a") is None
+        assert cache.get("b") == b"x" * 100
+        assert cache.get("c") == b"x" * 100
+        assert cache.stats()["bytes"] == 200
+
+    def test_expiry_and_trim_run_every_maintenance_interval(self, tmp_path, monkeypatch):
+        cache = SqliteSharedCache(str(tmp_path / "cache.db"), max_bytes=250, maintenance_interval=4)
+        now = [1_000.0]
+        monkeypatch.setattr(shared_cache.time, "time", lambda: now[0])
+        cache.set("expiring", b"x" * 10, 5)
+        for key in ("a", "b"):
+            now[0] += 1
+            cache.set(key, b"x" * 100)
+        assert cache.stats()["bytes"] == 210
+        now[0] += 10
+        cache.set("c", b"x" * 100)  # fourth set: sweep
+        stats = cache.stats()
+        assert (stats["entries"], stats["bytes"]) == (2, 200)
+        assert cache.get("a") is None
+        assert cache.get("c") == b"x" * 100
+
+    def test_failed_sweep_keeps_the_write(self, tmp_path, monkeypatch):
+        cache = SqliteSharedCache(str(tmp_path / "cache.db"), maintenance_interval=1)
+
+        def _locked(conn, now):
+            raise shared_cache.sqlite3.OperationalError("database is locked")
+
+        monkeypatch.setattr(cache, "_maintain", _locked)
+        cache.set("k", b"v", 60)
+        assert cache.get("k") == b"v"
+        assert (cache.stats()["sets"], cache.stats()["errors"]) == (1, 1)
+
+    def test_unusable_path_counts_errors_instead_of_raising(self, tmp_path):
+        cache = SqliteSharedCache(str(tmp_path / "missing-dir" / "cache.db"))
+        cache.set("k", b"v", 60)
+        assert cache.get("k") is None
+        assert cache.stats()["errors"] == 2
+
+
+class TestRespSharedCache:
+    def test_round_trip_with_ttl(self, resp_server):
+        cache = RespSharedCache("127.0.0.1", resp_server.server_address[1])
+        cache.set("recommend:v1:abc", b"payload", 30)
+        assert cache.get("recommend:v1:abc") == b"payload"
+        assert cache.get("recommend:v1:other") is None
+        assert b"marqbot:recommend:v1:abc" in resp_server.store
+        assert resp_server.store[b"marqbot:recommend:v1:abc"][1] > time.time()
+
+    def test_clear_deletes_only_prefixed_keys(self, resp_server):
+        resp_server.store[b"other-app:session"] = (b"keep", 0.0)
+        cache = RespSharedCache("127.0.0.1", resp_server.server_address[1])
+        cache.set("recommend:v1:abc", b"payload")
+        cache.set("can_take:v1:def", b"payload")
+        cache.clear()
+        assert list(resp_server.store) == [b"other-app:session"]
+        assert b"FLUSHDB" not in resp_server.commands
+
+    def test_auth_and_select_on_connect(self, resp_server):
+        cache = build_shared_cache(f"redis://:secret@127.0.0.1:{resp_server.server_address[1]}/2")
+        cache.set("k", b"v")
+        assert resp_server.commands[:3] == [b"AUTH", b"SELECT", b"SET"]
+
+    def test_unreachable_server_degrades_to_miss(self, resp_server):
+        port = resp_server.server_address[1]
+        resp_server.shutdown()
+        resp_server.server_close()
+        cache = RespSharedCache("127.0.0.1", port, timeout_seconds=0.05)
+        cache.set("k", b"v", 30)
+        assert cache.get("k") is None
+        assert cache.stats()["errors"] == 2
+
+
+class TestBuildSharedCache:
+    def test_empty_url_disables_tier(self):
+        assert build_shared_cache("") is None
+
+    def test_sqlite_url(self, tmp_path):
+        cache = build_shared_cache(f"sqlite:///{tmp_path}/nested/cache.db", max_bytes=1000)
+        assert isinstance(cache, SqliteSharedCache)
+        assert cache.max_bytes == 1000
+        cache.set("k", b"v")
+        assert cache.get("k") == b"v"
+
+    def test_unknown_scheme_is_rejected(self):
+        with pytest.raises(ValueError):
+            build_shared_cache("memcached://localhost")
+
+
+class TestTieredResponseCache:
+    def test_shared_hit_is_promoted_to_local(self, tmp_path):
+        import server
+
+        shared = SqliteSharedCache(str(tmp_path / "cache.db"))
+        worker_a = server._TieredResponseCache(server._LruResponseCache(4, ttl_seconds=60), shared)
+        worker_b = server._TieredResponseCache(server._LruResponseCache(4, ttl_seconds=60), shared)
+        entry = server._encode_json_response({"mode": "recommendations", "semesters": [{"code": "FINA 3001"}] * 40})
+
+        worker_a.set("recommend:v1:abc", entry)
+        assert worker_b.get("recommend:v1:abc") == entry
+        assert worker_b.get("recommend:v1:abc") == entry
+        assert worker_b.get("recommend:v1:missing") is None
+        stats = worker_b.stats()
+        assert {k: stats[k] for k in ("local_hits", "shared_hits", "misses", "hit_rate")} == {
+            "local_hits": 1,
+            "shared_hits": 1,
+            "misses": 1,
+            "hit_rate": 0.6667,
+        }
+        assert stats["local"]["entries"] == 1
+
+    def test_entries_from_another_build_are_not_read(self, tmp_path):
+        import server
+
+        shared = SqliteSharedCache(str(tmp_path / "cache.db"))
+        old_build = server._TieredResponseCache(server._LruResponseCache(4), shared, key_prefix="build-old:")
+        new_build = server._TieredResponseCache(server._LruResponseCache(4), shared, key_prefix="build-new:")
+        old_build.set("recommend:v1:abc", server._encode_json_response({"mode": "recommendations"}))
+
+        assert new_build.get("recommend:v1:abc") is None
+        assert shared.get("build-old:recommend:v1:abc") is not None
+        assert server._SHARED_CACHE_KEY_PREFIX.startswith("build-")
+
+    def test_promoted_hit_keeps_the_shared_expiry(self, tmp_path, monkeypatch):
+        import server
+
+        now = [1_000.0]
+        monkeypatch.setattr(server.time, "time", lambda: now[0])
+        monkeypatch.setattr(server.time, "monotonic", lambda: now[0])
+        shared = SqliteSharedCache(str(tmp_path / "cache.db"))
+        worker_a = server._TieredResponseCache(server._LruResponseCache(4, ttl_seconds=60), shared)
+        worker_b = server._TieredResponseCache(server._LruResponseCache(4, ttl_seconds=60), shared)
+        entry = server._encode_json_response({"mode": "recommendations"})
+
+        worker_a.set("recommend:v1:abc", entry)
+        now[0] += 50
+        assert worker_b.get("recommend:v1:abc") == entry  # promoted with 10s left
+        now[0] += 10
+        assert worker_b.local.get("recommend:v1:abc") is None
+        assert worker_b.get("recommend:v1:abc") is None
+
+    def test_over_budget_response_skips_shared_tier(self, tmp_path):
+        import server
+
+        shared = SqliteSharedCache(str(tmp_path / "cache.db"))
+        local = server._LruResponseCache(4, max_bytes=16, size_estimator=server._encoded_response_bytes)
+        server._TieredResponseCache(local, shared).set("k", server._encode_json_response({"payload": "x" * 64}))
+        assert shared.get("k") is None
+
+
+class TestLruResponseCache:
+    def test_entries_expire_in_insertion_order(self, monkeypatch):
+        import server
+
+        now = [1_000.0]
+        monkeypatch.setattr(server.time, "monotonic", lambda: now[0])
+        cache = server._LruResponseCache(8, ttl_seconds=10)
+        cache.set("recommend:a", "A")
+        now[0] += 5
+        cache.set("recommend:b", "B")
+        assert cache.get("recommend:a") == "A"  # a hit does not extend the TTL
+        now[0] += 5
+        assert cache.get("recommend:a") is None
+        assert cache.get("recommend:b") == "B"
+        cache.set("recommend:b", "B2")  # re-set restarts the TTL
+        now[0] += 9
+        assert cache.get("recommend:b") == "B2"
+        stats = cache.stats()
+        assert stats["expirations"] == 1
+        assert stats["entries"] == 1
+
+    def test_evictions_are_split_by_count_and_bytes(self):
+        import server
+
+        cache = server._LruResponseCache(2, max_bytes=10, size_estimator=len)
+        cache.set("a", "xxxx")
+        cache.set("b", "xxxx")
+        assert cache.get("a") == "xxxx"
+        cache.set("c", "xx")  # third entry: evicts LRU "b" by count
+        cache.set("d", "xxxxxx")  # count limit hit again before the byte budget: evicts "a"
+        cache.set("e", "x" * 11)  # larger than the whole budget
+        stats = cache.stats()
+        assert stats["evictions_by_count"] == 2
+        assert stats["evictions_by_bytes"] == 0
+        assert stats["rejected_oversize"] == 1
+        assert cache.get("d") == "xxxxxx"
+        assert cache.stats()["bytes"] == 8
+
+    def test_byte_eviction_without_count_pressure(self):
+        import server
+
+        cache = server._LruResponseCache(8, max_bytes=10, size_estimator=len)
+        cache.set("a", "xxxx")
+        cache.set("b", "xxxx")
+        cache.set("c", "xxxx")
+        assert cache.get("a") is None
+        stats = cache.stats()
+        assert stats["evictions_by_bytes"] == 1
+        assert stats["evictions_by_count"] == 0
+        assert stats["bytes"] == 8
+
+    def test_stats_are_reported_per_scope(self):
+        import server
+
+        cache = server._LruResponseCache(4)
+        cache.set("recommend:v1:a", 1)
+        assert cache.get("recommend:v1:a") == 1
+        assert cache.get("replan:v1:a") is None
+        stats = cache.stats()
+        assert stats["hits"] == 1 and stats["misses"] == 1 and stats["hit_rate"] == 0.5
+        assert stats["scopes"] == {
+            "recommend": {"hits": 1, "misses": 0},
+            "replan": {"hits": 0, "misses": 1},
+        }
+
+    def test_set_can_shorten_but_not_extend_the_ttl(self, monkeypatch):
+        import server
+
+        now = [1_000.0]
+        monkeypatch.setattr(server.time, "monotonic", lambda: now[0])
+        cache = server._LruResponseCache(8, ttl_seconds=10)
+        cache.set("long", "L")
+        cache.set("short", "S", ttl_seconds=2)
+        cache.set("capped", "C", ttl_seconds=60)
+        now[0] += 2
+        assert cache.get("short") is None
+        assert cache.get("long") == "L"
+        now[0] += 8
+        assert cache.get("capped") is None
+        assert cache.stats()["expirations"] == 3
+
+    def test_clear_resets_entries_and_counters(self):
+        import server
+
+        cache = server._LruResponseCache(4)
+        cache.set("recommend:v1:a", 1)
+        cache.get("recommend:v1:a")
+        cache.get("recommend:v1:b")
+        cache.clear()
+        stats = cache.stats()
+        assert (stats["entries"], stats["hits"], stats["misses"], stats["scopes"]) == (0, 0, 0, {})
@@ -1,6 +1,14 @@
+import sys
+
 import pytest
 import pandas as pd
-from unlocks import build_reverse_prereq_map, get_direct_unlocks, get_blocking_warnings
+from unlocks import (
+    build_reverse_prereq_map,
+    build_unlock_index,
+    compute_chain_depths,
+    get_blocking_warnings,
+    get_direct_unlocks,
+)
 
 
 @pytest.fixture
@@ -117,3 +125,60 @@ class TestGetBlockingWarnings:
             threshold=2,  # need >= 2
         )
         assert len(warnings) == 0
+
+    def test_unlock_index_gives_same_warnings(self, courses_df, prereq_map):
+        reverse = build_reverse_prereq_map(courses_df, prereq_map)
+        index = build_unlock_index(reverse)
+        kwargs = dict(
+            core_remaining=["FINA 3001", "FINA 4001"],
+            reverse_map=reverse,
+            finance_elective_courses=["FINA 4011", "FINA 4020", "FINA 4081", "ACCO 1030"],
+            completed=["FINA 4020"],
+            in_progress=[],
+            threshold=1,
+        )
+        expected = get_blocking_warnings(**kwargs)
+        assert expected
+        assert get_blocking_warnings(**kwargs, unlock_index=index) == expected
+
+
+class TestComputeChainDepths:
+    def test_linear_chain_depth(self):
+        reverse = {"A": ["B"], "B": ["C"], "C": ["D"]}
+        assert compute_chain_depths(reverse) == {"D": 0, "C": 1, "B": 2, "A": 3}
+
+    def test_deep_chain_does_not_hit_recursion_limit(self):
+        n = sys.getrecursionlimit() * 3
+        reverse = {f"C{i}": [f"C{i + 1}"] for i in range(n)}
+        depths = compute_chain_depths(reverse)
+        assert depths["C0"] == n
+        assert depths[f"C{n}"] == 0
+
+    def test_cycle_is_guarded_like_recursive_walk(self):
+        # A -> B -> A: the back edge counts as depth 0, in DFS visit order.
+        reverse = {"A": ["B"], "B": ["A", "C"], "C": []}
+        assert compute_chain_depths(reverse) == {"C": 0, "B": 1, "A": 2}
+
+
+class TestUnlockIndex:
+    def test_masked_counts(self, courses_df, prereq_map):
+        reverse = build_reverse_prereq_map(courses_df, prereq_map)
+        index = build_unlock_index(reverse)
+        mask = index.mask(["FINA 4081", "FINA 4020", "ACCO 1030"])
+        assert index.unlock_count("FINA 3001", mask) == 2
+        assert index.unlock_count("FINA 4001", mask) == 1
+        assert index.unlock_count("FINA 4081", mask) == 0
+
+    def test_counts_are_direct_only(self):
+        index = build_unlock_index({"A": ["B"], "B": ["C"], "C": ["A", "D"]})
+        mask = index.mask(["A", "B", "C", "D"])
+        assert index.unlock_count("A", mask) == 1
+        assert index.unlock_count("C", mask) == 2
+        assert index.unlock_count("D", mask) == 0
+
+    def test_pool_mask_is_memoized_per_pool(self):
+        index = build_unlock_index({"A": ["B", "C"]})
+        pool = ["B", "C", "Z"]
+        assert index.pool_mask(pool) == index.mask(pool)
+        assert index.pool_mask(list(pool)) is index.pool_mask(pool)
+        assert len(index._pool_masks) == 1